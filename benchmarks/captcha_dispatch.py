@@ -0,0 +1,94 @@
+"""
+Micro-benchmark of the per-request overhead in the solution polling loop
+
+    python -m benchmarks.captcha_dispatch --polls 100000
+
+Measures one ``get_task_result`` poll without any network I/O: request class lookup,
+request preparation and response parsing, compared with the former
+``hasattr``/``getattr`` lookup on the service module.
+"""
+import argparse
+import asyncio
+from timeit import default_timer as timer
+
+import httpx
+
+from core.captcha.anycaptcha import RecaptchaV2, Service, SolutionNotReadyYet
+from core.captcha.anycaptcha._transport.base import BaseTransport
+from core.captcha.anycaptcha.service import SOLVING_SERVICE
+from core.captcha.anycaptcha.service.base import CaptchaTask
+
+
+class CannedTransport(BaseTransport):
+    """ Transport answering every request with the same "not ready" response """
+
+    def __init__(self, response: httpx.Response):
+        super().__init__()
+        self._response = response
+
+    async def _make_request_async(self, request_data: dict):
+        return self._response
+
+    async def close_async(self):
+        pass
+
+
+NOT_READY = {
+    Service.TWOCAPTCHA: {'status': 0, 'request': 'CAPCHA_NOT_READY'},
+    Service.ANTI_CAPTCHA: {'errorId': 0, 'status': 'processing'},
+    Service.CAPMONSTER: {'errorId': 0, 'status': 'processing'},
+}
+
+
+async def legacy_lookup(service, task):
+    """ The lookup get_task_result used to do before every poll """
+
+    request_class = f"{task.captcha.get_type().value}Solution" + "Request"
+    if not hasattr(service._module, request_class):  # pylint: disable=protected-access
+        raise LookupError(request_class)
+    return getattr(service._module, request_class)(service)  # pylint: disable=protected-access
+
+
+async def current_lookup(service, task):
+    """ The lookup get_task_result does now """
+
+    # pylint: disable=protected-access
+    return service._solution_requests[task.captcha.get_type()](service)
+
+
+async def measure(func, polls: int) -> float:
+    """ Microseconds per call """
+
+    start = timer()
+    for _ in range(polls):
+        try:
+            await func()
+        except SolutionNotReadyYet:
+            pass
+    return (timer() - start) / polls * 1e6
+
+
+async def run(polls: int):
+    print(f"{'service':>16} {'legacy lookup':>14} {'table lookup':>13} {'full poll':>10}   (us/poll)")
+    for service_name, not_ready in NOT_READY.items():
+        service = SOLVING_SERVICE[service_name].Service('key')
+        # pylint: disable=protected-access
+        await service._transport.close_async()
+        service._transport = CannedTransport(httpx.Response(200, json=not_ready))
+        task = CaptchaTask(service, RecaptchaV2('site-key', 'https://example.com'), '1')
+
+        legacy = await measure(lambda: legacy_lookup(service, task), polls)
+        current = await measure(lambda: current_lookup(service, task), polls)
+        full = await measure(lambda: service.get_task_result(task), polls)
+        print(f"{service_name.name:>16} {legacy:>14.2f} {current:>13.2f} {full:>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure per-poll overhead of captcha services')
+    parser.add_argument('--polls', type=int, default=100_000)
+    args = parser.parse_args()
+    asyncio.run(run(args.polls))
+
+
+if __name__ == '__main__':
+    main()
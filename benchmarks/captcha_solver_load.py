@@ -0,0 +1,178 @@
+"""
+Load test for the captcha Solver against the local mock provider
+
+    python -m benchmarks.captcha_solver_load --service TWOCAPTCHA --concurrency 1 10 50
+
+Reports solves/sec through ``Solver`` at each concurrency level together with the
+mock provider's counters (busy rejections, polls, ...).
+
+    python -m benchmarks.captcha_solver_load --check-retries
+
+Checks the transport's retry rules instead: result polls answered with HTTP 503 and task
+creations rejected as busy are retried, while a task creation answered with HTTP 503 is
+never sent again. Exits with status 1 if any of them is broken.
+"""
+import argparse
+import asyncio
+import sys
+from timeit import default_timer as timer
+from typing import List
+
+from core.captcha.anycaptcha import Service, Solver, AnyCaptchaException
+from testing.captcha_provider import Latency, MockProviderConfig, MockProviderServer
+
+CHECK_SERVICES = (Service.TWOCAPTCHA, Service.ANTI_CAPTCHA)  # one service per provider protocol
+CHECK_SOLVES = 20  # solves per retry check
+CHECK_HTTP_ERROR_RATE = 0.3  # share of the checked requests answered with HTTP 503
+# fast retries, and enough of them that a 30% error or busy rate never exhausts them
+CHECK_TRANSPORT_SETTINGS = dict(
+    rate_limit=None, max_in_flight=None, max_retries=20, backoff_factor=0.01,
+    busy_backoff=0.01, busy_max_retries=20
+)
+
+
+async def solve(server: MockProviderServer, service: Service, page_url: str,
+                polling_interval: float, transport_settings: dict):
+    """ Solve one reCAPTCHA of `page_url` with a new Solver pointed at the mock provider """
+
+    async with Solver(service, 'mock-key') as solver:
+        # pylint: disable=protected-access
+        solver._service.BASE_URL = server.url
+        solver._service._transport.settings.update(transport_settings)
+        for settings in solver._service.settings.values():
+            settings.polling_delay = polling_interval
+            settings.polling_interval = polling_interval
+        await solver.solve_recaptcha_v2(site_key='site-key', page_url=page_url)
+
+
+async def run_level(server: MockProviderServer, service: Service, concurrency: int,
+                    solves: int, polling_interval: float, transport_settings: dict):
+    """ Solve `solves` reCAPTCHAs with `concurrency` solvers at a time """
+
+    semaphore = asyncio.Semaphore(concurrency)
+    errors = 0
+
+    async def solve_one():
+        nonlocal errors
+        async with semaphore:
+            try:
+                await solve(server, service, 'https://example.com', polling_interval, transport_settings)
+            except AnyCaptchaException:
+                errors += 1
+
+    start = timer()
+    await asyncio.gather(*(solve_one() for _ in range(solves)))
+    elapsed = timer() - start
+    return elapsed, errors
+
+
+async def run_check(server: MockProviderServer, service: Service, solves: int) -> int:
+    """ Solve `solves` reCAPTCHAs at once, each of its own page URL, returns the number of failed solves """
+
+    results = await asyncio.gather(
+        *(solve(server, service, f'https://example.com/{i}', 0.05, CHECK_TRANSPORT_SETTINGS)
+          for i in range(solves)),
+        return_exceptions=True
+    )
+    return sum(isinstance(result, Exception) for result in results)
+
+
+def check_retries(service: Service, solves: int = CHECK_SOLVES) -> List[str]:
+    """
+    Runs the retry checks for a service against fresh mock providers
+
+    :param service: Service whose protocol is checked
+    :param solves: Solves per check
+    :return: Descriptions of the failed checks, empty if all passed
+    """
+    create_path, result_path = ('/in.php', '/res.php') if service == Service.TWOCAPTCHA \
+        else ('/createTask', '/getTaskResult')
+    latency = Latency.fixed(0.1)
+    failures = []
+
+    # result polls answered with HTTP 503 are retried until the solution arrives
+    config = MockProviderConfig(solve_latency=latency, http_error_rate=CHECK_HTTP_ERROR_RATE,
+                                http_error_paths=frozenset({result_path}))
+    with MockProviderServer(config) as server:
+        errors = asyncio.run(run_check(server, service, solves))
+        state = server.state
+    if not state.counters['http_errors']:
+        failures.append(f"{result_path}: no HTTP 503 was injected")
+    if errors:
+        failures.append(f"{result_path}: {errors} of {solves} solves failed although polls are retried")
+
+    # a task creation answered with HTTP 503 may have been billed, the solve fails instead of sending it again
+    config = MockProviderConfig(solve_latency=latency, http_error_rate=CHECK_HTTP_ERROR_RATE,
+                                http_error_paths=frozenset({create_path}))
+    with MockProviderServer(config) as server:
+        errors = asyncio.run(run_check(server, service, solves))
+        state = server.state
+    resent = sorted(url for url, count in state.submissions.items() if count > 1)
+    if resent:
+        failures.append(f"{create_path}: task creations sent more than once: {', '.join(resent)}")
+    if errors != state.counters['http_errors']:
+        failures.append(f"{create_path}: {errors} solves failed, "
+                        f"{state.counters['http_errors']} creations answered with HTTP 503")
+
+    # a busy rejection means no task was created, the creation is sent again until it is accepted
+    config = MockProviderConfig(solve_latency=latency, busy_rate=CHECK_HTTP_ERROR_RATE)
+    with MockProviderServer(config) as server:
+        errors = asyncio.run(run_check(server, service, solves))
+        state = server.state
+    if not state.counters['busy']:
+        failures.append(f"{create_path}: no busy rejection was injected")
+    if errors or state.counters['created'] != solves:
+        failures.append(f"{create_path}: {errors} solves failed and {state.counters['created']} tasks "
+                        f"created for {solves} solves although busy rejections are retried")
+    if sum(state.submissions.values()) != state.counters['created'] + state.counters['busy']:
+        failures.append(f"{create_path}: task creations sent again after being accepted")
+
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure Solver throughput against the mock provider')
+    parser.add_argument('--service', default='TWOCAPTCHA', choices=[s.name for s in Service])
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 10, 50])
+    parser.add_argument('--solves', type=int, default=100, help='solves per concurrency level')
+    parser.add_argument('--solve-latency', type=Latency.parse, default=Latency.uniform(0.2, 0.5))
+    parser.add_argument('--polling-interval', type=float, default=0.1)
+    parser.add_argument('--max-slots', type=int, default=None)
+    parser.add_argument('--busy-rate', type=float, default=0.0)
+    parser.add_argument('--rate-limit', type=float, default=None,
+                        help='transport requests/sec limit (default: unlimited)')
+    parser.add_argument('--check-retries', action='store_true',
+                        help=f"check the retry rules for {', '.join(s.name for s in CHECK_SERVICES)} "
+                             f"instead of measuring throughput")
+    args = parser.parse_args()
+
+    if args.check_retries:
+        failed = False
+        for service in CHECK_SERVICES:
+            failures = check_retries(service)
+            print(f"{service.name}: {'FAILED' if failures else 'OK'}")
+            for failure in failures:
+                print(f"  {failure}")
+            failed = failed or bool(failures)
+        sys.exit(1 if failed else 0)
+
+    config = MockProviderConfig(
+        solve_latency=args.solve_latency,
+        max_slots=args.max_slots,
+        busy_rate=args.busy_rate,
+    )
+    transport_settings = dict(rate_limit=args.rate_limit, max_in_flight=None, busy_backoff=0.2)
+    service = Service[args.service]
+
+    print(f"{'concurrency':>12} {'solves':>8} {'errors':>8} {'seconds':>9} {'solves/s':>9}")
+    for concurrency in args.concurrency:
+        with MockProviderServer(config) as server:
+            elapsed, errors = asyncio.run(run_level(
+                server, service, concurrency, args.solves, args.polling_interval, transport_settings
+            ))
+            print(f"{concurrency:>12} {args.solves:>8} {errors:>8} {elapsed:>9.2f} "
+                  f"{(args.solves - errors) / elapsed:>9.1f}   {server.state.counters}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""
+SQLite write contention with and without the tuning profile
+
+    python -m benchmarks.db_contention --sessions 50 --actions 20
+
+Runs the write pattern of ``ActionService.execute_action_for_all`` against a scratch
+database: every session reads the last successful action of its account, inserts a
+pending action, commits, then stores the result and commits again. The ``default``
+profile is a connection without PRAGMAs (rollback journal, synchronous=FULL), the
+``tuned`` profile applies the SQLITE_* settings and the ``writer`` profile also sends
+the writes through ``DatabaseWriter``, which groups them into shared transactions.
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+from collections import Counter
+from timeit import default_timer as timer
+
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.future import select
+from sqlalchemy.orm import sessionmaker
+
+from core.database.models import Account, Action, ActionStatus, ActionType, Base
+from core.database.sqlite import configure_sqlite, sqlite_pragmas_from_settings
+from core.database.writer import DatabaseWriter
+from core.settings import settings
+
+
+async def run_profile(db_path: str, profile: str, sessions: int, actions: int) -> Counter:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}", echo=False)
+    if profile in ('tuned', 'writer'):
+        configure_sqlite(engine, sqlite_pragmas_from_settings(settings.env))
+    session_factory = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    async with session_factory() as session:
+        session.add_all([
+            Account(email=f"{index}@example.com", address=f"0x{index:040x}", private_key=f"{index:064x}", active=True)
+            for index in range(sessions)
+        ])
+        await session.commit()
+
+    outcomes = Counter()
+    writer = DatabaseWriter(session_factory) if profile == 'writer' else None
+
+    async def write(session: AsyncSession, operation):
+        if writer is None:
+            result = await operation(session)
+            await session.commit()
+            return result
+        # the read transaction ends before the writer commits, as in ActionService
+        await session.commit()
+        return await writer.submit(operation)
+
+    async def process_account(account_id: int):
+        for _ in range(actions):
+            try:
+                async with session_factory() as session:
+                    await session.execute(
+                        select(Action).filter(
+                            Action.account_id == account_id,
+                            Action.action_type == ActionType.FAUCET,
+                            Action.status == ActionStatus.SUCCESS
+                        ).order_by(Action.created_at.desc()).limit(1)
+                    )
+
+                    async def insert(write_session: AsyncSession) -> Action:
+                        action = Action(account_id=account_id, action_type=ActionType.FAUCET,
+                                        status=ActionStatus.PENDING, payload={})
+                        write_session.add(action)
+                        return action
+
+                    action_id = (await write(session, insert)).id
+
+                    async def store(write_session: AsyncSession):
+                        action = await write_session.get(Action, action_id)
+                        action.status = ActionStatus.SUCCESS
+                        action.payload = {'status': 'success', 'hash': os.urandom(32).hex(), 'dripAmount': '100'}
+
+                    await write(session, store)
+                outcomes['committed'] += 1
+            except OperationalError as e:
+                outcomes['locked' if 'locked' in str(e) else 'error'] += 1
+
+    try:
+        await asyncio.gather(*[process_account(account_id) for account_id in range(1, sessions + 1)])
+        if writer is not None:
+            outcomes['transactions'] = writer.batches
+            await writer.close()
+    finally:
+        await engine.dispose()
+    return outcomes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sessions', type=int, default=50)
+    parser.add_argument('--actions', type=int, default=20, help='actions written per session')
+    parser.add_argument('--profiles', nargs='+', choices=['default', 'tuned', 'writer'],
+                        default=['default', 'tuned', 'writer'])
+    args = parser.parse_args()
+
+    print(f"{args.sessions} concurrent sessions, {args.actions} actions each, "
+          f"tuned profile: {sqlite_pragmas_from_settings(settings.env)}")
+    for profile in args.profiles:
+        with tempfile.TemporaryDirectory() as directory:
+            started = timer()
+            outcomes = asyncio.run(run_profile(os.path.join(directory, 'bench.db'), profile,
+                                               args.sessions, args.actions))
+            elapsed = timer() - started
+
+        transactions = outcomes['transactions'] or 2 * outcomes['committed']
+        print(f"{profile:>8}: {outcomes['committed'] / elapsed:8.1f} actions/s, {transactions} write transactions, "
+              f"{outcomes['locked']} 'database is locked', {outcomes['error']} other errors, {elapsed:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
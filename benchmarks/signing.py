@@ -0,0 +1,84 @@
+"""
+Signed transactions per second, on the event loop versus the signing process pool
+
+    python -m benchmarks.signing --transactions 10000 --workers 1 2 4 8
+
+Signs the same set of stake transactions (one key per transaction) once inline, as
+``precise_stake`` used to, and once per worker count through ``TransactionSigner``:
+as one ``sign_many`` call and as concurrent ``sign`` calls, the way stakes of many
+accounts arrive. No network I/O is involved.
+"""
+import argparse
+import asyncio
+import os
+from typing import Tuple
+from timeit import default_timer as timer
+
+from eth_account import Account
+from web3 import Web3
+
+from core.services.staking import ZenchainAsyncStaking
+from core.utils.w3.signing import TransactionSigner
+
+
+def build_transactions(count: int):
+    contract = Web3().eth.contract(address=ZenchainAsyncStaking.STAKING_CONTRACT, abi=ZenchainAsyncStaking.STAKING_ABI)
+    data = contract.encode_abi('bondExtra', args=[Web3.to_wei(1, 'ether')])
+
+    items = []
+    for nonce in range(count):
+        private_key = '0x' + os.urandom(32).hex()
+        items.append(({
+            'to': ZenchainAsyncStaking.STAKING_CONTRACT,
+            'data': data,
+            'value': 0,
+            'nonce': nonce,
+            'gas': 100000,
+            'maxFeePerGas': 2 * 10 ** 9,
+            'maxPriorityFeePerGas': 10 ** 8,
+            'chainId': 8408
+        }, private_key))
+    return items
+
+
+async def run_pool(items, workers: int) -> Tuple[float, float]:
+    TransactionSigner.configure(workers)
+    # warm up the worker processes so process start-up is not measured
+    await TransactionSigner.sign_many(items[:workers], chunk_size=1)
+
+    started = timer()
+    await TransactionSigner.sign_many(items)
+    batch = timer() - started
+
+    started = timer()
+    await asyncio.gather(*[TransactionSigner.sign(tx, private_key) for tx, private_key in items])
+    concurrent = timer() - started
+
+    TransactionSigner.shutdown()
+    return batch, concurrent
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--transactions', type=int, default=10000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, os.cpu_count() or 1])
+    args = parser.parse_args()
+
+    items = build_transactions(args.transactions)
+    print(f"{args.transactions} transactions, {os.cpu_count()} CPUs")
+
+    started = timer()
+    for tx, private_key in items:
+        Account.sign_transaction(tx, private_key)
+    inline = timer() - started
+    print(f"{'inline':>10}: {args.transactions / inline:10.0f} tx/s")
+
+    for workers in sorted(set(args.workers)):
+        batch, concurrent = asyncio.run(run_pool(items, workers))
+        print(f"{f'{workers} workers':>10}: {args.transactions / batch:10.0f} tx/s "
+              f"({inline / batch:.2f}x inline), concurrent sign(): "
+              f"{args.transactions / concurrent:.0f} tx/s ({inline / concurrent:.2f}x inline)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""
+Stakes per second through StakeActionHandler against the local dev chain
+
+    python -m benchmarks.stake_throughput --accounts 200 --concurrency 1 10 50 --block-time 1
+
+Every round funds a fresh set of accounts on a ``DevChainServer``, prefetches the
+stake plans and runs ``StakeActionHandler.execute`` for all accounts with at most
+``concurrency`` stakes in flight. Submit-only rounds return once the transactions are
+accepted (deferred confirmation), confirmed rounds wait for the receipts. Every round
+uses a fresh in-memory database, the configured one is never opened.
+"""
+import argparse
+import asyncio
+import os
+from collections import Counter
+from timeit import default_timer as timer
+from typing import List
+
+from eth_account import Account as EthAccount
+from web3 import Web3
+
+from core.database.connect import dispose_db, get_engine, init_db
+from core.database.models import Account, Base
+from core.services.handlers.stake import StakeActionHandler
+from core.settings import settings
+from testing.dev_chain import DevChainConfig, DevChainServer
+from core.utils.w3.pool import AsyncWeb3Pool
+
+
+def build_accounts(server: DevChainServer, count: int) -> List[Account]:
+    accounts = []
+    for _ in range(count):
+        private_key = '0x' + os.urandom(32).hex()
+        address = EthAccount.from_key(private_key).address
+        server.state.fund(address, Web3.to_wei(100, 'ether'))
+        accounts.append(Account(address=address, private_key=private_key, proxy=None, headers={}))
+    return accounts
+
+
+async def run_round(accounts: List[Account], concurrency: int) -> Counter:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def stake(account: Account) -> str:
+        async with semaphore:
+            result = await StakeActionHandler.execute(account, None)
+            return result['status']
+
+    # the chain index synced by prefetch is kept in a scratch database
+    init_db('sqlite+aiosqlite://')
+    async with get_engine().begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    try:
+        await StakeActionHandler.prefetch(accounts)
+        return Counter(await asyncio.gather(*[stake(account) for account in accounts]))
+    finally:
+        await AsyncWeb3Pool.close()
+        await dispose_db()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--accounts', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 10, 50])
+    parser.add_argument('--block-time', type=float, default=1.0)
+    parser.add_argument('--response-latency', type=float, default=0.0,
+                        help='seconds added to every RPC response to emulate a remote node')
+    parser.add_argument('--mode', choices=['submit', 'confirm', 'both'], default='both')
+    args = parser.parse_args()
+
+    modes = ['submit', 'confirm'] if args.mode == 'both' else [args.mode]
+    config = DevChainConfig(block_time=args.block_time, response_latency=args.response_latency)
+
+    with DevChainServer(config) as server:
+        StakeActionHandler.init_rpc([server.url])
+        print(f"{args.accounts} accounts, block time {args.block_time}s, "
+              f"RPC latency {args.response_latency}s, dev chain at {server.url}")
+
+        for mode in modes:
+            settings.env.deferred_stake_confirmation = mode == 'submit'
+            for concurrency in sorted(set(args.concurrency)):
+                accounts = build_accounts(server, args.accounts)
+                requests_before = sum(server.state.requests.values())
+
+                started = timer()
+                statuses = asyncio.run(run_round(accounts, concurrency))
+                elapsed = timer() - started
+
+                requests = sum(server.state.requests.values()) - requests_before
+                print(f"{mode:>7} x{concurrency:<4}: {args.accounts / elapsed:8.1f} stakes/s, "
+                      f"{requests / args.accounts:5.1f} RPC requests/stake, {dict(statuses)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,9 +1,11 @@
+import asyncio
 from logging.config import fileConfig
-from sqlalchemy import engine_from_config, pool
+from sqlalchemy import pool
+from sqlalchemy.engine import Connection, make_url
+from sqlalchemy.ext.asyncio import async_engine_from_config
 from alembic import context
-import os
 from core.database.models import Base
-from core.database.connect import db_path
+from core.database.connect import DEFAULT_DATABASE_URL, create_db, get_database_url
 
 
 config = context.config
@@ -14,11 +16,15 @@ if config.config_file_name is not None:
 target_metadata = Base.metadata
 
 def load_database_url():
-    return 'sqlite:///' + db_path
+    # DATABASE_URL from the settings, or the SQLite file
+    return get_database_url()
+
+def display_url(url: str) -> str:
+    return make_url(url).render_as_string(hide_password=True)
 
 def run_migrations_offline() -> None:
     url = load_database_url()
-    print(f"Running migrations offline with database URL: {url}")
+    print(f"Running migrations offline with database URL: {display_url(url)}")
     context.configure(
         url=url,
         target_metadata=target_metadata,
@@ -29,25 +35,38 @@ def run_migrations_offline() -> None:
     with context.begin_transaction():
         context.run_migrations()
 
-def run_migrations_online() -> None:
-    url = load_database_url()
-    print(f"Running migrations online with database URL: {url}")
-    connectable = engine_from_config(
+def do_run_migrations(connection: Connection) -> None:
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        # ALTER of SQLite tables goes through table copies
+        render_as_batch=connection.dialect.name == 'sqlite',
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+async def run_async_migrations() -> None:
+    # the async driver of the URL is used, no sync driver has to be installed
+    connectable = async_engine_from_config(
         {
-            'sqlalchemy.url': url
+            'sqlalchemy.url': load_database_url()
         },
         prefix="sqlalchemy.",
         poolclass=pool.NullPool,
     )
-    print(f"Using database URL: {url}")
 
-    with connectable.connect() as connection:
-        context.configure(
-            connection=connection, target_metadata=target_metadata
-        )
+    async with connectable.connect() as connection:
+        await connection.run_sync(do_run_migrations)
 
-        with context.begin_transaction():
-            context.run_migrations()
+    await connectable.dispose()
+
+def run_migrations_online() -> None:
+    url = load_database_url()
+    print(f"Running migrations online with database URL: {display_url(url)}")
+    if url == DEFAULT_DATABASE_URL:
+        create_db()
+    asyncio.run(run_async_migrations())
 
 if context.is_offline_mode():
     run_migrations_offline()
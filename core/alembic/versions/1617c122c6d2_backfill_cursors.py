@@ -0,0 +1,41 @@
+"""backfill cursors
+
+Revision ID: 1617c122c6d2
+Revises: cf0b414ea0bc
+Create Date: 2026-10-19 13:48:52.032101
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1617c122c6d2'
+down_revision: Union[str, None] = 'cf0b414ea0bc'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('backfill_cursors',
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('last_id', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+    # the result columns backfill kept its last action id among the indexer cursors
+    op.execute(
+        "INSERT INTO backfill_cursors (name, last_id, updated_at) "
+        "SELECT name, block_number, updated_at FROM indexer_cursors WHERE name = 'action_result_columns'"
+    )
+    op.execute("DELETE FROM indexer_cursors WHERE name = 'action_result_columns'")
+
+
+def downgrade() -> None:
+    op.execute(
+        "INSERT INTO indexer_cursors (name, block_number, updated_at) "
+        "SELECT name, last_id, updated_at FROM backfill_cursors WHERE name = 'action_result_columns'"
+    )
+    op.drop_table('backfill_cursors')
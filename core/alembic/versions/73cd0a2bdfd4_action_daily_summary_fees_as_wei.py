@@ -0,0 +1,37 @@
+"""action daily summary fees as wei
+
+Revision ID: 73cd0a2bdfd4
+Revises: 1617c122c6d2
+Create Date: 2026-10-19 14:05:19.588294
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '73cd0a2bdfd4'
+down_revision: Union[str, None] = '1617c122c6d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # daily fee totals in wei overflow 64-bit integers, they are stored as decimal strings like the ledger amounts
+    with op.batch_alter_table('action_daily_summaries') as batch_op:
+        batch_op.alter_column('fees',
+               existing_type=sa.BigInteger(),
+               type_=sa.String(length=78),
+               existing_nullable=False,
+               postgresql_using='fees::varchar(78)')
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('action_daily_summaries') as batch_op:
+        batch_op.alter_column('fees',
+               existing_type=sa.String(length=78),
+               type_=sa.BigInteger(),
+               existing_nullable=False,
+               postgresql_using='fees::bigint')
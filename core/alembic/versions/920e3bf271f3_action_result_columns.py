@@ -0,0 +1,43 @@
+"""action result columns
+
+Revision ID: 920e3bf271f3
+Revises: d118e03f92f9
+Create Date: 2026-10-19 13:18:35.069237
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '920e3bf271f3'
+down_revision: Union[str, None] = 'd118e03f92f9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # existing rows are filled in from their payloads by core.jobs.backfill
+    with op.batch_alter_table('actions') as batch_op:
+        batch_op.add_column(sa.Column('tx_hash', sa.String(), nullable=True))
+        batch_op.add_column(sa.Column('block_number', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('gas_used', sa.BigInteger(), nullable=True))
+        batch_op.add_column(sa.Column('effective_gas_price', sa.BigInteger(), nullable=True))
+    op.create_index('ix_actions_account_id_type', 'actions', ['account_id', 'action_type'], unique=False)
+    op.create_index(op.f('ix_actions_block_number'), 'actions', ['block_number'], unique=False)
+    op.create_index(op.f('ix_actions_tx_hash'), 'actions', ['tx_hash'], unique=False)
+    op.create_index('ix_actions_type_status_created_at', 'actions', ['action_type', 'status', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_actions_type_status_created_at', table_name='actions')
+    op.drop_index(op.f('ix_actions_tx_hash'), table_name='actions')
+    op.drop_index(op.f('ix_actions_block_number'), table_name='actions')
+    op.drop_index('ix_actions_account_id_type', table_name='actions')
+    with op.batch_alter_table('actions') as batch_op:
+        batch_op.drop_column('effective_gas_price')
+        batch_op.drop_column('gas_used')
+        batch_op.drop_column('block_number')
+        batch_op.drop_column('tx_hash')
@@ -0,0 +1,37 @@
+"""action daily summaries
+
+Revision ID: cf0b414ea0bc
+Revises: 920e3bf271f3
+Create Date: 2026-10-19 13:30:18.385811
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'cf0b414ea0bc'
+down_revision: Union[str, None] = '920e3bf271f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('action_daily_summaries',
+    sa.Column('account_id', sa.Integer(), nullable=False),
+    sa.Column('action_type', sa.Enum('WAITLIST', 'FAUCET', 'STAKE', name='actiontype', native_enum=False), nullable=False),
+    sa.Column('status', sa.Enum('PENDING', 'SUBMITTED', 'SUCCESS', 'FAILED', name='actionstatus', native_enum=False), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.Column('gas_used', sa.BigInteger(), nullable=False),
+    sa.Column('fees', sa.BigInteger(), nullable=False),
+    sa.Column('last_created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['account_id'], ['accounts.id'], ),
+    sa.PrimaryKeyConstraint('account_id', 'action_type', 'status', 'day')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('action_daily_summaries')
@@ -0,0 +1,90 @@
+"""faucet drip ledger
+
+Revision ID: d118e03f92f9
+Revises: 827bac5c505e
+Create Date: 2026-10-19 13:17:07.328862
+
+"""
+import json
+from decimal import Decimal
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd118e03f92f9'
+down_revision: Union[str, None] = '827bac5c505e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _drip_amount_wei(drip_amount) -> int:
+    # same rule as core.services.faucet_ledger.drip_amount_wei at the time of this revision
+    amount = Decimal(str(drip_amount))
+    return int(amount) if amount >= 10 ** 9 else int(amount * 10 ** 18)
+
+
+def _backfill(connection) -> None:
+    """Ledger rows and per-account aggregates from the payloads of past successful faucet actions"""
+    actions = connection.execute(sa.text(
+        "SELECT id, account_id, payload, created_at FROM actions "
+        "WHERE action_type = 'FAUCET' AND status = 'SUCCESS' ORDER BY id"
+    )).all()
+
+    totals = {}
+    for action_id, account_id, payload, created_at in actions:
+        payload = json.loads(payload) if isinstance(payload, str) else (payload or {})
+        if not payload.get('hash') or payload.get('dripAmount') is None:
+            continue
+        amount = _drip_amount_wei(payload['dripAmount'])
+        connection.execute(sa.text(
+            "INSERT INTO faucet_drips (account_id, action_id, tx_hash, amount, created_at) "
+            "VALUES (:account_id, :action_id, :tx_hash, :amount, :created_at)"
+        ), dict(account_id=account_id, action_id=action_id, tx_hash=payload['hash'].lower(),
+                amount=str(amount), created_at=created_at))
+
+        count, total, _ = totals.get(account_id, (0, 0, None))
+        totals[account_id] = (count + 1, total + amount, created_at)
+
+    for account_id, (count, total, last_drip_at) in totals.items():
+        connection.execute(sa.text(
+            "UPDATE accounts SET faucet_drip_count = :count, faucet_dripped_total = :total, "
+            "last_faucet_drip_at = :last_drip_at WHERE id = :account_id"
+        ), dict(count=count, total=str(total), last_drip_at=last_drip_at, account_id=account_id))
+
+
+def upgrade() -> None:
+    op.create_table('faucet_drips',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('account_id', sa.Integer(), nullable=False),
+    sa.Column('action_id', sa.Integer(), nullable=True),
+    sa.Column('tx_hash', sa.String(), nullable=False),
+    sa.Column('amount', sa.String(length=78), nullable=False),
+    sa.Column('block_number', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.ForeignKeyConstraint(['account_id'], ['accounts.id'], ),
+    sa.ForeignKeyConstraint(['action_id'], ['actions.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('action_id'),
+    sa.UniqueConstraint('tx_hash')
+    )
+    op.create_index(op.f('ix_faucet_drips_account_id'), 'faucet_drips', ['account_id'], unique=False)
+    op.create_index(op.f('ix_faucet_drips_id'), 'faucet_drips', ['id'], unique=False)
+    with op.batch_alter_table('accounts') as batch_op:
+        batch_op.add_column(sa.Column('faucet_drip_count', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('faucet_dripped_total', sa.String(length=78), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('last_faucet_drip_at', sa.DateTime(timezone=True), nullable=True))
+
+    _backfill(op.get_bind())
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('accounts') as batch_op:
+        batch_op.drop_column('last_faucet_drip_at')
+        batch_op.drop_column('faucet_dripped_total')
+        batch_op.drop_column('faucet_drip_count')
+    op.drop_index(op.f('ix_faucet_drips_id'), table_name='faucet_drips')
+    op.drop_index(op.f('ix_faucet_drips_account_id'), table_name='faucet_drips')
+    op.drop_table('faucet_drips')
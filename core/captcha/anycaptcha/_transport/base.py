@@ -5,6 +5,10 @@ from typing import Optional, Any
 class BaseRequest(ABC):
     """ Base request class """
 
+    # whether the request can safely be sent again if it may have reached the service;
+    # task creation requests set it to False, every task is billed so it must never be sent twice
+    idempotent = True
+
     def __init__(self, service):
         # solving service instance
         self._service = service
@@ -1,16 +1,28 @@
 """
 Transport and requests for HTTP protocol
 """
+import asyncio
+import random
 from typing import Optional, Dict
 
 import httpx
 
 from .base import BaseTransport, BaseRequest
+from .limiter import get_provider_limiter
+from ..errors import ServiceTooBusy, TooManyRequestsError
 
 
 HTTP_RETRY_MAX_COUNT = 5  # max retry count in case of http(s) errors
 HTTP_RETRY_BACKOFF_FACTOR = 0.5  # backoff factor for Retry
 HTTP_RETRY_STATUS_FORCELIST = {500, 502, 503, 504}  # status forcelist for Retry
+# errors raised before the request reached the service, safe to retry for any request
+HTTP_RETRY_NOT_SENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+HTTP_RATE_LIMIT = 10  # max requests per second to a single provider
+HTTP_RATE_BURST = 10  # requests allowed to go out at once before the rate limit kicks in
+HTTP_MAX_IN_FLIGHT = 20  # max concurrent requests to a single provider
+HTTP_BUSY_MAX_RETRIES = 3  # max retry count when the provider reports no slots / too many requests
+HTTP_BUSY_BACKOFF = 5  # seconds to pause the provider after it reported being busy
 
 
 class StandardHTTPTransport(BaseTransport):
@@ -19,7 +31,14 @@ class StandardHTTPTransport(BaseTransport):
     def __init__(self, settings: Optional[Dict] = None):
         super().__init__(settings)
         self.settings.setdefault('max_retries', HTTP_RETRY_MAX_COUNT)
+        self.settings.setdefault('backoff_factor', HTTP_RETRY_BACKOFF_FACTOR)
+        self.settings.setdefault('status_forcelist', HTTP_RETRY_STATUS_FORCELIST)
         self.settings.setdefault('handle_http_errors', True)
+        self.settings.setdefault('rate_limit', HTTP_RATE_LIMIT)
+        self.settings.setdefault('rate_burst', HTTP_RATE_BURST)
+        self.settings.setdefault('max_in_flight', HTTP_MAX_IN_FLIGHT)
+        self.settings.setdefault('busy_max_retries', HTTP_BUSY_MAX_RETRIES)
+        self.settings.setdefault('busy_backoff', HTTP_BUSY_BACKOFF)
 
         default_headers = {'User-Agent': f'python-anycaptcha'}
 
@@ -28,11 +47,65 @@ class StandardHTTPTransport(BaseTransport):
             timeout=httpx.Timeout(timeout=30)
         )
 
-    async def _make_request_async(self, request_data: Dict) -> httpx.Response:
+    def _get_limiter(self, request_data: Dict):
+        """ Limiter shared by all requests to the provider the request goes to """
+
+        return get_provider_limiter(
+            httpx.URL(request_data['url']).host,
+            rate=self.settings['rate_limit'],
+            burst=self.settings['rate_burst'],
+            max_in_flight=self.settings['max_in_flight']
+        )
+
+    async def make_request_async(self, request: BaseRequest, *args) -> dict:
+        """ Makes a request to the service, backing off while the provider is busy """
+
+        request_data = request.prepare(*args)
+        attempt = 0
+        while True:
+            response = await self._make_request_async(request_data, idempotent=request.idempotent)
+            try:
+                return request.process_response(response)
+            except (ServiceTooBusy, TooManyRequestsError):
+                if attempt >= self.settings['busy_max_retries']:
+                    raise
+
+                # pause the whole provider, not only this request, so other callers
+                # don't keep hammering it in the meantime
+                delay = self.settings['busy_backoff'] * 2 ** attempt
+                self._get_limiter(request_data).pause(random.uniform(delay / 2, delay))
+                attempt += 1
+
+    def _get_retry_delay(self, attempt: int) -> float:
+        """ Exponential backoff with full jitter """
+
+        return random.uniform(0, self.settings['backoff_factor'] * 2 ** attempt)
+
+    async def _make_request_async(self, request_data: Dict,
+                                  idempotent: bool = True) -> httpx.Response:
         if 'headers' not in request_data:
             request_data['headers'] = {}
 
-        response = await self.session_async.request(**request_data)
+        limiter = self._get_limiter(request_data)
+        attempt = 0
+        while True:
+            try:
+                async with limiter:
+                    response = await self.session_async.request(**request_data)
+            except httpx.TransportError as exc:
+                # a non-idempotent request (e.g. task creation) may already have been
+                # processed and billed unless it never left the client
+                if (attempt >= self.settings['max_retries']
+                        or not (idempotent or isinstance(exc, HTTP_RETRY_NOT_SENT_ERRORS))):
+                    raise
+            else:
+                if (not idempotent
+                        or attempt >= self.settings['max_retries']
+                        or response.status_code not in self.settings['status_forcelist']):
+                    break
+
+            await asyncio.sleep(self._get_retry_delay(attempt))
+            attempt += 1
 
         if self.settings['handle_http_errors']:
             response.raise_for_status()
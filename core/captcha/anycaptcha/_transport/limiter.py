@@ -0,0 +1,110 @@
+"""
+Provider-wide request limiting for transports
+"""
+import asyncio
+import logging
+import weakref
+from time import monotonic
+from typing import Dict, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """ Token bucket limiting the request rate """
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated_at = monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    async def acquire(self):
+        """ Wait until a token is available and take it """
+
+        # waiters queue up on the lock, so tokens are handed out in FIFO order
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class ProviderLimiter:
+    """ Rate limit, in-flight cap and backoff pause shared by all requests to one provider """
+
+    def __init__(self, rate: Optional[float], burst: int, max_in_flight: Optional[int]):
+        self.settings = (rate, burst, max_in_flight)
+        # settings other transports asked for and were warned about, the first ones stay in effect
+        self.ignored_settings: Set[Tuple[Optional[float], int, Optional[int]]] = set()
+        self._bucket = TokenBucket(rate, max(burst, 1)) if rate else None
+        self._in_flight = asyncio.Semaphore(max_in_flight) if max_in_flight else None
+        self._paused_until = 0.0
+
+    def pause(self, delay: float):
+        """ Hold back every request to the provider for `delay` seconds """
+
+        self._paused_until = max(self._paused_until, monotonic() + delay)
+
+    async def _wait_pause(self):
+        while (delay := self._paused_until - monotonic()) > 0:
+            await asyncio.sleep(delay)
+
+    async def __aenter__(self):
+        await self._wait_pause()
+        if self._in_flight is not None:
+            await self._in_flight.acquire()
+        try:
+            if self._bucket is not None:
+                await self._bucket.acquire()
+            # the provider may have asked us to back off while we were queued
+            await self._wait_pause()
+        except BaseException:
+            if self._in_flight is not None:
+                self._in_flight.release()
+            raise
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        if self._in_flight is not None:
+            self._in_flight.release()
+
+
+# asyncio primitives are bound to the loop they were first used in,
+# so limiters are kept per event loop and per provider host
+_limiters: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, ProviderLimiter]]' = \
+    weakref.WeakKeyDictionary()
+
+
+def get_provider_limiter(host: str, rate: Optional[float], burst: int,
+                         max_in_flight: Optional[int]) -> ProviderLimiter:
+    """
+    Get (or create) the limiter shared by all transports talking to `host`
+
+    The limits are provider-wide, so the settings of the transport creating the limiter apply to
+    all of them; a transport asking for other settings is warned once and shares the limiter anyway.
+    """
+
+    loop_limiters = _limiters.setdefault(asyncio.get_running_loop(), {})
+    limiter = loop_limiters.get(host)
+    if limiter is None:
+        limiter = loop_limiters[host] = ProviderLimiter(rate, burst, max_in_flight)
+        return limiter
+
+    settings = (rate, burst, max_in_flight)
+    if settings != limiter.settings and settings not in limiter.ignored_settings:
+        limiter.ignored_settings.add(settings)
+        logger.warning(
+            "Limiter of %s already uses rate_limit=%s, rate_burst=%s, max_in_flight=%s, "
+            "ignoring rate_limit=%s, rate_burst=%s, max_in_flight=%s",
+            host, *limiter.settings, *settings
+        )
+    return limiter
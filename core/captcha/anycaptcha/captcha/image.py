@@ -1,5 +1,4 @@
 import base64
-import imghdr
 import io
 import pathlib
 from dataclasses import dataclass
@@ -10,11 +9,35 @@ from ..enums import CaptchaAlphabet, CaptchaCharType, WorkerLanguage
 from ..errors import BadInputDataError
 
 
+# magic bytes at the beginning of supported image files
+IMAGE_SIGNATURES = (
+    (b'\xff\xd8\xff', 'jpeg'),
+    (b'\x89PNG\r\n\x1a\n', 'png'),
+    (b'GIF87a', 'gif'),
+    (b'GIF89a', 'gif'),
+    (b'BM', 'bmp'),
+    (b'II*\x00', 'tiff'),
+    (b'MM\x00*', 'tiff'),
+)
+
+
+def sniff_image_type(data: Union[bytes, memoryview]) -> Optional[str]:
+    """ Recognize image type by its magic bytes """
+
+    header = bytes(data[:12])
+    for signature, image_type in IMAGE_SIGNATURES:
+        if header.startswith(signature):
+            return image_type
+    if header[:4] == b'RIFF' and header[8:12] == b'WEBP':
+        return 'webp'
+    return None
+
+
 @dataclass
 class ImageCaptcha(BaseCaptcha):
     """ Image CAPTCHA """
 
-    image: Union[bytes, io.RawIOBase, io.BufferedIOBase, pathlib.Path]
+    image: Union[bytes, bytearray, memoryview, io.RawIOBase, io.BufferedIOBase, pathlib.Path]
     char_type: Optional[CaptchaCharType] = None
     is_phrase: Optional[bool] = None
     is_case_sensitive: Optional[bool] = None
@@ -26,34 +49,59 @@ class ImageCaptcha(BaseCaptcha):
     comment: Optional[str] = None
 
     def __post_init__(self):
-        self._image_bytes = None
-        self.get_image_bytes()
-
-    def get_image_bytes(self) -> bytes:
-        """ Bytes image """
-
-        if self._image_bytes is None:
-            if isinstance(self.image, bytes):
-                self._image_bytes = self.image  # type: ignore
+        self._image_buffer = None
+        self._image_base64 = None
+        self.get_image_buffer()
+
+    @staticmethod
+    def _read_file(path: pathlib.Path) -> memoryview:
+        """ Read image file in one call, no file descriptor or mapping outlives it """
+
+        with open(path, 'rb') as file:
+            data = file.read()
+        if not data:
+            raise BadInputDataError("Empty image file!")
+        return memoryview(data)
+
+    def get_image_buffer(self) -> memoryview:
+        """ Image data without copying it """
+
+        if self._image_buffer is None:
+            if isinstance(self.image, (bytes, bytearray, memoryview)):
+                self._image_buffer = memoryview(self.image)
             elif isinstance(self.image, (io.RawIOBase, io.BufferedIOBase)):
-                self._image_bytes = self.image.read()
+                self._image_buffer = memoryview(self.image.read())
             elif isinstance(self.image, pathlib.Path):
-                self._image_bytes = self.image.read_bytes()
+                self._image_buffer = self._read_file(self.image)
+            else:
+                raise BadInputDataError(f"Unsupported image source: {type(self.image)}")
 
             # check image type
             self.get_image_type()
 
-        return self._image_bytes
+        return self._image_buffer
+
+    def get_image_bytes(self) -> bytes:
+        """ Bytes image """
+
+        image_buffer = self.get_image_buffer()
+        obj = image_buffer.obj
+        # the underlying bytes are only the image when the view covers all of them
+        if isinstance(obj, bytes) and image_buffer.contiguous and image_buffer.nbytes == len(obj):
+            return obj
+        return image_buffer.tobytes()
 
     def get_image_base64(self) -> bytes:
         """ BASE64 image """
 
-        return base64.b64encode(self.get_image_bytes())
+        if self._image_base64 is None:
+            self._image_base64 = base64.b64encode(self.get_image_buffer())
+        return self._image_base64
 
     def get_image_type(self) -> str:
         """ Get type of image file/data """
 
-        image_type = imghdr.what(None, h=self._image_bytes)
+        image_type = sniff_image_type(self._image_buffer)
 
         if not image_type:
             raise BadInputDataError("Unable to recognize image type!")
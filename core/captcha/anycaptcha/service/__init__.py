@@ -47,3 +47,7 @@ SOLVING_SERVICE = {
     Service.CAPMONSTER: capmonster,
     Service.CAPSOLVER: capsolver
 }
+
+# resolve request classes once at import instead of on every request
+for _module in SOLVING_SERVICE.values():
+    _module.Service.build_dispatch_table()
@@ -194,6 +194,8 @@ class ReportBadRequest(Request):
 class TaskRequest(Request):
     """ Request class for requests to /createTask """
 
+    idempotent = False
+
     def prepare(self, captcha, proxy: Proxy, user_agent: str, cookies: dict) -> dict:  # type: ignore
         """ Prepare a request """
 
@@ -19,13 +19,40 @@ class BaseService(ABC):
 
     CURRENCY = "USD"
 
+    # request classes of the service module, resolved once per service class
+    _requests: Dict[str, type]
+    _task_requests: Dict[CaptchaType, type]
+    _solution_requests: Dict[CaptchaType, type]
+    _supported_captchas: Tuple[CaptchaType, ...]
+
     def __init__(self, api_key: str):
         self.api_key = api_key
         self._transport = self._init_transport()
         self._module = getmodule(self)
+        if '_requests' not in type(self).__dict__:
+            type(self).build_dispatch_table()
         self._settings = {captcha_type: Settings() for captcha_type in self.supported_captchas}
         self._post_init()
 
+    @classmethod
+    def build_dispatch_table(cls):
+        """ Resolve the *Request classes of the service module into lookup tables """
+
+        requests = {
+            name[:-len("Request")]: obj for name, obj in vars(getmodule(cls)).items()
+            if name.endswith("Request") and callable(obj)
+        }
+        cls._requests = requests
+        cls._task_requests = {
+            captcha_type: requests[captcha_type.value + "Task"] for captcha_type in CaptchaType
+            if captcha_type.value + "Task" in requests
+        }
+        cls._solution_requests = {
+            captcha_type: requests[captcha_type.value + "Solution"] for captcha_type in CaptchaType
+            if captcha_type.value + "Solution" in requests
+        }
+        cls._supported_captchas = tuple(cls._task_requests)
+
     @abstractmethod
     def _init_transport(self):
         pass
@@ -34,22 +61,20 @@ class BaseService(ABC):
         pass
 
     async def _make_request_async(self, request_class, *args):
-        request_class = request_class + "Request"
-        if not hasattr(self._module, request_class):
-            raise AnyCaptchaException(f"{request_class} is not supported by the current service!")
+        try:
+            request_class = self._requests[request_class]
+        except KeyError:
+            raise AnyCaptchaException(
+                f"{request_class}Request is not supported by the current service!"
+            ) from None
 
-        request = getattr(self._module, request_class)(self)
-        return await self._transport.make_request_async(request, *args)
+        return await self._transport.make_request_async(request_class(self), *args)
 
     @property
     def supported_captchas(self) -> Tuple[CaptchaType, ...]:
         """ List of supported captchas """
 
-        captchas = []
-        for captcha_type in CaptchaType:
-            if hasattr(self._module, captcha_type.value + "TaskRequest"):
-                captchas.append(captcha_type)
-        return tuple(captchas)
+        return self._supported_captchas
 
     @property
     def settings(self) -> Dict[CaptchaType, 'Settings']:
@@ -77,14 +102,15 @@ class BaseService(ABC):
 
         captcha_type = captcha.get_type()
 
-        if captcha_type not in self.supported_captchas:
+        request_class = self._task_requests.get(captcha_type)
+        if request_class is None:
             raise AnyCaptchaException(f"{captcha_type} is not supported by the current service!")
 
         if proxy:
             proxy = Proxy.from_str(proxy)
 
-        result = await self._make_request_async(
-            f"{captcha_type.value}Task", captcha, proxy, user_agent, cookies
+        result = await self._transport.make_request_async(
+            request_class(self), captcha, proxy, user_agent, cookies
         )
         task_id = str(result["task_id"])
 
@@ -94,7 +120,14 @@ class BaseService(ABC):
                                                                         Optional[float], Dict]:
         """ Returns CAPTCHA solution """
 
-        result = await self._make_request_async(f"{task.captcha.get_type().value}Solution", task)
+        captcha_type = task.captcha.get_type()
+        request_class = self._solution_requests.get(captcha_type)
+        if request_class is None:
+            raise AnyCaptchaException(
+                f"{captcha_type.value}SolutionRequest is not supported by the current service!"
+            )
+
+        result = await self._transport.make_request_async(request_class(self), task)
 
         return (
             result['solution'],  # type: ignore
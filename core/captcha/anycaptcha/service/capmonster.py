@@ -69,6 +69,8 @@ class CapMonsterRequest(HTTPRequestJSON):
 class CreateTaskRequest(CapMonsterRequest):
     """ CreateTask Request class """
 
+    idempotent = False
+
     def prepare(self, task_data: dict) -> dict:
         """ Prepare request to create a task """
         request_payload = {
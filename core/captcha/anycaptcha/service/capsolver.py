@@ -67,6 +67,8 @@ class CapSolverRequest(HTTPRequestJSON):
 class CreateTaskRequest(CapSolverRequest):
     """ CreateTask Request class """
 
+    idempotent = False
+
     def prepare(self, task_data: dict) -> dict:
         """ Prepare request to create a task """
         request_payload = {
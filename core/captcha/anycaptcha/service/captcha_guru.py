@@ -38,6 +38,7 @@ def _decorator(cls):
         """ A wrapper for *TaskRequest class """
         def __init__(self, *args, **kwargs):
             self.decorated_obj = cls(*args, **kwargs)
+            self.idempotent = self.decorated_obj.idempotent
 
         def prepare(self, *args, **kwargs):
             result = self.decorated_obj.prepare(*args, **kwargs)
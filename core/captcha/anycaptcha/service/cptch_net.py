@@ -202,6 +202,8 @@ class ReportBadRequest(ResRequest):
 class TaskRequest(InRequest):
     """ Common Task Request class """
 
+    idempotent = False
+
     def parse_response(self, response) -> dict:
         """ Parse response and return task_id """
 
@@ -177,6 +177,8 @@ class ReportBadRequest(PostRequest):
 class TaskRequest(PostRequest):
     """ Common Task Request class """
 
+    idempotent = False
+
     # pylint: disable=arguments-differ,unused-argument
     def prepare(self, captcha, proxy: Proxy, user_agent, cookies):
         """ Prepare a request """
@@ -199,6 +199,8 @@ class ReportBadRequest(ResRequest):
 class TaskRequest(InRequest):
     """ Common Task Request class """
 
+    idempotent = False
+
     # pylint: disable=arguments-differ,unused-argument
     def prepare(self, captcha, proxy: Proxy, user_agent, cookies):
         request = super().prepare(
@@ -73,9 +73,7 @@ class Request(HTTPRequestJSON):
         elif error_code in ('ERROR_ZERO_BALANCE',):
             raise errors.LowBalanceError(error_msg)
         elif error_code in ('ERROR_NO_SLOT_AVAILABLE',):
-            # If server returns ERROR_NO_SLOT_AVAILABLE make a 5 seconds timeout before sending
-            # next request.
-            # time.sleep(5)
+            # The transport pauses all requests to the provider and retries on this error
             raise errors.ServiceTooBusy(error_msg)
         elif error_code in ('MAX_USER_TURN',) or error_code.startswith('ERROR:'):
             raise errors.TooManyRequestsError(error_msg)
@@ -202,6 +200,8 @@ class ReportBadRequest(ResRequest):
 class TaskRequest(InRequest):
     """ Common Task Request class """
 
+    idempotent = False
+
     # pylint: disable=arguments-differ,unused-argument
     def prepare(self, captcha, proxy: Proxy, user_agent, cookies):
         """ Prepare a request """
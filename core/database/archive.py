@@ -0,0 +1,64 @@
+import os
+from typing import Optional
+
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, Enum, JSON
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.orm import declarative_base
+from sqlalchemy.sql import func
+
+from core.database.models import ActionStatus, ActionType
+from core.database.sqlite import configure_sqlite, sqlite_pragmas_from_settings
+from core.settings import get_settings
+
+archive_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../data/archive.db'))
+DEFAULT_ARCHIVE_URL = fr"sqlite+aiosqlite:///{archive_path}"
+
+# the archive is a separate database, its schema is created on open instead of by alembic
+ArchiveBase = declarative_base()
+
+
+class ArchivedAction(ArchiveBase):
+    """ Action moved out of the actions table by the compaction job, with the same columns """
+    __tablename__ = 'archived_actions'
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    account_id = Column(Integer, nullable=False, index=True)
+    action_type = Column(Enum(ActionType, native_enum=False), nullable=False)
+    status = Column(Enum(ActionStatus, native_enum=False))
+    payload = Column(JSON, nullable=True)
+    created_at = Column(DateTime(timezone=True))
+    updated_at = Column(DateTime(timezone=True))
+    tx_hash = Column(String, nullable=True, index=True)
+    block_number = Column(Integer, nullable=True)
+    gas_used = Column(BigInteger, nullable=True)
+    effective_gas_price = Column(BigInteger, nullable=True)
+    archived_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self):
+        return f"<ArchivedAction(id={self.id}, type={self.action_type}, status={self.status})>"
+
+
+def get_archive_url() -> str:
+    """ ARCHIVE_DATABASE_URL from the settings, or the SQLite file data/archive.db """
+    return get_settings().env.archive_database_url or DEFAULT_ARCHIVE_URL
+
+
+async def open_archive(url: Optional[str] = None) -> AsyncEngine:
+    """
+    Engine of the archive database, with its table created if missing
+
+    :param url: SQLAlchemy async database URL, the configured archive if not given
+    :return: Engine, disposed by the caller
+    """
+    url = url or get_archive_url()
+    if url == DEFAULT_ARCHIVE_URL:
+        os.makedirs(os.path.dirname(archive_path), exist_ok=True)
+
+    engine = create_async_engine(url, echo=False)
+    if make_url(url).get_backend_name() == 'sqlite':
+        configure_sqlite(engine, sqlite_pragmas_from_settings(get_settings().env))
+
+    async with engine.begin() as connection:
+        await connection.run_sync(ArchiveBase.metadata.create_all)
+    return engine
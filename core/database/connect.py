@@ -1,19 +1,97 @@
 import os
+from typing import Optional
 
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from core.database.sqlite import configure_sqlite, sqlite_pragmas_from_settings
+from core.settings import get_settings
 
 db_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../data/test.db'))
-DATABASE_URL = fr"sqlite+aiosqlite:///{db_path}"
+DEFAULT_DATABASE_URL = fr"sqlite+aiosqlite:///{db_path}"
 
-engine = create_async_engine(DATABASE_URL, echo=False)
-AsyncSessionLocal = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+# created by init_db on first use, importing this module opens nothing
+_engine: Optional[AsyncEngine] = None
+_session_factory: Optional[sessionmaker] = None
 
 
-def create_db():
-    import sqlite3
+def get_database_url() -> str:
+    """ DATABASE_URL from the settings, or the SQLite file data/test.db """
+    return get_settings().env.database_url or DEFAULT_DATABASE_URL
+
+
+def is_sqlite_url(url: str) -> bool:
+    return make_url(url).get_backend_name() == 'sqlite'
+
+
+def init_db(url: Optional[str] = None, **engine_kwargs) -> AsyncEngine:
+    """
+    Creates the engine and the session factory, replacing the current ones
+
+    Called on first use of the database; call it before to use another database,
+    e.g. ``init_db("sqlite+aiosqlite://")`` for an in-memory database in tests.
+
+    :param url: SQLAlchemy async database URL, the configured database if not given
+    :param engine_kwargs: Arguments of ``create_async_engine`` overriding the pool settings
+    :return: Engine
+    """
+    global _engine, _session_factory
+
+    env = get_settings().env
+    url = url or get_database_url()
+    is_sqlite = is_sqlite_url(url)
+
+    if is_sqlite and make_url(url).database in (None, '', ':memory:'):
+        # every connection to :memory: is a new database, all sessions share one connection
+        kwargs = dict(poolclass=StaticPool)
+    else:
+        kwargs = dict(
+            pool_size=env.database_pool_size,
+            max_overflow=env.database_max_overflow,
+            pool_timeout=env.database_pool_timeout,
+        )
+        if not is_sqlite:
+            # server connections are dropped by the server or a proxy after idling
+            kwargs.update(pool_recycle=env.database_pool_recycle, pool_pre_ping=True)
+    kwargs.update(engine_kwargs)
+
+    if url == DEFAULT_DATABASE_URL:
+        create_db()
 
-    sqlite3.connect(db_path).close()
+    _engine = create_async_engine(url, echo=False, **kwargs)
+    if is_sqlite:
+        configure_sqlite(_engine, sqlite_pragmas_from_settings(env))
+    _session_factory = sessionmaker(bind=_engine, class_=AsyncSession, expire_on_commit=False)
+    return _engine
 
 
-create_db()
\ No newline at end of file
+async def dispose_db():
+    """ Closes the connections of the engine, the next use of the database creates a new one """
+    global _engine, _session_factory
+
+    if _engine is not None:
+        await _engine.dispose()
+    _engine = _session_factory = None
+
+
+def get_engine() -> AsyncEngine:
+    if _engine is None:
+        init_db()
+    return _engine
+
+
+def get_sessionmaker() -> sessionmaker:
+    if _session_factory is None:
+        init_db()
+    return _session_factory
+
+
+def AsyncSessionLocal() -> AsyncSession:
+    """ New session of the current session factory, kept under the name of the former module-level sessionmaker """
+    return get_sessionmaker()()
+
+
+def create_db():
+    os.makedirs(os.path.dirname(db_path), exist_ok=True)
@@ -0,0 +1,40 @@
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.dml import Insert
+
+
+def insert_ignore(session: AsyncSession, model) -> Insert:
+    """
+    INSERT skipping rows that conflict with a unique constraint, on SQLite and PostgreSQL
+
+    :param session: Session the statement is executed with, its dialect picks the syntax
+    :param model: Mapped class or table
+    :return: Insert statement
+    """
+    dialect = session.bind.dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise ValueError(f"INSERT ignoring conflicts is not supported for {dialect}")
+    return insert(model).on_conflict_do_nothing()
+
+
+def utcnow() -> datetime:
+    """ Current time for timezone-aware columns, stored as UTC by both SQLite and PostgreSQL """
+    return datetime.now(timezone.utc)
+
+
+def as_naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """
+    Naive UTC datetime of a column value
+
+    SQLite returns naive UTC values and PostgreSQL aware ones, this makes them comparable
+    with ``datetime.utcnow()``.
+    """
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
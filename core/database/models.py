@@ -1,17 +1,30 @@
 import enum
 
 from sqlalchemy.orm import declarative_base
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum, Boolean, JSON, UniqueConstraint
+from sqlalchemy import Column, Integer, BigInteger, String, Date, DateTime, ForeignKey, Enum, Boolean, JSON, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
+from sqlalchemy.types import TypeDecorator
 
 Base = declarative_base()
 
 
+class Wei(TypeDecorator):
+    """Amount in wei, stored as a decimal string since it does not fit a 64-bit integer"""
+    impl = String(78)
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else str(int(value))
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else int(value)
+
 
 
 class ActionStatus(enum.Enum):
     PENDING = "pending"
+    SUBMITTED = "submitted"
     SUCCESS = "success"
     FAILED = "failed"
 
@@ -35,8 +48,14 @@ class Account(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     active = Column(Boolean)
 
+    # maintained from faucet_drips on every successful drip
+    faucet_drip_count = Column(Integer, nullable=False, default=0, server_default='0')
+    faucet_dripped_total = Column(Wei, nullable=False, default=0, server_default='0')
+    last_faucet_drip_at = Column(DateTime(timezone=True), nullable=True)
 
     actions = relationship("Action", back_populates="account")
+    faucet_drips = relationship("FaucetDrip", back_populates="account")
+    chain_state = relationship("AccountChainState", back_populates="account", uselist=False)
 
     __table_args__ = (
         UniqueConstraint('email', name='unique_email'),
@@ -54,15 +73,93 @@ class Action(Base):
     id = Column(Integer, primary_key=True, index=True)
     account_id = Column(Integer, ForeignKey('accounts.id'), nullable=False)
     account = relationship("Account", back_populates="actions")
-    action_type = Column(Enum(ActionType), nullable=False)
-    status = Column(Enum(ActionStatus), default=ActionStatus.PENDING)
+    # stored as strings (the migrations create VARCHAR columns), no native PostgreSQL enum types
+    action_type = Column(Enum(ActionType, native_enum=False), nullable=False)
+    status = Column(Enum(ActionStatus, native_enum=False), default=ActionStatus.PENDING)
     payload = Column(JSON, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    # typed copies of the transaction fields of the result, for reporting without parsing payloads
+    tx_hash = Column(String, nullable=True, index=True)
+    block_number = Column(Integer, nullable=True, index=True)
+    gas_used = Column(BigInteger, nullable=True)
+    effective_gas_price = Column(BigInteger, nullable=True)  # wei per gas
+
+    __table_args__ = (
+        Index('ix_actions_type_status_created_at', 'action_type', 'status', 'created_at'),
+        Index('ix_actions_account_id_type', 'account_id', 'action_type'),
+    )
+
     def __repr__(self):
         return f"<Action(id={self.id}, type={self.action_type}, status={self.status})>"
 
 
+class AccountChainState(Base):
+    __tablename__ = 'account_chain_states'
+
+    account_id = Column(Integer, ForeignKey('accounts.id'), primary_key=True)
+    account = relationship("Account", back_populates="chain_state")
+    balance = Column(Wei, nullable=False, default=0)
+    bonded = Column(Wei, nullable=False, default=0)
+    block_number = Column(Integer, nullable=False)  # block the amounts were read at
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<AccountChainState(account_id={self.account_id}, balance={self.balance}, bonded={self.bonded})>"
+
+
+class IndexerCursor(Base):
+    __tablename__ = 'indexer_cursors'
+
+    name = Column(String, primary_key=True)
+    block_number = Column(Integer, nullable=False)  # last block fully processed
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<IndexerCursor(name={self.name}, block_number={self.block_number})>"
+
+
+class BackfillCursor(Base):
+    __tablename__ = 'backfill_cursors'
+
+    name = Column(String, primary_key=True)
+    last_id = Column(Integer, nullable=False)  # last row id processed
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<BackfillCursor(name={self.name}, last_id={self.last_id})>"
+
 
+class FaucetDrip(Base):
+    __tablename__ = 'faucet_drips'
 
+    id = Column(Integer, primary_key=True, index=True)
+    account_id = Column(Integer, ForeignKey('accounts.id'), nullable=False, index=True)
+    account = relationship("Account", back_populates="faucet_drips")
+    action_id = Column(Integer, ForeignKey('actions.id'), nullable=True, unique=True)
+    tx_hash = Column(String, nullable=False, unique=True)
+    amount = Column(Wei, nullable=False)
+    block_number = Column(Integer, nullable=True)  # filled in by the chain indexer once the drip is mined
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self):
+        return f"<FaucetDrip(id={self.id}, account_id={self.account_id}, amount={self.amount}, tx_hash={self.tx_hash})>"
+
+
+class ActionDailySummary(Base):
+    """ Actions rolled up per account, type, status and day once the compaction job archives them """
+    __tablename__ = 'action_daily_summaries'
+
+    account_id = Column(Integer, ForeignKey('accounts.id'), primary_key=True)
+    action_type = Column(Enum(ActionType, native_enum=False), primary_key=True)
+    status = Column(Enum(ActionStatus, native_enum=False), primary_key=True)
+    day = Column(Date, primary_key=True)  # UTC day the actions were created
+    count = Column(Integer, nullable=False, default=0)
+    gas_used = Column(BigInteger, nullable=False, default=0)
+    fees = Column(Wei, nullable=False, default=0)
+    last_created_at = Column(DateTime(timezone=True), nullable=False)  # creation time of the last action of the day
+
+    def __repr__(self):
+        return (f"<ActionDailySummary(account_id={self.account_id}, action_type={self.action_type}, "
+                f"status={self.status}, day={self.day}, count={self.count})>")
@@ -0,0 +1,107 @@
+from typing import Dict, Union
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from core.utils.log import xlogger
+
+
+def sqlite_pragmas_from_settings(env) -> Dict[str, Union[int, str]]:
+    """
+    PRAGMAs of the SQLite tuning profile configured in the settings
+
+    :param env: Env settings
+    :return: PRAGMA values keyed by name, in the order they are applied
+    """
+    return {
+        'journal_mode': env.sqlite_journal_mode,
+        'synchronous': env.sqlite_synchronous,
+        'busy_timeout': env.sqlite_busy_timeout,
+        'cache_size': env.sqlite_cache_size,
+        'mmap_size': env.sqlite_mmap_size,
+    }
+
+
+def configure_sqlite(engine: AsyncEngine, pragmas: Dict[str, Union[int, str]]) -> None:
+    """
+    Applies `pragmas` to every new connection of a SQLite engine
+
+    :param engine: Async engine of a SQLite database
+    :param pragmas: PRAGMA values keyed by name
+    """
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+    xlogger.debug("SQLite PRAGMAs: " + ", ".join(f"{name}={value}" for name, value in pragmas.items()))
+
+
+async def enable_incremental_vacuum(engine: AsyncEngine) -> bool:
+    """
+    Switches a SQLite database to ``auto_vacuum=INCREMENTAL``
+
+    The switch takes one full VACUUM, which locks the database for as long as it copies
+    it, so it has to run before anything else uses the database.
+
+    :param engine: Async engine of a SQLite database
+    :return: Whether the database was switched, False if it already was
+    """
+    # VACUUM cannot run inside a transaction
+    async with engine.connect() as connection:
+        connection = await connection.execution_options(isolation_level="AUTOCOMMIT")
+
+        auto_vacuum = (await connection.exec_driver_sql("PRAGMA auto_vacuum")).scalar()
+        if auto_vacuum == 2:
+            return False
+        xlogger.info("Switching the SQLite database to incremental auto_vacuum, running a full VACUUM once")
+        await connection.exec_driver_sql("PRAGMA auto_vacuum=INCREMENTAL")
+        await connection.exec_driver_sql("VACUUM")
+    return True
+
+
+async def sqlite_maintenance(engine: AsyncEngine, vacuum_pages: int, analysis_limit: int) -> int:
+    """
+    Returns free pages of a SQLite database to the file system and refreshes the query planner statistics
+
+    Both are bounded: ``incremental_vacuum`` frees at most `vacuum_pages` pages and ``optimize``
+    samples at most `analysis_limit` rows per index, so the database is not locked for a full
+    VACUUM or ANALYZE. Pages are only freed once ``enable_incremental_vacuum`` switched the database.
+
+    :param engine: Async engine of a SQLite database
+    :param vacuum_pages: Maximum pages freed
+    :param analysis_limit: Rows sampled per index by ANALYZE
+    :return: Number of pages freed
+    """
+    async with engine.connect() as connection:
+        connection = await connection.execution_options(isolation_level="AUTOCOMMIT")
+
+        freed = free_pages = 0
+        auto_vacuum = (await connection.exec_driver_sql("PRAGMA auto_vacuum")).scalar()
+        if auto_vacuum == 2:
+            free_pages = (await connection.exec_driver_sql("PRAGMA freelist_count")).scalar()
+            # every step of the statement frees one page, sqlite3 steps it to the end only in executescript
+            driver_connection = (await connection.get_raw_connection()).driver_connection
+            await driver_connection.executescript(f"PRAGMA incremental_vacuum({int(vacuum_pages)});")
+            freed = free_pages - (await connection.exec_driver_sql("PRAGMA freelist_count")).scalar()
+        else:
+            xlogger.debug("SQLite database is not in incremental auto_vacuum mode, no pages freed")
+
+        await connection.exec_driver_sql(f"PRAGMA analysis_limit={int(analysis_limit)}")
+        analyzed = (await connection.exec_driver_sql(
+            "SELECT count(*) FROM sqlite_master WHERE name = 'sqlite_stat1'"
+        )).scalar()
+        if analyzed:
+            # 0x10002: analyze every table that needs it, not only those this connection queried
+            await connection.exec_driver_sql("PRAGMA optimize=0x10002")
+        else:
+            # optimize only refreshes existing statistics, the first ANALYZE is sampled by analysis_limit
+            await connection.exec_driver_sql("ANALYZE")
+
+    xlogger.debug(f"SQLite maintenance freed {freed} of {free_pages} free pages")
+    return freed
@@ -0,0 +1,135 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.database.connect import AsyncSessionLocal
+from core.settings import settings
+from core.utils.log import xlogger
+
+
+WRITE_BATCH_MAX = 500  # writes grouped into one transaction at most
+
+WriteOperation = Callable[[AsyncSession], Awaitable[Any]]
+
+
+class DatabaseWriter:
+    """
+    Single writer task grouping the writes of all workers into shared transactions
+
+    Workers submit write operations, coroutine functions taking the writer's session.
+    The writer collects them for ``DB_WRITE_BATCH_MS`` and runs the batch in one
+    transaction, so the database sees one commit instead of one per write. Each operation
+    is flushed before the next one runs, so it sees what the earlier ones wrote. The future
+    of each operation resolves to its return value once the transaction is committed.
+    If the batch fails, its operations are retried one transaction each so a single
+    bad write does not fail the others.
+    """
+
+    _writers: Dict[int, 'DatabaseWriter'] = {}
+
+    def __init__(
+            self,
+            session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+            batch_interval: Optional[float] = None,
+            batch_max: int = WRITE_BATCH_MAX
+    ):
+        self.session_factory = session_factory
+        self.batch_interval = settings.env.db_write_batch_ms / 1000 if batch_interval is None else batch_interval
+        self.batch_max = batch_max
+
+        self._loop = asyncio.get_running_loop()
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+        self.batches = 0
+        self.writes = 0
+
+    @classmethod
+    def get(cls, session_factory: Callable[[], AsyncSession] = AsyncSessionLocal) -> 'DatabaseWriter':
+        """
+        Returns the writer of the session factory, creating it on first use in the running loop
+
+        :param session_factory: Session factory of the database
+        :return: Database writer
+        """
+
+        key = id(session_factory)
+        writer = cls._writers.get(key)
+        # the queue and the writer task are bound to the loop they were created in
+        if writer is None or writer._loop is not asyncio.get_running_loop():
+            writer = cls._writers[key] = cls(session_factory)
+        return writer
+
+    async def submit(self, operation: WriteOperation) -> Any:
+        """
+        Queues a write and waits until it is committed
+
+        :param operation: Coroutine function doing the write with the given session, without committing
+        :return: Return value of the operation, objects it added have their ids once it resolves
+        """
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+        future = self._loop.create_future()
+        await self._queue.put((operation, future))
+        return await future
+
+    async def close(self):
+        """ Commits the queued writes and stops the writer task """
+
+        if self._task is not None and not self._task.done():
+            await self._queue.join()
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    async def _run(self):
+        while True:
+            batch = [await self._queue.get()]
+            # let the other workers add their writes to this transaction
+            await asyncio.sleep(self.batch_interval)
+            while len(batch) < self.batch_max and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            try:
+                await self._write(batch)
+            except Exception as e:
+                xlogger.error(f"Database writer failed: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _write(self, batch: List[Tuple[WriteOperation, asyncio.Future]]):
+        try:
+            async with self.session_factory() as session:
+                results = []
+                for operation, _ in batch:
+                    results.append(await operation(session))
+                    # later operations may look up rows this one added, e.g. a drip already in the ledger
+                    await session.flush()
+                await session.commit()
+        except Exception as e:
+            if len(batch) == 1:
+                raise
+            xlogger.warning(f"Batch of {len(batch)} writes failed, retrying them one by one: {e}")
+            for item in batch:
+                try:
+                    await self._write([item])
+                except Exception as item_error:
+                    if not item[1].done():
+                        item[1].set_exception(item_error)
+            return
+
+        self.batches += 1
+        self.writes += len(batch)
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+        xlogger.debug(f"Database writer committed {len(batch)} writes")
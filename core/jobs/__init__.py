@@ -6,7 +6,13 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.database.connect import AsyncSessionLocal
 from core.database.models import ActionType
+from core.jobs.backfill import backfill_action_result_columns
+from core.jobs.compaction import compact_database, compaction_loop
+from core.jobs.confirmation import confirmation_loop
+from core.jobs.indexer import indexer_loop
 from core.services.action_service import ActionService
+from core.settings import settings
+from core.utils.w3.cache import RpcResponseCache
 from core.utils.log import xlogger
 
 
@@ -19,6 +25,32 @@ async def perform_stake_for_all(session: AsyncSession):
 
 
 async def main_loop():
+    try:
+        await backfill_action_result_columns()
+    except Exception as e:
+        xlogger.error(f"Error backfilling action result columns: {e}")
+
+    # references keep the background tasks from being garbage collected
+    compaction_task = None
+    if settings.env.action_retention_days > 0:
+        # before any job starts, the first compaction may VACUUM the whole database
+        try:
+            await compact_database(startup=True)
+        except Exception as e:
+            xlogger.error(f"Error compacting the database: {e}")
+        xlogger.info(f"Keeping actions for {settings.env.action_retention_days} days, starting compaction job")
+        compaction_task = asyncio.create_task(compaction_loop())
+
+    confirmation_task = None
+    if settings.env.deferred_stake_confirmation:
+        xlogger.info("Deferred stake confirmation enabled, starting confirmation job")
+        confirmation_task = asyncio.create_task(confirmation_loop())
+
+    indexer_task = None
+    if settings.env.chain_indexer:
+        xlogger.info("Chain indexer enabled, starting indexer job")
+        indexer_task = asyncio.create_task(indexer_loop())
+
     while True:
         start_time = datetime.now()
         xlogger.info(f"Starting stake job at {start_time}")
@@ -32,6 +64,7 @@ async def main_loop():
         end_time = datetime.now()
         execution_time = end_time - start_time
         xlogger.info(f"Stake job completed. Execution time: {execution_time}")
+        xlogger.info(RpcResponseCache.report())
 
 
         next_run_delay = 23 * 3600
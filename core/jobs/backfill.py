@@ -0,0 +1,44 @@
+from sqlalchemy.future import select
+
+from core.database.connect import AsyncSessionLocal
+from core.database.models import Action, BackfillCursor
+from core.services.action_results import apply_result_columns
+from core.utils.log import xlogger
+
+
+BACKFILL_CURSOR = 'action_result_columns'  # last action id whose payload was copied to the typed columns
+BACKFILL_BATCH_SIZE = 500  # actions per transaction
+
+
+async def backfill_action_result_columns(batch_size: int = BACKFILL_BATCH_SIZE) -> int:
+    """
+    Copies transaction fields from the payloads of actions created before the typed columns existed
+
+    Resumes after the last action id processed, so every action is parsed once.
+
+    :param batch_size: Actions per transaction
+    :return: Number of actions updated
+    """
+    updated = 0
+    while True:
+        async with AsyncSessionLocal() as session:
+            cursor = await session.get(BackfillCursor, BACKFILL_CURSOR)
+            last_id = cursor.last_id if cursor else 0
+
+            result = await session.execute(
+                select(Action).where(Action.id > last_id).order_by(Action.id).limit(batch_size)
+            )
+            actions = result.scalars().all()
+            if not actions:
+                break
+
+            for action in actions:
+                if action.tx_hash is None and action.payload and apply_result_columns(action, action.payload):
+                    updated += 1
+
+            await session.merge(BackfillCursor(name=BACKFILL_CURSOR, last_id=actions[-1].id))
+            await session.commit()
+
+    if updated:
+        xlogger.info(f"Typed result columns backfilled for {updated} actions")
+    return updated
@@ -0,0 +1,42 @@
+import asyncio
+
+from core.database.connect import get_database_url, get_engine, is_sqlite_url
+from core.database.sqlite import enable_incremental_vacuum, sqlite_maintenance
+from core.services.action_archive import ActionArchive
+from core.settings import settings
+from core.utils.log import xlogger
+
+
+COMPACTION_INTERVAL = 24 * 3600  # seconds between compactions
+VACUUM_PAGES = 10000  # free pages returned to the file system per run, 40 MB with 4 KiB pages
+ANALYSIS_LIMIT = 1000  # rows sampled per index when refreshing the planner statistics
+
+
+async def compact_database(startup: bool = False):
+    """
+    Archives actions past the retention window, then vacuums and analyzes a SQLite database incrementally
+
+    :param startup: Whether nothing else uses the database yet, the only time a SQLite
+        database is switched to incremental auto_vacuum (one full VACUUM)
+    """
+    await ActionArchive.compact(settings.env.action_retention_days)
+
+    # PostgreSQL reclaims and analyzes deleted rows with autovacuum
+    if is_sqlite_url(get_database_url()):
+        if startup:
+            await enable_incremental_vacuum(get_engine())
+        await sqlite_maintenance(get_engine(), VACUUM_PAGES, ANALYSIS_LIMIT)
+
+
+async def compaction_loop():
+    """
+    Background job keeping the actions table to the retention window, started after the
+    startup compaction so that it never runs a full VACUUM next to the other jobs
+    """
+    while True:
+        await asyncio.sleep(COMPACTION_INTERVAL)
+
+        try:
+            await compact_database()
+        except Exception as e:
+            xlogger.error(f"Error in compaction job: {e}")
@@ -0,0 +1,99 @@
+import asyncio
+from typing import Set
+
+from hexbytes import HexBytes
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from web3 import Web3
+from web3.exceptions import TimeExhausted, TransactionNotFound
+
+from core.database.connect import AsyncSessionLocal
+from core.database.writer import DatabaseWriter
+from core.database.models import Account, Action, ActionStatus
+from core.services.action_service import ActionService
+from core.services.handlers.stake import StakeActionHandler
+from core.utils.log import xlogger
+from core.utils.w3.nonce import NonceManager
+from core.utils.w3.pool import AsyncWeb3Pool
+from core.utils.w3.receipts import ReceiptTracker
+
+
+CONFIRMATION_INTERVAL = 15  # seconds between sweeps for new submitted actions
+CONFIRMATION_TIMEOUT = 300  # seconds a submitted transaction is watched before a direct lookup
+
+
+async def confirm_action(action_id: int, tx_hash: str, address: str):
+    """
+    Waits for the receipt of a submitted action and stores the final status
+    """
+    rpc_url = StakeActionHandler.rpc_url()
+    tx_hash = HexBytes(tx_hash)
+    try:
+        receipt = await ReceiptTracker.get(rpc_url).wait(tx_hash, timeout=CONFIRMATION_TIMEOUT)
+    except TimeExhausted:
+        # mined before it was watched (e.g. submitted before a restart) or dropped
+        try:
+            receipt = await AsyncWeb3Pool.get(rpc_url).eth.get_transaction_receipt(tx_hash)
+        except TransactionNotFound:
+            receipt = None
+
+    if receipt is not None:
+        result = StakeActionHandler.receipt_result(receipt)
+    else:
+        # a dropped transaction leaves a gap at its nonce, the next stake of the address reads it again
+        NonceManager.get(rpc_url).reset(Web3.to_checksum_address(address))
+        result = {
+            'status': 'failed',
+            'error': f"Transaction {tx_hash.hex()} is not in the chain after {CONFIRMATION_TIMEOUT} seconds"
+        }
+
+    async def store(write_session: AsyncSession) -> bool:
+        action = await write_session.get(Action, action_id)
+        if action is None or action.status != ActionStatus.SUBMITTED:
+            return False
+        ActionService.apply_result(action, result)
+        return True
+
+    # committed together with the writes of the stake workers
+    if not await DatabaseWriter.get().submit(store):
+        return
+
+    xlogger.info(f"Action {action_id} confirmed as {result['status']}. TX: {tx_hash.hex()}")
+
+
+async def confirmation_loop():
+    """
+    Background job confirming actions recorded as SUBMITTED from their receipts
+    """
+    watched: Set[int] = set()
+    tasks: Set[asyncio.Task] = set()
+
+    def on_done(task: asyncio.Task, action_id: int):
+        tasks.discard(task)
+        watched.discard(action_id)
+        if not task.cancelled() and task.exception() is not None:
+            xlogger.error(f"Error confirming action {action_id}: {task.exception()}")
+
+    while True:
+        try:
+            async with AsyncSessionLocal() as session:
+                result = await session.execute(
+                    select(Action.id, Action.payload, Account.address)
+                    .join(Account, Action.account_id == Account.id)
+                    .filter(Action.status == ActionStatus.SUBMITTED)
+                )
+                submitted = result.all()
+
+            for action_id, payload, address in submitted:
+                tx_hash = (payload or {}).get('transaction_hash')
+                if action_id in watched or not tx_hash:
+                    continue
+
+                watched.add(action_id)
+                task = asyncio.create_task(confirm_action(action_id, tx_hash, address))
+                task.add_done_callback(lambda t, action_id=action_id: on_done(t, action_id))
+                tasks.add(task)
+        except Exception as e:
+            xlogger.error(f"Error in confirmation job: {e}")
+
+        await asyncio.sleep(CONFIRMATION_INTERVAL)
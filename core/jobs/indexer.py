@@ -0,0 +1,22 @@
+import asyncio
+
+from core.services.handlers.stake import StakeActionHandler
+from core.services.indexer import ChainIndexer
+from core.utils.log import xlogger
+
+
+INDEXER_INTERVAL = 60  # seconds between index syncs
+
+
+async def indexer_loop():
+    """
+    Background job keeping balances and stakes of the accounts indexed
+    """
+    while True:
+        try:
+            block_number, states = await ChainIndexer.get(StakeActionHandler.rpc_url()).sync()
+            xlogger.info(f"Chain index synced to block {block_number} for {len(states)} accounts")
+        except Exception as e:
+            xlogger.error(f"Error in chain indexer job: {e}")
+
+        await asyncio.sleep(INDEXER_INTERVAL)
@@ -9,6 +9,7 @@ from sqlalchemy.exc import IntegrityError
 from browserforge.headers import HeaderGenerator
 
 from core.database.connect import AsyncSessionLocal
+from core.database.dialect import insert_ignore
 from core.database.models import Account
 from core.utils.log import xlogger
 from core.utils.w3.address import get_address_from_private_key
@@ -37,6 +38,15 @@ async def create_accounts(account_data_file: str, proxy_file: str) -> AccountCre
         async with AsyncSessionLocal() as session:
             proxy_index = 0
 
+            # one query instead of a lookup per row, rows of the file itself are added as they are accepted
+            existing = await session.execute(select(Account.email, Account.private_key))
+            existing_keys_by_email = {}
+            existing_keys = set()
+            for existing_email, existing_key in existing.all():
+                existing_keys_by_email[existing_email] = existing_key
+                existing_keys.add(existing_key)
+            new_accounts = []
+
 
             with open(account_data_file, 'r') as csvfile:
                 reader = csv.reader(csvfile, delimiter='|')
@@ -72,57 +82,60 @@ async def create_accounts(account_data_file: str, proxy_file: str) -> AccountCre
                             continue
 
 
-                        existing_account = await session.execute(
-                            select(Account).filter(
-                                (Account.email == email) |
-                                (Account.private_key == private_key) |
-                                (Account.address == address)
-                            )
-                        )
-                        existing_account = existing_account.scalar_one_or_none()
-
-                        if existing_account:
-
-                            if existing_account.email == email and existing_account.private_key != private_key:
-                                result.duplicates += 1
-                                message = f"Duplicate email {email}. Existing private key differs."
-                                xlogger.error(message)
-                                result.skipped_details.append(message)
-                                result.skipped_accounts += 1
-                                continue
+                        if email in existing_keys_by_email and existing_keys_by_email[email] != private_key:
+                            result.duplicates += 1
+                            message = f"Duplicate email {email}. Existing private key differs."
+                            xlogger.error(message)
+                            result.skipped_details.append(message)
+                            result.skipped_accounts += 1
+                            continue
 
-                            if existing_account.private_key == private_key:
+                        if private_key in existing_keys:
 
-                                result.duplicates += 1
-                                message = f"Account {email} already exists."
-                                xlogger.error(message)
-                                result.skipped_details.append(message)
-                                result.skipped_accounts += 1
-                                continue
+                            result.duplicates += 1
+                            message = f"Account {email} already exists."
+                            xlogger.error(message)
+                            result.skipped_details.append(message)
+                            result.skipped_accounts += 1
+                            continue
 
                         proxy = proxies[proxy_index] if proxies and proxy_index < len(proxies) else None
                         headers_account = headers.generate()
-                        new_account = Account(
+                        new_accounts.append(dict(
                             email=email,
                             private_key=private_key,
                             proxy=proxy,
                             active=True,
                             address=address,
                             headers=headers_account,
-                        )
-
-                        session.add(new_account)
+                        ))
+                        existing_keys_by_email[email] = private_key
+                        existing_keys.add(private_key)
 
                         proxy_index = (proxy_index + 1) % len(proxies) if proxies else 0
 
-                        result.added_accounts += 1
-
                     except Exception as account_error:
                         message = f"Error processing {email}: {str(account_error)}"
                         xlogger.error(message)
                         result.errors.append(message)
                         result.skipped_accounts += 1
 
+                if new_accounts:
+                    # another worker host may add the same accounts meanwhile, those rows are skipped
+                    inserted = await session.execute(
+                        insert_ignore(session, Account).returning(Account.email), new_accounts
+                    )
+                    inserted_emails = set(inserted.scalars().all())
+                    result.added_accounts += len(inserted_emails)
+
+                    for account in new_accounts:
+                        if account['email'] in inserted_emails:
+                            continue
+                        result.duplicates += 1
+                        message = f"Account {account['email']} was added by another worker meanwhile."
+                        xlogger.error(message)
+                        result.skipped_details.append(message)
+                        result.skipped_accounts += 1
                 await session.commit()
 
     except FileNotFoundError:
@@ -0,0 +1,150 @@
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, func, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.orm import sessionmaker
+
+from core.database.archive import ArchivedAction, open_archive
+from core.database.connect import AsyncSessionLocal
+from core.database.dialect import as_naive_utc, insert_ignore, utcnow
+from core.database.models import Action, ActionDailySummary, ActionStatus, ActionType, FaucetDrip
+from core.utils.log import xlogger
+
+
+COMPACTION_BATCH_SIZE = 1000  # actions archived per transaction
+COMPACTED_STATUSES = (ActionStatus.SUCCESS, ActionStatus.FAILED)  # pending and submitted actions stay for their jobs
+
+
+@dataclass
+class CompactionResult:
+    archived: int = 0
+    summaries: int = 0  # daily summary rows created or updated
+
+
+def compaction_cutoff(retention_days: int, now: Optional[datetime] = None) -> datetime:
+    """ Start of the UTC day `retention_days` ago, actions created before it are compacted """
+    now = now or utcnow()
+    return (now - timedelta(days=retention_days)).replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+class ActionArchive:
+    """
+    Keeps the actions table small by rolling old actions up into daily summaries and moving them to the archive
+    """
+
+    @classmethod
+    async def compact(
+            cls,
+            retention_days: int,
+            batch_size: int = COMPACTION_BATCH_SIZE,
+            archive_url: Optional[str] = None
+    ) -> CompactionResult:
+        """
+        Archives finished actions created before the retention window, one batch per transaction
+
+        Each batch is copied to the archive database first and then, in one transaction of the
+        main database, added to the daily summaries and deleted. A batch interrupted in between
+        is copied again on the next run, which skips the rows already archived.
+
+        :param retention_days: Days actions stay in the actions table
+        :param batch_size: Actions per transaction
+        :param archive_url: Archive database URL, the configured archive if not given
+        :return: Numbers of actions archived and summaries written
+        """
+        cutoff = compaction_cutoff(retention_days)
+        compaction = CompactionResult()
+
+        archive_engine = await open_archive(archive_url)
+        archive_session_factory = sessionmaker(bind=archive_engine, class_=AsyncSession, expire_on_commit=False)
+        try:
+            while True:
+                async with AsyncSessionLocal() as session:
+                    result = await session.execute(
+                        select(Action)
+                        .where(Action.created_at < cutoff, Action.status.in_(COMPACTED_STATUSES))
+                        .order_by(Action.id)
+                        .limit(batch_size)
+                    )
+                    actions = result.scalars().all()
+                    if not actions:
+                        break
+
+                    await cls._archive(archive_session_factory, actions)
+                    compaction.summaries += await cls._summarize(session, actions)
+
+                    action_ids = [action.id for action in actions]
+                    # drips keep their tx hash, the action they came from is in the archive
+                    await session.execute(
+                        update(FaucetDrip).where(FaucetDrip.action_id.in_(action_ids)).values(action_id=None)
+                    )
+                    await session.execute(delete(Action).where(Action.id.in_(action_ids)))
+                    await session.commit()
+
+                compaction.archived += len(actions)
+                xlogger.debug(f"Archived {len(actions)} actions up to id {action_ids[-1]}")
+        finally:
+            await archive_engine.dispose()
+
+        if compaction.archived:
+            xlogger.info(f"Archived {compaction.archived} actions created before {cutoff:%Y-%m-%d}, "
+                         f"{compaction.summaries} daily summaries written")
+        return compaction
+
+    @classmethod
+    async def _archive(cls, archive_session_factory: sessionmaker, actions: List[Action]):
+        rows = [
+            {column.key: getattr(action, column.key) for column in Action.__table__.columns}
+            for action in actions
+        ]
+        async with archive_session_factory() as archive_session:
+            await archive_session.execute(insert_ignore(archive_session, ArchivedAction), rows)
+            await archive_session.commit()
+
+    @classmethod
+    async def _summarize(cls, session: AsyncSession, actions: List[Action]) -> int:
+        totals: Dict[Tuple[int, ActionType, ActionStatus, date], List] = {}
+        for action in actions:
+            created_at = as_naive_utc(action.created_at)
+            key = (action.account_id, action.action_type, action.status, created_at.date())
+            count, gas_used, fees, last_created_at = totals.get(key, (0, 0, 0, created_at))
+            totals[key] = [
+                count + 1,
+                gas_used + (action.gas_used or 0),
+                fees + (action.gas_used or 0) * (action.effective_gas_price or 0),
+                max(last_created_at, created_at),
+            ]
+
+        for (account_id, action_type, status, day), (count, gas_used, fees, last_created_at) in totals.items():
+            summary = await session.get(ActionDailySummary, (account_id, action_type, status, day))
+            if summary is None:
+                session.add(ActionDailySummary(
+                    account_id=account_id, action_type=action_type, status=status, day=day,
+                    count=count, gas_used=gas_used, fees=fees, last_created_at=last_created_at
+                ))
+                continue
+            # actions of a day still pending at the previous run are added to its summary
+            summary.count += count
+            summary.gas_used += gas_used
+            summary.fees += fees
+            summary.last_created_at = max(as_naive_utc(summary.last_created_at), last_created_at)
+        return len(totals)
+
+    @classmethod
+    async def last_success_at(
+            cls,
+            session: AsyncSession,
+            account_id: int,
+            action_type: ActionType
+    ) -> Optional[datetime]:
+        """ Creation time of the last successful action of an account among the archived ones, naive UTC """
+        result = await session.execute(
+            select(func.max(ActionDailySummary.last_created_at)).where(
+                ActionDailySummary.account_id == account_id,
+                ActionDailySummary.action_type == action_type,
+                ActionDailySummary.status == ActionStatus.SUCCESS
+            )
+        )
+        return as_naive_utc(result.scalar())
@@ -0,0 +1,137 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from core.database.models import Action, ActionDailySummary, ActionStatus, ActionType
+
+
+TX_HASH_RESULT_KEYS = ('transaction_hash', 'hash')  # stake results use the first, faucet results the second
+
+
+def normalize_tx_hash(tx_hash: Optional[str]) -> Optional[str]:
+    """ Lowercase 0x-prefixed transaction hash, results store it with and without the prefix """
+
+    if not tx_hash:
+        return None
+    tx_hash = str(tx_hash).lower()
+    return tx_hash if tx_hash.startswith('0x') else '0x' + tx_hash
+
+
+def apply_result_columns(action: Action, result: Dict[str, Any]) -> bool:
+    """
+    Copies the transaction fields of a handler result (or payload) to the typed columns of the action
+
+    :param action: Action
+    :param result: Handler result or stored payload
+    :return: Whether any column was set
+    """
+
+    tx_hash = next((result[key] for key in TX_HASH_RESULT_KEYS if result.get(key)), None)
+    columns = {
+        'tx_hash': normalize_tx_hash(tx_hash),
+        'block_number': result.get('block_number'),
+        'gas_used': result.get('gas_used'),
+        'effective_gas_price': result.get('effective_gas_price'),
+    }
+    changed = False
+    for column, value in columns.items():
+        if value is not None:
+            setattr(action, column, int(value) if column != 'tx_hash' else value)
+            changed = True
+    return changed
+
+
+@dataclass
+class StakeCostSummary:
+    stakes: int
+    gas_used: int
+    fees: int  # wei
+
+
+class ActionReports:
+    """ Reporting queries over the typed result columns of actions """
+
+    @classmethod
+    async def find_by_tx_hash(cls, session: AsyncSession, tx_hash: str) -> Optional[Action]:
+        result = await session.execute(select(Action).where(Action.tx_hash == normalize_tx_hash(tx_hash)))
+        return result.scalars().first()
+
+    @classmethod
+    async def stake_costs(cls, session: AsyncSession, since: Optional[datetime] = None) -> StakeCostSummary:
+        """
+        Number of successful stakes, gas used and fees paid for them, archived stakes included
+
+        :param session: Session
+        :param since: Only actions created from this time on, archived ones from its day on
+        :return: Stake cost summary
+        """
+
+        query = select(Action.gas_used, Action.effective_gas_price) \
+            .where(Action.action_type == ActionType.STAKE, Action.status == ActionStatus.SUCCESS)
+        archived_query = select(ActionDailySummary.count, ActionDailySummary.gas_used, ActionDailySummary.fees) \
+            .where(ActionDailySummary.action_type == ActionType.STAKE, ActionDailySummary.status == ActionStatus.SUCCESS)
+        if since is not None:
+            query = query.where(Action.created_at >= since)
+            archived_query = archived_query.where(ActionDailySummary.day >= since.date())
+
+        # fees are added up here, in wei their total soon overflows the 64-bit integers of SQLite
+        stakes = gas_used = fees = 0
+        for row_gas_used, effective_gas_price in (await session.execute(query)).all():
+            stakes += 1
+            gas_used += row_gas_used or 0
+            fees += (row_gas_used or 0) * (effective_gas_price or 0)
+
+        # the daily fee totals are decimal strings, SQL would sum them as numbers of limited precision
+        for count, summary_gas_used, summary_fees in (await session.execute(archived_query)).all():
+            stakes += count
+            gas_used += summary_gas_used
+            fees += summary_fees
+        return StakeCostSummary(stakes=stakes, gas_used=gas_used, fees=fees)
+
+    @classmethod
+    async def daily_counts(
+            cls,
+            session: AsyncSession,
+            action_type: ActionType,
+            since: Optional[datetime] = None
+    ) -> List[Tuple[str, ActionStatus, int]]:
+        """
+        Actions of a type per day and status, archived days included
+
+        :param session: Session
+        :param action_type: Action type
+        :param since: Only actions created from this time on, archived ones from its day on
+        :return: (day, status, count) rows ordered by day and status
+        """
+
+        # date() is a function in SQLite and a cast in PostgreSQL, CAST(.. AS DATE) is not portable to SQLite
+        day = func.date(Action.created_at)
+        query = select(day, Action.status, func.count(Action.id)) \
+            .where(Action.action_type == action_type) \
+            .group_by(day, Action.status) \
+            .order_by(day)
+        archived_query = select(ActionDailySummary.day, ActionDailySummary.status, func.sum(ActionDailySummary.count)) \
+            .where(ActionDailySummary.action_type == action_type) \
+            .group_by(ActionDailySummary.day, ActionDailySummary.status)
+        if since is not None:
+            query = query.where(Action.created_at >= since)
+            archived_query = archived_query.where(ActionDailySummary.day >= since.date())
+
+        # a day can be partly archived, its counts are added up
+        counts: Dict[Tuple[str, ActionStatus], int] = {}
+        for row_day, status, count in (await session.execute(archived_query)).all() + (await session.execute(query)).all():
+            counts[(str(row_day), status)] = counts.get((str(row_day), status), 0) + int(count)
+        return [(row_day, status, count) for (row_day, status), count in sorted(counts.items(), key=lambda item: (item[0][0], item[0][1].value))]
+
+    @classmethod
+    async def actions_in_blocks(cls, session: AsyncSession, from_block: int, to_block: int) -> List[Action]:
+        """ Actions whose transaction was mined in blocks `from_block`..`to_block` """
+
+        result = await session.execute(
+            select(Action).where(Action.block_number.between(from_block, to_block)).order_by(Action.block_number)
+        )
+        return list(result.scalars().all())
@@ -9,7 +9,12 @@ from datetime import datetime, timedelta
 from sqlalchemy.orm import selectinload
 
 from core.database.connect import AsyncSessionLocal
+from core.database.dialect import as_naive_utc
+from core.database.writer import DatabaseWriter
 from core.database.models import ActionType, Action, ActionStatus, Account
+from core.services.action_archive import ActionArchive
+from core.services.action_results import apply_result_columns
+from core.services.faucet_ledger import FaucetLedger
 from core.services.handlers import ActionHandlerRegistry
 from core.settings import settings
 from core.utils.log import xlogger
@@ -51,16 +56,16 @@ class ActionDependencyManager:
         for required_action in dependencies.get('required_actions', []):
             xlogger.debug(f"Checking dependency: {required_action}")
 
-            last_action = await cls._get_last_successful_action(
+            last_success_at = await cls._get_last_success_time(
                 session, account_id, required_action
             )
 
-            if last_action:
+            if last_success_at:
                 time_constraints = dependencies.get('time_constraints', {}).get(required_action)
                 if time_constraints:
                     max_age = time_constraints.get('max_age_hours')
                     if max_age:
-                        age = datetime.utcnow() - last_action.created_at
+                        age = datetime.utcnow() - last_success_at
                         xlogger.debug(f"Last {required_action} was {age} ago, max allowed {max_age} hours")
 
                         if age > timedelta(hours=max_age):
@@ -88,11 +93,11 @@ class ActionDependencyManager:
         for required_action in dependencies.get('required_actions', []):
             xlogger.debug(f"Checking required action: {required_action}")
 
-            last_action = await cls._get_last_successful_action(
+            last_success_at = await cls._get_last_success_time(
                 session, account_id, required_action
             )
 
-            if not last_action:
+            if not last_success_at:
                 xlogger.debug(f"No successful {required_action} found")
                 return False
 
@@ -100,7 +105,7 @@ class ActionDependencyManager:
             if time_constraints:
                 max_age = time_constraints.get('max_age_hours')
                 if max_age:
-                    age = datetime.utcnow() - last_action.created_at
+                    age = datetime.utcnow() - last_success_at
                     xlogger.debug(f"Last {required_action} was {age} ago, max allowed {max_age} hours")
 
                     if age > timedelta(hours=max_age):
@@ -110,6 +115,26 @@ class ActionDependencyManager:
         xlogger.debug(f"All dependencies for {action_type} are satisfied")
         return True
 
+    @classmethod
+    async def _get_last_success_time(
+            cls,
+            session: AsyncSession,
+            account_id: int,
+            action_type: ActionType
+    ):
+        # naive UTC whatever the database returns, ages are computed against datetime.utcnow()
+        if action_type == ActionType.FAUCET:
+            # kept on the account by the faucet ledger, no scan of the actions
+            last_drip_at = await FaucetLedger.last_drip_at(session, account_id)
+            if last_drip_at:
+                return as_naive_utc(last_drip_at)
+
+        last_action = await cls._get_last_successful_action(session, account_id, action_type)
+        if last_action:
+            return as_naive_utc(last_action.created_at)
+        # e.g. the waitlist signup, done once and archived by the compaction job since
+        return await ActionArchive.last_success_at(session, account_id, action_type)
+
     @classmethod
     async def _get_last_successful_action(
             cls,
@@ -121,7 +146,7 @@ class ActionDependencyManager:
             Action.account_id == account_id,
             Action.action_type == action_type,
             Action.status == ActionStatus.SUCCESS
-        ).order_by(Action.created_at.desc()).limit(1)
+        ).order_by(Action.created_at.desc(), Action.id.desc()).limit(1)
 
         result = await session.execute(query)
         last_action = result.scalar_one_or_none()
@@ -130,7 +155,7 @@ class ActionDependencyManager:
             xlogger.debug(f"Last successful {action_type} action:")
             xlogger.debug(f"ID: {last_action.id}")
             xlogger.debug(f"Created At: {last_action.created_at}")
-            xlogger.debug(f"Time since last action: {datetime.utcnow() - last_action.created_at}")
+            xlogger.debug(f"Time since last action: {datetime.utcnow() - as_naive_utc(last_action.created_at)}")
         else:
             xlogger.warning(f"No successful {action_type} action found")
         return last_action
@@ -159,19 +184,42 @@ class ActionService:
             xlogger.warning(f"Action {action_type} is not allowed for account {account_id}")
             raise ValueError(f"Action {action_type} is not allowed")
 
-        action = Action(
-            account_id=account_id,
-            action_type=action_type,
-            status=ActionStatus.PENDING,
-            payload=payload or {}
-        )
-
-        session.add(action)
+        # ends the read transaction, later checks of this session must see what the writer commits
         await session.commit()
 
+        async def insert(write_session: AsyncSession) -> Action:
+            action = Action(
+                account_id=account_id,
+                action_type=action_type,
+                status=ActionStatus.PENDING,
+                payload=payload or {}
+            )
+            write_session.add(action)
+            return action
+
+        action = await DatabaseWriter.get().submit(insert)
+
         xlogger.debug(f"Action {action_type} created for account {account_id}")
         return action
 
+    @classmethod
+    def apply_result(cls, action: Action, result: dict):
+        """
+        Sets the status, payload and result columns of an action from a handler result
+        """
+        # payload is reassigned, in-place changes of a JSON column are not tracked
+        if result['status'] == 'success':
+            action.status = ActionStatus.SUCCESS
+            action.payload = {**(action.payload or {}), **result}
+            apply_result_columns(action, result)
+        elif result['status'] == 'submitted':
+            action.status = ActionStatus.SUBMITTED
+            action.payload = {**(action.payload or {}), **result}
+            apply_result_columns(action, result)
+        else:
+            action.status = ActionStatus.FAILED
+            action.payload = {**(action.payload or {}), 'error': result.get('error')}
+
     @classmethod
     async def execute_action(
             cls,
@@ -184,14 +232,15 @@ class ActionService:
 
             result = await handler.execute(account, action)
 
-            if result['status'] == 'success':
-                action.status = ActionStatus.SUCCESS
-                action.payload.update(result)
-            else:
-                action.status = ActionStatus.FAILED
-                action.payload['error'] = result.get('error')
+            async def store(write_session: AsyncSession):
+                stored = await write_session.get(Action, action.id)
+                cls.apply_result(stored, result)
+                if stored.action_type == ActionType.FAUCET and result['status'] == 'success':
+                    await FaucetLedger.record(write_session, stored.account_id, stored, result)
 
-            await session.commit()
+            await DatabaseWriter.get().submit(store)
+            # the caller's copy reflects what was stored
+            cls.apply_result(action, result)
 
             return result
 
@@ -215,6 +264,8 @@ class ActionService:
         if not accounts:
             return {"status": "failed", "error": "No active accounts found"}
 
+        await ActionHandlerRegistry.get_handler(action_type).prefetch(accounts)
+
         semaphore = asyncio.Semaphore(max_concurrent_tasks)
 
         async def process_account(account):
@@ -251,6 +302,9 @@ class ActionService:
                                     xlogger.warning(f"Dependency {dep_action_type} failed: {result}")
                                     return {account.email: result}
 
+                                # the dependency may have changed what was prefetched for the account
+                                ActionHandlerRegistry.get_handler(action_type).invalidate(account)
+
                             except Exception as e:
                                 xlogger.error(f"Error processing dependency {dep_action_type}: {e}")
                                 return {account.email: {"status": "failed", "error": str(e)}}
@@ -0,0 +1,97 @@
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Union
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from core.database.dialect import utcnow
+from core.database.models import Account, Action, FaucetDrip
+from core.utils.log import xlogger
+
+
+WEI_AMOUNT_THRESHOLD = 10 ** 9  # drip amounts from here on are taken as wei, below as ZXC
+
+
+def drip_amount_wei(drip_amount: Union[int, float, str]) -> int:
+    """
+    Drip amount reported by the faucet API in wei
+
+    The faucet reports ZXC (e.g. "100"); values too large to be a drip in ZXC are already in wei.
+    """
+    amount = Decimal(str(drip_amount))
+    return int(amount) if amount >= WEI_AMOUNT_THRESHOLD else int(amount * 10 ** 18)
+
+
+class FaucetLedger:
+    @classmethod
+    async def record(
+            cls,
+            session: AsyncSession,
+            account_id: int,
+            action: Optional[Action],
+            result: Dict[str, Any]
+    ) -> Optional[FaucetDrip]:
+        """
+        Adds a successful drip to the ledger and the aggregates of the account, committed with the session
+
+        :param session: Session the action result is committed with
+        :param account_id: Account the drip was sent to
+        :param action: Faucet action
+        :param result: Faucet handler result with 'hash' and 'dripAmount'
+        :return: Ledger entry, None when the result has no drip
+        """
+
+        if not result.get('hash') or result.get('dripAmount') is None:
+            return None
+
+        tx_hash = result['hash'].lower()
+        existing = await session.execute(select(FaucetDrip.id).where(FaucetDrip.tx_hash == tx_hash))
+        if existing.scalar_one_or_none() is not None:
+            xlogger.warning(f"Faucet drip {tx_hash} is already in the ledger")
+            return None
+
+        drip = FaucetDrip(
+            account_id=account_id,
+            action_id=action.id if action is not None else None,
+            tx_hash=tx_hash,
+            amount=drip_amount_wei(result['dripAmount'])
+        )
+        session.add(drip)
+
+        account = await session.get(Account, account_id)
+        account.faucet_drip_count = (account.faucet_drip_count or 0) + 1
+        account.faucet_dripped_total = (account.faucet_dripped_total or 0) + drip.amount
+        account.last_faucet_drip_at = utcnow()
+
+        xlogger.debug(f"Faucet drip of {drip.amount} wei recorded for account {account_id}, "
+                      f"{account.faucet_drip_count} drips in total")
+        return drip
+
+    @classmethod
+    async def last_drip_at(cls, session: AsyncSession, account_id: int) -> Optional[datetime]:
+        """ Time of the last drip of the account, a primary key lookup """
+
+        result = await session.execute(select(Account.last_faucet_drip_at).where(Account.id == account_id))
+        return result.scalar_one_or_none()
+
+    @classmethod
+    async def set_block_numbers(cls, session: AsyncSession, block_numbers: Dict[str, int]) -> int:
+        """
+        Stores the blocks of drips seen in the chain, not committed
+
+        :param session: Session
+        :param block_numbers: Block number keyed by lowercase 0x-prefixed transaction hash
+        :return: Number of ledger entries updated
+        """
+
+        hashes: List[str] = list(block_numbers)
+        if not hashes:
+            return 0
+        result = await session.execute(
+            select(FaucetDrip).where(FaucetDrip.tx_hash.in_(hashes), FaucetDrip.block_number.is_(None))
+        )
+        drips = result.scalars().all()
+        for drip in drips:
+            drip.block_number = block_numbers[drip.tx_hash]
+        return len(drips)
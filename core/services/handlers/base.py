@@ -1,6 +1,6 @@
 import json
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+from typing import Dict, Any, List
 
 import httpx
 
@@ -47,6 +47,18 @@ class BaseActionHandler:
                 'error': str(e)
             }
 
+    @classmethod
+    async def prefetch(cls, accounts: List[Account]) -> None:
+        """
+        Bulk-loads whatever the handler needs before it runs for many accounts.
+        """
+
+    @classmethod
+    def invalidate(cls, account: Account) -> None:
+        """
+        Drops prefetched data of an account whose state changed since the prefetch.
+        """
+
     @classmethod
     def get_client_header(cls, client: httpx.AsyncClient, header_name: str) -> str:
         """
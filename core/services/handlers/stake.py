@@ -1,17 +1,65 @@
-import random
 import traceback
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 
 import httpx
 
 from core.database.models import Account, Action
 from core.services.handlers.base import BaseActionHandler
+from core.services.indexer import ChainIndexer
+from core.services.stake_planner import StakePlan, StakePlanner
 from core.services.staking import ZenchainAsyncStaking
+from core.settings import settings
 from core.utils.log import xlogger
+from core.utils.w3.pool import AsyncWeb3Pool
 
 
 class StakeActionHandler(BaseActionHandler):
-    RPC_URL = 'https://zenchain-testnet.api.onfinality.io/public'
+    _rpc_url: Optional[str] = None
+    _plans: Dict[str, StakePlan] = {}
+
+    @classmethod
+    def init_rpc(cls, rpc_urls: Optional[List[str]] = None, rate_limit: Optional[float] = None) -> str:
+        """
+        Sets the endpoints stakes are sent through, the configured RPC_URLS by default
+
+        :param rpc_urls: Endpoints, requests are spread over all of them and transactions go to the
+            most reliable one, then to the others if it fails
+        :param rate_limit: Requests per second per endpoint
+        :return: Endpoint the providers are looked up by
+        """
+
+        if rpc_urls is None:
+            rpc_urls, rate_limit = settings.env.rpc_urls, settings.env.rpc_rate_limit
+        cls._rpc_url = rpc_urls[0]
+        AsyncWeb3Pool.register_rpc_pool(cls._rpc_url, rpc_urls, rate_limit)
+        return cls._rpc_url
+
+    @classmethod
+    def rpc_url(cls) -> str:
+        return cls._rpc_url or cls.init_rpc()
+
+    @classmethod
+    async def prefetch(cls, accounts: List[Account]) -> None:
+        stake_states = None
+        try:
+            # catching the index up scans only the blocks since the last sync
+            _, stake_states = await ChainIndexer.get(cls.rpc_url()).sync()
+        except Exception as e:
+            xlogger.warning(f"Chain index sync failed, reading stake states live: {e}")
+
+        try:
+            cls._plans = await ZenchainAsyncStaking.plan_stakes_for(
+                cls.rpc_url(),
+                {account.address: StakePlanner.random_share() for account in accounts},
+                stake_states=stake_states
+            )
+        except Exception as e:
+            xlogger.warning(f"Bulk stake planning failed, falling back to per-account planning: {e}")
+            cls._plans = {}
+
+    @classmethod
+    def invalidate(cls, account: Account) -> None:
+        cls._plans.pop(account.address, None)
 
     @classmethod
     async def _execute_action(
@@ -22,34 +70,65 @@ class StakeActionHandler(BaseActionHandler):
     ) -> Dict[str, Any]:
         try:
             staker = ZenchainAsyncStaking(
-                rpc_url=cls.RPC_URL,
+                rpc_url=cls.rpc_url(),
                 private_key=account.private_key,
                 proxy=account.proxy,
             )
-            random_perc = random.uniform(40, 77)
-            result = await staker.precise_stake(
-                stake_amount=f'{random_perc}%',
-                reward_destination=0
+            plan = cls._plans.pop(account.address, None)
+            if plan is not None and plan.skip_reason:
+                # nothing is sent for a stake that would fail for insufficient funds
+                xlogger.warning(f"Stake skipped: {plan.skip_reason}")
+                return {
+                    'status': 'failed',
+                    'error': f"Stake skipped: {plan.skip_reason}"
+                }
+
+            stake_kwargs = dict(
+                stake_amount=StakePlanner.random_share(),
+                reward_destination=0,
+                plan=plan
             )
 
-            if result and result.get('status') == 1:
-                xlogger.info(f"Success execute stake. TX: {result.get('transactionHash', '').hex()}")
+            if settings.env.deferred_stake_confirmation:
+                # the receipt is picked up later by the confirmation job
+                tx_hash = await staker.submit_stake(**stake_kwargs)
+                if tx_hash is None:
+                    return {
+                        'status': 'failed',
+                        'error': "Staking transaction was not sent"
+                    }
+                xlogger.info(f"Submitted stake. TX: {tx_hash.hex()}")
                 return {
-                    'status': 'success',
-                    'transaction_hash': result.get('transactionHash', '').hex(),
-                    'block_number': result.get('blockNumber', 0),
-                    'gas_used': result.get('gasUsed', 0),
-                    'effective_gas_price': result.get('effectiveGasPrice', 0)
-                }
-            else:
-                return {
-                    'status': 'failed',
-                    'error': f"Staking transaction failed. Raw result: {result}"
+                    'status': 'submitted',
+                    'transaction_hash': tx_hash.hex()
                 }
 
+            result = await staker.precise_stake(**stake_kwargs)
+            if result and result.get('status') == 1:
+                xlogger.info(f"Success execute stake. TX: {result.get('transactionHash', '').hex()}")
+            return cls.receipt_result(result)
+
         except Exception as e:
             xlogger.error(traceback.format_exc())
             return {
                 'status': 'failed',
                 'error': str(e)
-            }
\ No newline at end of file
+            }
+
+    @classmethod
+    def receipt_result(cls, receipt) -> Dict[str, Any]:
+        """
+        Converts a stake transaction receipt to the action result.
+        """
+        if receipt and receipt.get('status') == 1:
+            return {
+                'status': 'success',
+                'transaction_hash': receipt.get('transactionHash', '').hex(),
+                'block_number': receipt.get('blockNumber', 0),
+                'gas_used': receipt.get('gasUsed', 0),
+                'effective_gas_price': receipt.get('effectiveGasPrice', 0)
+            }
+        return {
+            'status': 'failed',
+            'error': f"Staking transaction failed. Raw result: {receipt}"
+        }
@@ -0,0 +1,192 @@
+import asyncio
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from sqlalchemy import delete, or_
+from sqlalchemy.future import select
+from web3 import Web3
+
+from core.database.connect import AsyncSessionLocal
+from core.database.models import Account, AccountChainState, IndexerCursor
+from core.services.faucet_ledger import FaucetLedger
+from core.services.stake_state import StakeState, StakeStateReader
+from core.services.staking import ZenchainAsyncStaking
+from core.utils.log import xlogger
+from core.utils.w3.pool import AsyncWeb3Pool
+
+
+INDEXER_CURSOR = 'chain_state'  # last block scanned for transactions of our accounts, per chain id
+INDEXER_FULL_REFRESH_CURSOR = 'chain_state_full_refresh'  # block every account was last read at, per chain id
+INDEXER_BLOCKS_PER_BATCH = 50  # blocks per JSON-RPC batch while catching up
+INDEXER_MAX_SCAN_BLOCKS = 5000  # further behind than this, every account is read instead of scanning
+INDEXER_FULL_REFRESH_BLOCKS = 600  # ~1 hour, catches changes made without a transaction (rewards, slashing)
+
+
+class ChainIndexer:
+    """
+    Incremental index of balances and bonded stakes of the accounts
+
+    Scans the blocks after the cursor for transactions sent from or to our accounts,
+    which covers faucet drips, transfers and staking precompile calls, and re-reads
+    only the accounts they touched. Every account is re-read periodically and when
+    the cursor is too far behind. States and cursors are stored in
+    ``account_chain_states`` and ``indexer_cursors``, the cursors named after the chain id
+    so that block numbers of another chain are never taken for ours.
+    """
+
+    _indexers: Dict[str, 'ChainIndexer'] = {}
+
+    def __init__(self, rpc_url: str):
+        self.rpc_url = rpc_url
+        self.w3 = AsyncWeb3Pool.get(rpc_url)
+        self.reader = StakeStateReader(
+            self.w3,
+            AsyncWeb3Pool.get_contract(rpc_url, ZenchainAsyncStaking.STAKING_CONTRACT,
+                                       ZenchainAsyncStaking.STAKING_ABI)
+        )
+        self.chain_id: Optional[int] = None
+        self._loop = asyncio.get_running_loop()
+        self._lock = asyncio.Lock()
+
+    @classmethod
+    def get(cls, rpc_url: str) -> 'ChainIndexer':
+        """
+        Returns the indexer of the endpoint, creating it on first use in the running loop
+
+        :param rpc_url: JSON-RPC endpoint
+        :return: Chain indexer
+        """
+
+        indexer = cls._indexers.get(rpc_url)
+        if indexer is None or indexer._loop is not asyncio.get_running_loop():
+            indexer = cls._indexers[rpc_url] = cls(rpc_url)
+        return indexer
+
+    @staticmethod
+    def cursor_name(name: str, chain_id: int) -> str:
+        return f"{name}:{chain_id}"
+
+    @classmethod
+    async def load_states(cls, chain_id: Optional[int] = None) -> Tuple[Optional[int], Dict[str, StakeState]]:
+        """
+        Indexed states of the active accounts, without any RPC call
+
+        :param chain_id: Chain the index must be synced on, the chain it was last synced on if not given
+        :return: Block the index is synced to (None if never synced) and states keyed by checksum address
+        """
+
+        async with AsyncSessionLocal() as session:
+            if chain_id is not None:
+                cursor = await session.get(IndexerCursor, cls.cursor_name(INDEXER_CURSOR, chain_id))
+            else:
+                # a sync removes the cursors of other chains, at most one is left
+                result = await session.execute(
+                    select(IndexerCursor).where(IndexerCursor.name.startswith(f"{INDEXER_CURSOR}:", autoescape=True))
+                )
+                cursor = result.scalars().first()
+            result = await session.execute(
+                select(Account.address, AccountChainState.balance, AccountChainState.bonded)
+                .join(AccountChainState, AccountChainState.account_id == Account.id)
+                .where(Account.active == True)
+            )
+            states = {
+                Web3.to_checksum_address(address): StakeState(balance=balance, bonded=bonded)
+                for address, balance, bonded in result.all()
+            }
+        return (cursor.block_number if cursor else None), states
+
+    async def sync(self) -> Tuple[int, Dict[str, StakeState]]:
+        """
+        Brings the index up to the latest block
+
+        :return: Block the index is synced to and states of the active accounts keyed by checksum address
+        """
+
+        async with self._lock:
+            if self.chain_id is None:
+                self.chain_id = await self.w3.eth.chain_id
+            cursor_name = self.cursor_name(INDEXER_CURSOR, self.chain_id)
+            full_refresh_name = self.cursor_name(INDEXER_FULL_REFRESH_CURSOR, self.chain_id)
+
+            async with AsyncSessionLocal() as session:
+                result = await session.execute(select(Account.id, Account.address).where(Account.active == True))
+                account_ids = {Web3.to_checksum_address(address): account_id
+                               for account_id, address in result.all()}
+
+                cursor = await session.get(IndexerCursor, cursor_name)
+                full_refresh = await session.get(IndexerCursor, full_refresh_name)
+                result = await session.execute(
+                    select(AccountChainState).where(AccountChainState.account_id.in_(account_ids.values()))
+                )
+                rows = {row.account_id: row for row in result.scalars().all()}
+
+                latest = await self.w3.eth.block_number
+                received: Dict[str, int] = {}
+                if cursor is None or full_refresh is None \
+                        or latest - cursor.block_number > INDEXER_MAX_SCAN_BLOCKS \
+                        or latest - full_refresh.block_number >= INDEXER_FULL_REFRESH_BLOCKS:
+                    touched = set(account_ids)
+                    full_refresh = await session.merge(IndexerCursor(name=full_refresh_name, block_number=latest))
+                    # the states are rewritten from this chain, cursors of another chain no longer match them
+                    await session.execute(delete(IndexerCursor).where(
+                        or_(*[
+                            IndexerCursor.name.startswith(f"{name}:", autoescape=True) | (IndexerCursor.name == name)
+                            for name in (INDEXER_CURSOR, INDEXER_FULL_REFRESH_CURSOR)
+                        ]),
+                        IndexerCursor.name.not_in([cursor_name, full_refresh_name])
+                    ))
+                else:
+                    touched, received = await self._scan(cursor.block_number + 1, latest, account_ids)
+                    # accounts added since the last sync
+                    touched.update(address for address, account_id in account_ids.items()
+                                   if account_id not in rows)
+
+                if touched:
+                    block_number, states = await self.reader.read(sorted(touched))
+                    for address, state in states.items():
+                        account_id = account_ids[address]
+                        row = rows.get(account_id)
+                        if row is None:
+                            row = rows[account_id] = AccountChainState(account_id=account_id)
+                            session.add(row)
+                        row.balance = state.balance
+                        row.bonded = state.bonded
+                        row.block_number = block_number
+
+                drips = await FaucetLedger.set_block_numbers(session, received)
+                await session.merge(IndexerCursor(name=cursor_name, block_number=latest))
+                await session.commit()
+
+        xlogger.debug(f"Chain index synced to block {latest}, {len(touched)} of {len(account_ids)} accounts re-read, "
+                      f"{drips} faucet drips located")
+        addresses = {account_id: address for address, account_id in account_ids.items()}
+        return latest, {
+            addresses[account_id]: StakeState(balance=row.balance, bonded=row.bonded)
+            for account_id, row in rows.items()
+        }
+
+    async def _scan(self, start: int, end: int, addresses: Iterable[str]) -> Tuple[Set[str], Dict[str, int]]:
+        """
+        Addresses sending or receiving a transaction in blocks `start`..`end`, and the block of
+        every transaction received, keyed by lowercase transaction hash
+        """
+
+        watched = set(addresses)
+        touched = set()
+        received = {}
+        for first in range(start, end + 1, INDEXER_BLOCKS_PER_BATCH):
+            last = min(first + INDEXER_BLOCKS_PER_BATCH, end + 1)
+            async with self.w3.batch_requests() as batch:
+                for number in range(first, last):
+                    batch.add(self.w3.eth.get_block(number, full_transactions=True))
+                blocks = await batch.async_execute()
+
+            for block in blocks:
+                for tx in block['transactions']:
+                    if tx['from'] in watched:
+                        touched.add(tx['from'])
+                    if tx.get('to') in watched:
+                        touched.add(tx['to'])
+                        received[tx['hash'].to_0x_hex()] = block['number']
+
+        xlogger.debug(f"Scanned blocks {start}..{end}, {len(touched)} accounts touched")
+        return touched, received
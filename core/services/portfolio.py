@@ -0,0 +1,116 @@
+from typing import Dict, Optional
+
+from sqlalchemy.future import select
+from web3 import Web3
+
+from core.database.connect import AsyncSessionLocal
+from core.database.models import Account
+from core.services.action_results import ActionReports
+from core.services.handlers.stake import StakeActionHandler
+from core.services.indexer import ChainIndexer
+from core.services.stake_state import StakeState, StakeStateReader
+from core.services.staking import ZenchainAsyncStaking
+from core.utils.log import xlogger
+from core.utils.w3.pool import AsyncWeb3Pool
+
+
+class PortfolioReport:
+    def __init__(self):
+        self.block_number = None
+        self.total_accounts = 0
+        self.staking_accounts = 0
+        self.total_balance = 0  # wei
+        self.total_bonded = 0  # wei
+        self.faucet_drips = 0
+        self.total_dripped = 0  # wei
+        self.stakes = 0
+        self.stake_fees = 0  # wei
+        self.states: Dict[str, StakeState] = {}
+
+
+async def build_portfolio_report(rpc_url: Optional[str] = None) -> PortfolioReport:
+    """Reading balances and stakes of all active accounts in bulk at a single block"""
+    rpc_url = rpc_url or StakeActionHandler.rpc_url()
+    report = PortfolioReport()
+
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(select(Account.address).where(Account.active == True))
+        addresses = [Web3.to_checksum_address(address) for address in result.scalars().all()]
+
+    report.total_accounts = len(addresses)
+    if not addresses:
+        return report
+
+    reader = StakeStateReader(
+        AsyncWeb3Pool.get(rpc_url),
+        AsyncWeb3Pool.get_contract(rpc_url, ZenchainAsyncStaking.STAKING_CONTRACT, ZenchainAsyncStaking.STAKING_ABI)
+    )
+    try:
+        block_number, states = await reader.read(addresses)
+    finally:
+        await AsyncWeb3Pool.close()
+
+    _add_states(report, block_number, states)
+    xlogger.debug(f"Portfolio report built for {report.total_accounts} accounts at block {report.block_number}")
+    return report
+
+
+async def load_portfolio_report(rpc_url: Optional[str] = None) -> PortfolioReport:
+    """Reading balances and stakes from the chain index, syncing it first only if it was never synced"""
+    rpc_url = rpc_url or StakeActionHandler.rpc_url()
+    report = PortfolioReport()
+
+    block_number, states = await ChainIndexer.load_states()
+    if block_number is None:
+        try:
+            block_number, states = await ChainIndexer.get(rpc_url).sync()
+        finally:
+            await AsyncWeb3Pool.close()
+
+    report.total_accounts = len(states)
+    _add_states(report, block_number, states)
+
+    # per-account aggregates kept by the faucet ledger
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            select(Account.faucet_drip_count, Account.faucet_dripped_total).where(Account.active == True)
+        )
+        for drip_count, dripped_total in result.all():
+            report.faucet_drips += drip_count or 0
+            report.total_dripped += dripped_total or 0
+
+        stake_costs = await ActionReports.stake_costs(session)
+        report.stakes = stake_costs.stakes
+        report.stake_fees = stake_costs.fees
+
+    xlogger.debug(f"Portfolio report loaded from the chain index at block {report.block_number}")
+    return report
+
+
+def _add_states(report: PortfolioReport, block_number: int, states: Dict[str, StakeState]):
+    report.block_number = block_number
+    report.states = states
+    for state in states.values():
+        report.total_balance += state.balance
+        report.total_bonded += state.bonded
+        if state.bonded > 0:
+            report.staking_accounts += 1
+
+
+def print_portfolio_report(report: PortfolioReport):
+    print("\n\n--- Portfolio Report ---")
+    print(f"Block: {report.block_number}")
+    print(f"Active accounts: {report.total_accounts}")
+    print(f"Accounts with stake: {report.staking_accounts}")
+    print(f"Total balance: {Web3.from_wei(report.total_balance, 'ether')} ZXC")
+    print(f"Total bonded: {Web3.from_wei(report.total_bonded, 'ether')} ZXC")
+    if report.faucet_drips:
+        print(f"Faucet drips: {report.faucet_drips}, {Web3.from_wei(report.total_dripped, 'ether')} ZXC in total")
+    if report.stakes:
+        print(f"Stakes: {report.stakes}, {Web3.from_wei(report.stake_fees, 'ether')} ZXC paid in fees")
+
+    if report.states:
+        print("\nAccounts:")
+        for address, state in report.states.items():
+            print(f"  - {address}: balance={Web3.from_wei(state.balance, 'ether')} ZXC, "
+                  f"bonded={Web3.from_wei(state.bonded, 'ether')} ZXC")
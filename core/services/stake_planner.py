@@ -0,0 +1,192 @@
+import random
+from dataclasses import dataclass, replace
+from decimal import Decimal
+from typing import TYPE_CHECKING, Dict, Optional, Union
+
+from web3 import Web3
+from web3.contract import AsyncContract
+
+from core.utils.log import xlogger
+from core.utils.w3.gas import GasFees, GasOracle
+
+if TYPE_CHECKING:
+    from core.services.staking import PreflightState
+
+
+BPS = 10000  # basis points in 100%
+STAKE_SHARE_RANGE_BPS = (4000, 7700)  # share of the balance staked, picked at random per account
+
+
+@dataclass
+class StakePlan:
+    """Stake transaction of an address computed from a balance snapshot, amounts in wei"""
+    address: str
+    method: str  # 'bond' for the first stake, 'bondExtra' on top of an existing one
+    amount: int
+    balance: int
+    nonce: int
+    gas_limit: int
+    fees: GasFees
+    skip_reason: Optional[str] = None
+
+    @property
+    def gas_reserve(self) -> int:
+        """Most the transaction can be charged for gas"""
+        return self.gas_limit * self.fees.max_price_per_gas
+
+
+class StakePlanner:
+    @staticmethod
+    def random_share() -> str:
+        """Random share of the balance to stake, e.g. '55.25%'"""
+        share_bps = random.randint(*STAKE_SHARE_RANGE_BPS)
+        return f"{share_bps // 100}.{share_bps % 100:02d}%"
+
+    @staticmethod
+    def requested_amount(stake_amount: Union[int, float, str], balance: int) -> int:
+        """
+        Stake in wei from a share of the balance ('55.25%') or a fixed amount in ZXC
+
+        :param stake_amount: Share of the balance or fixed amount
+        :param balance: Balance in wei
+        :return: Stake in wei
+        """
+
+        if isinstance(stake_amount, str) and stake_amount.endswith('%'):
+            share_bps = int(Decimal(stake_amount.rstrip('%')) * 100)
+            return balance * share_bps // BPS
+        return int(Web3.to_wei(Decimal(str(stake_amount)), 'ether'))
+
+    @classmethod
+    async def estimate_gas_limits(
+            cls,
+            gas_oracle: GasOracle,
+            contract: AsyncContract,
+            states: Dict[str, 'PreflightState']
+    ) -> Dict[str, int]:
+        """
+        Gas limits of the staking methods needed for the addresses, estimated once per method
+        from an address the method applies to
+
+        :param gas_oracle: Gas oracle of the endpoint
+        :param contract: Staking contract
+        :param states: Preflight states keyed by address
+        :return: Gas limit per method name
+        """
+
+        gas_limits = {}
+        # the richest addresses are the least likely to revert the estimate
+        for address, state in sorted(states.items(), key=lambda item: item[1].balance, reverse=True):
+            method = 'bond' if state.bonded == 0 else 'bondExtra'
+            if method in gas_limits:
+                continue
+
+            # the amount barely changes the gas used, half of the smallest share is always affordable
+            amount = state.balance * STAKE_SHARE_RANGE_BPS[0] // BPS // 2
+            stake_call = contract.functions.bond(amount, 0) if method == 'bond' \
+                else contract.functions.bondExtra(amount)
+            gas_limits[method] = await gas_oracle.gas_limit(
+                method,
+                lambda: stake_call.estimate_gas({'from': address})
+            )
+            if len(gas_limits) == 2:
+                break
+        return gas_limits
+
+    @classmethod
+    def plan(
+            cls,
+            address: str,
+            state: 'PreflightState',
+            stake_amount: Union[int, float, str],
+            fees: GasFees,
+            gas_limits: Dict[str, int]
+    ) -> StakePlan:
+        """
+        Computes the stake of an address so that it and the gas can be paid from the balance
+
+        :param address: Address
+        :param state: Balance, stake and nonce snapshot of the address
+        :param stake_amount: Share of the balance ('55.25%') or fixed amount in ZXC
+        :param fees: Fees the transaction will be sent with
+        :param gas_limits: Gas limit per method name
+        :return: Stake plan, with `skip_reason` set when it cannot be afforded
+        """
+
+        method = 'bond' if state.bonded == 0 else 'bondExtra'
+        plan = StakePlan(
+            address=address,
+            method=method,
+            amount=0,
+            balance=state.balance,
+            nonce=state.nonce,
+            gas_limit=gas_limits[method],
+            fees=fees
+        )
+
+        available = state.balance - plan.gas_reserve
+        if available <= 0:
+            plan.skip_reason = f"balance {state.balance} wei does not cover gas of {plan.gas_reserve} wei"
+            return plan
+
+        plan.amount = min(cls.requested_amount(stake_amount, state.balance), available)
+        if plan.amount <= 0:
+            plan.skip_reason = "stake amount is zero"
+        return plan
+
+    @classmethod
+    def reprice(cls, plan: StakePlan, fees: GasFees) -> StakePlan:
+        """
+        Plan with the fees current at send time, the amount lowered if the balance no longer covers the gas
+
+        Only the balance, amount and nonce of the snapshot are kept, fees can change between
+        planning and sending by many blocks.
+
+        :param plan: Stake plan from the snapshot
+        :param fees: Fees the transaction is sent with
+        :return: Repriced stake plan, with `skip_reason` set when it cannot be afforded anymore
+        """
+
+        plan = replace(plan, fees=fees)
+        if plan.skip_reason:
+            return plan
+
+        available = plan.balance - plan.gas_reserve
+        if available <= 0:
+            plan.skip_reason = f"balance {plan.balance} wei does not cover gas of {plan.gas_reserve} wei"
+        elif plan.amount > available:
+            xlogger.debug(f"Stake of {plan.address} lowered from {plan.amount} to {available} wei for current fees")
+            plan.amount = available
+        return plan
+
+    @classmethod
+    async def plan_all(
+            cls,
+            gas_oracle: GasOracle,
+            contract: AsyncContract,
+            states: Dict[str, 'PreflightState'],
+            stake_amounts: Dict[str, Union[int, float, str]],
+            fees: Optional[GasFees] = None
+    ) -> Dict[str, StakePlan]:
+        """
+        Plans the stakes of many addresses from one snapshot with one fee sample
+
+        :param gas_oracle: Gas oracle of the endpoint
+        :param contract: Staking contract
+        :param states: Preflight states keyed by address
+        :param stake_amounts: Share of the balance or fixed amount keyed by address
+        :param fees: Fees to use instead of the current ones of the oracle
+        :return: Stake plans keyed by address
+        """
+
+        if fees is None:
+            fees = await gas_oracle.fees()
+        gas_limits = await cls.estimate_gas_limits(gas_oracle, contract, states)
+
+        plans = {
+            address: cls.plan(address, states[address], stake_amount, fees, gas_limits)
+            for address, stake_amount in stake_amounts.items()
+        }
+        skipped = sum(1 for plan in plans.values() if plan.skip_reason)
+        xlogger.debug(f"Stakes planned for {len(plans)} addresses, {skipped} skipped for insufficient funds")
+        return plans
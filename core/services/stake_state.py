@@ -0,0 +1,158 @@
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from web3 import AsyncWeb3, Web3
+from web3.contract import AsyncContract
+
+from core.utils.log import xlogger
+
+
+MULTICALL3_ADDRESS = Web3.to_checksum_address('0xcA11bde05977b3631167028862bE2a173976CA11')
+MULTICALL3_ABI = [
+    {
+        "inputs": [
+            {
+                "components": [
+                    {"name": "target", "type": "address"},
+                    {"name": "allowFailure", "type": "bool"},
+                    {"name": "callData", "type": "bytes"}
+                ],
+                "name": "calls",
+                "type": "tuple[]"
+            }
+        ],
+        "name": "aggregate3",
+        "outputs": [
+            {
+                "components": [
+                    {"name": "success", "type": "bool"},
+                    {"name": "returnData", "type": "bytes"}
+                ],
+                "name": "returnData",
+                "type": "tuple[]"
+            }
+        ],
+        "stateMutability": "payable",
+        "type": "function"
+    },
+    {
+        "inputs": [{"name": "addr", "type": "address"}],
+        "name": "getEthBalance",
+        "outputs": [{"name": "balance", "type": "uint256"}],
+        "stateMutability": "view",
+        "type": "function"
+    }
+]
+
+STATE_BATCH_SIZE = 200  # addresses per JSON-RPC batch, each address takes 2 calls
+MULTICALL_BATCH_SIZE = 250  # addresses per aggregate3 eth_call, each address takes 2 sub-calls
+
+
+@dataclass
+class StakeState:
+    """Balance and bonded stake of an address, in wei"""
+    balance: int
+    bonded: int
+
+
+class StakeStateReader:
+    """
+    Bulk reader of balances and bonded stakes
+
+    Reads go through a Multicall3 ``aggregate3`` eth_call when the contract is deployed
+    on the chain and through JSON-RPC batches otherwise. Results are pinned to a block
+    and cached until the chain moves on, so every consumer within the same block
+    shares one read.
+    """
+
+    # endpoint -> (block number, states read at that block)
+    _cache: Dict[str, Tuple[int, Dict[str, StakeState]]] = {}
+    _multicall_available: Dict[str, bool] = {}
+
+    def __init__(self, w3: AsyncWeb3, staking_contract: AsyncContract):
+        self.w3 = w3
+        self.contract = staking_contract
+        self._endpoint = w3.provider.endpoint_uri
+        self._multicall: Optional[AsyncContract] = None
+
+    async def read(self, addresses: List[str]) -> Tuple[int, Dict[str, StakeState]]:
+        """
+        Returns the latest block number and the state of every address at that block
+
+        :param addresses: Checksum addresses
+        :return: Block number and states keyed by address
+        """
+
+        block_number = await self.w3.eth.block_number
+
+        cached_block, states = self._cache.get(self._endpoint, (None, {}))
+        if cached_block != block_number:
+            states = {}
+
+        missing = [address for address in dict.fromkeys(addresses) if address not in states]
+        if missing:
+            if await self._has_multicall():
+                try:
+                    states.update(await self._read_multicall(missing, block_number))
+                except Exception as e:
+                    xlogger.warning(f"Multicall read failed, switching to JSON-RPC batches: {e}")
+                    self._multicall_available[self._endpoint] = False
+                    states.update(await self._read_batch(missing, block_number))
+            else:
+                states.update(await self._read_batch(missing, block_number))
+            self._cache[self._endpoint] = (block_number, states)
+
+        xlogger.debug(f"Stake state of {len(addresses)} addresses at block {block_number}, "
+                      f"{len(addresses) - len(missing)} from cache")
+        return block_number, {address: states[address] for address in addresses}
+
+    async def _has_multicall(self) -> bool:
+        available = self._multicall_available.get(self._endpoint)
+        if available is None:
+            try:
+                available = len(await self.w3.eth.get_code(MULTICALL3_ADDRESS)) > 0
+            except Exception as e:
+                xlogger.debug(f"Multicall availability check failed: {e}")
+                available = False
+            self._multicall_available[self._endpoint] = available
+        return available
+
+    async def _read_multicall(self, addresses: List[str], block_number: int) -> Dict[str, StakeState]:
+        if self._multicall is None:
+            self._multicall = self.w3.eth.contract(address=MULTICALL3_ADDRESS, abi=MULTICALL3_ABI)
+
+        states = {}
+        for start in range(0, len(addresses), MULTICALL_BATCH_SIZE):
+            chunk = addresses[start:start + MULTICALL_BATCH_SIZE]
+            calls = []
+            for address in chunk:
+                calls.append((MULTICALL3_ADDRESS, False,
+                              self._multicall.encode_abi('getEthBalance', args=[address])))
+                calls.append((self.contract.address, False,
+                              self.contract.encode_abi('bonded', args=[address])))
+
+            results = await self._multicall.functions.aggregate3(calls).call(
+                block_identifier=block_number
+            )
+            for index, address in enumerate(chunk):
+                (_, balance_data), (_, bonded_data) = results[index * 2:index * 2 + 2]
+                states[address] = StakeState(
+                    balance=self.w3.codec.decode(['uint256'], balance_data)[0],
+                    bonded=self.w3.codec.decode(['uint256'], bonded_data)[0]
+                )
+        return states
+
+    async def _read_batch(self, addresses: List[str], block_number: int) -> Dict[str, StakeState]:
+        states = {}
+        for start in range(0, len(addresses), STATE_BATCH_SIZE):
+            chunk = addresses[start:start + STATE_BATCH_SIZE]
+            async with self.w3.batch_requests() as batch:
+                for address in chunk:
+                    batch.add(self.w3.eth.get_balance(address, block_number))
+                    batch.add(self.contract.functions.bonded(address).call(block_identifier=block_number))
+                results = await batch.async_execute()
+
+            for index, address in enumerate(chunk):
+                balance, bonded = results[index * 2:index * 2 + 2]
+                states[address] = StakeState(balance=balance, bonded=bonded)
+        return states
@@ -1,75 +1,177 @@
-import math
-from typing import Union
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Union
 
+from hexbytes import HexBytes
 from web3 import AsyncWeb3, Web3
+from web3.contract import AsyncContract
 
+from core.services.stake_planner import StakePlan, StakePlanner
+from core.services.stake_state import StakeState, StakeStateReader
 from core.utils.log import xlogger
+from core.utils.w3.gas import GasFees, GasOracle
+from core.utils.w3.nonce import NonceManager
+from core.utils.w3.pool import AsyncWeb3Pool
+from core.utils.w3.receipts import ReceiptTracker
+from core.utils.w3.signing import TransactionSigner
+
+
+PREFLIGHT_BATCH_SIZE = 300  # addresses per JSON-RPC nonce batch
+
+
+@dataclass
+class PreflightState:
+    """Chain state of an address read before staking"""
+    balance: int  # wei
+    bonded: int  # wei
+    nonce: int  # pending transaction count
 
 
 class ZenchainAsyncStaking:
+    STAKING_CONTRACT = Web3.to_checksum_address('0x0000000000000000000000000000000000000800')
+    STAKING_ABI = [
+        {
+            "inputs": [{"type": "address"}],
+            "name": "bonded",
+            "outputs": [{"type": "uint256"}],
+            "stateMutability": "view",
+            "type": "function"
+        },
+        {
+            "inputs": [
+                {"type": "uint256", "name": "value"},
+                {"type": "uint8", "name": "dest"}
+            ],
+            "name": "bond",
+            "outputs": [],
+            "stateMutability": "nonpayable",
+            "type": "function"
+        },
+        {
+            "inputs": [{"type": "uint256", "name": "value"}],
+            "name": "bondExtra",
+            "outputs": [],
+            "stateMutability": "nonpayable",
+            "type": "function"
+        }
+    ]
+
     def __init__(
             self,
             rpc_url: str,
             private_key: str,
             proxy: str = None
     ):
-        self.w3 = AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(rpc_url, request_kwargs=dict(proxy=proxy)))
+        self.rpc_url = rpc_url
+        self.w3 = AsyncWeb3Pool.get(rpc_url, proxy)
 
         self.account = self.w3.eth.account.from_key(private_key)
         self.address = self.account.address
         self.private_key = private_key
 
-        self.STAKING_CONTRACT = Web3.to_checksum_address('0x0000000000000000000000000000000000000800')
-        self.STAKING_ABI = [
-            {
-                "inputs": [{"type": "address"}],
-                "name": "bonded",
-                "outputs": [{"type": "uint256"}],
-                "stateMutability": "view",
-                "type": "function"
-            },
-            {
-                "inputs": [
-                    {"type": "uint256", "name": "value"},
-                    {"type": "uint8", "name": "dest"}
-                ],
-                "name": "bond",
-                "outputs": [],
-                "stateMutability": "nonpayable",
-                "type": "function"
-            },
-            {
-                "inputs": [{"type": "uint256", "name": "value"}],
-                "name": "bondExtra",
-                "outputs": [],
-                "stateMutability": "nonpayable",
-                "type": "function"
-            }
-        ]
-
-        self.contract = self.w3.eth.contract(
+        self.contract = AsyncWeb3Pool.get_contract(
+            rpc_url,
             address=self.STAKING_CONTRACT,
-            abi=self.STAKING_ABI
+            abi=self.STAKING_ABI,
+            proxy=proxy
         )
 
+    @classmethod
+    async def fetch_preflight(
+            cls,
+            w3: AsyncWeb3,
+            contract: AsyncContract,
+            addresses: List[str],
+            chunk_size: int = PREFLIGHT_BATCH_SIZE,
+            stake_states: Optional[Dict[str, StakeState]] = None
+    ) -> Dict[str, PreflightState]:
+        """
+        Reading nonce of every address with JSON-RPC batches, balance and stake in bulk
+
+        Balances and stakes found in `stake_states` (e.g. from the chain index) are not read again.
+        """
+        stake_states = dict(stake_states or {})
+        missing = [address for address in addresses if address not in stake_states]
+        if missing:
+            _, read_states = await StakeStateReader(w3, contract).read(missing)
+            stake_states.update(read_states)
+
+        nonces = {}
+        for start in range(0, len(addresses), chunk_size):
+            chunk = addresses[start:start + chunk_size]
+            async with w3.batch_requests() as batch:
+                for address in chunk:
+                    batch.add(w3.eth.get_transaction_count(address, 'pending'))
+                results = await batch.async_execute()
+
+            nonces.update(zip(chunk, results))
+
+        states = {
+            address: PreflightState(
+                balance=stake_states[address].balance,
+                bonded=stake_states[address].bonded,
+                nonce=nonces[address]
+            )
+            for address in addresses
+        }
+
+        xlogger.debug(f"Preflight state read for {len(states)} addresses")
+        return states
+
+    @classmethod
+    async def fetch_preflight_for(
+            cls,
+            rpc_url: str,
+            addresses: List[str],
+            proxy: str = None,
+            stake_states: Optional[Dict[str, StakeState]] = None
+    ) -> Dict[str, PreflightState]:
+        """Bulk preflight read through the pooled provider of the endpoint"""
+        return await cls.fetch_preflight(
+            AsyncWeb3Pool.get(rpc_url, proxy),
+            AsyncWeb3Pool.get_contract(rpc_url, cls.STAKING_CONTRACT, cls.STAKING_ABI, proxy),
+            addresses,
+            stake_states=stake_states
+        )
+
+    @classmethod
+    async def plan_stakes_for(
+            cls,
+            rpc_url: str,
+            stake_amounts: Dict[str, Union[float, str]],
+            proxy: str = None,
+            stake_states: Optional[Dict[str, StakeState]] = None
+    ) -> Dict[str, StakePlan]:
+        """Planning stakes of many addresses from one bulk preflight read and one fee sample"""
+        states = await cls.fetch_preflight_for(rpc_url, list(stake_amounts), proxy, stake_states)
+        return await StakePlanner.plan_all(
+            GasOracle.get(rpc_url),
+            AsyncWeb3Pool.get_contract(rpc_url, cls.STAKING_CONTRACT, cls.STAKING_ABI, proxy),
+            states,
+            stake_amounts
+        )
+
+    @staticmethod
+    def round_stake(stake_amount: int) -> float:
+        """Rounding stake in wei down to its leading digit in ETH"""
+        if stake_amount > 0:
+            order = 10 ** (len(str(stake_amount)) - 1)
+            return float(Web3.from_wei(stake_amount // order * order, 'ether'))
+
+        return 0.0
+
     async def get_current_stake(self) -> float:
         """Getting the current steak size"""
         try:
             stake_amount = await self.contract.functions.bonded(self.address).call()
-            stake_float =  Web3.from_wei(stake_amount, 'ether')
-            if stake_float > 0:
-                order = math.floor(math.log10(stake_float))
-                return math.floor(stake_float * (10 ** -order)) * (10 ** order)
-
-            return 0.0
+            return self.round_stake(stake_amount)
         except Exception as e:
             xlogger.error(f"Error receiving steak: {e}")
             return 0.0
 
     async def get_dynamic_gas_price(self, multiplier = 1) -> int:
-        """Getting gas with a little randomness"""
-        base_gas_price = await self.w3.eth.gas_price
-        return base_gas_price * multiplier
+        """Getting the highest price per gas from the shared gas oracle"""
+        fees = await GasOracle.get(self.rpc_url).fees()
+        return fees.max_price_per_gas * multiplier
 
     async def get_wallet_balance(self) -> float:
         """Getting wallet balance in ETH"""
@@ -80,70 +182,79 @@ class ZenchainAsyncStaking:
             xlogger.error(f"Error getting balance: {e}")
             return 0.0
 
-    async def precise_stake(
+    async def submit_stake(
             self,
             stake_amount: Union[float, str],
-            reward_destination: int = 0
-    ):
+            reward_destination: int = 0,
+            preflight: Optional[PreflightState] = None,
+            fees: Optional[GasFees] = None,
+            plan: Optional[StakePlan] = None
+    ) -> Optional[HexBytes]:
+        """Sending the stake transaction without waiting for it to be mined"""
         try:
             stake_log_message = f"Staking attempt for address {self.address}: "
-            wallet_balance = float(await self.get_wallet_balance())
+            if plan is None:
+                if preflight is None:
+                    states = await self.fetch_preflight(self.w3, self.contract, [self.address])
+                    preflight = states[self.address]
+                plans = await StakePlanner.plan_all(
+                    GasOracle.get(self.rpc_url),
+                    self.contract,
+                    {self.address: preflight},
+                    {self.address: stake_amount},
+                    fees
+                )
+                plan = plans[self.address]
+
+            # the plan may be from a snapshot taken long before, the transaction is priced at the current block
+            plan = StakePlanner.reprice(plan, fees or await GasOracle.get(self.rpc_url).fees())
+
+            wallet_balance = Web3.from_wei(plan.balance, 'ether')
             xlogger.debug(f"Wallet Balance for {self.address}: {wallet_balance} ZXC")
             stake_log_message += f"Wallet Balance={wallet_balance} ZXC, "
 
-            if isinstance(stake_amount, str) and stake_amount.endswith('%'):
-                percent = float(stake_amount.rstrip('%')) / 100
-                calculated_stake = wallet_balance * percent
-                xlogger.debug(
-                    f"Stake Calculation for {self.address}: Percentage={percent * 100}%, Amount={calculated_stake} ZXC")
-                stake_log_message += f"Stake Calculation=Percentage({percent*100}%), "
-            else:
-                calculated_stake = float(stake_amount)
-                xlogger.debug(f"Stake Calculation for {self.address}: Fixed Amount={calculated_stake} ZXC")
-                stake_log_message += f"Stake Calculation=Fixed Amount, "
-
-            current_stake = await self.get_current_stake()
-            xlogger.debug(f"Current Stake for {self.address}: {current_stake} ZXC")
+            if plan.skip_reason:
+                xlogger.warning(f"Staking skipped for {self.address}: {plan.skip_reason}")
+                return None
 
-            stake_amount_final = calculated_stake
-            stake_amount_wei = int(Web3.to_wei(stake_amount_final, 'ether'))
-            gas_price = await self.get_dynamic_gas_price(2)
-            xlogger.debug(f"Stake Preparation for {self.address}: Amount={stake_amount_final} ZXC, Gas Price={gas_price}")
-            stake_log_message += f"Stake Amount={stake_amount_final} ZXC, Gas Price={gas_price}"
+            stake_amount_final = Web3.from_wei(plan.amount, 'ether')
+            xlogger.debug(f"Stake Preparation for {self.address}: Amount={stake_amount_final} ZXC, "
+                          f"Gas Reserve={plan.gas_reserve} wei, Fees={plan.fees.tx_params()}")
+            stake_log_message += f"Stake Amount={stake_amount_final} ZXC, Fees={plan.fees.tx_params()}"
 
-            if current_stake == 0:
+            if plan.method == 'bond':
                 stake_log_message += ", Method=Primary Staking"
                 xlogger.debug(f"Staking Method for {self.address}: Primary Staking")
-                tx = await self.contract.functions.bond(
-                    stake_amount_wei,
+                stake_call = self.contract.functions.bond(
+                    plan.amount,
                     reward_destination
-                ).build_transaction({
-                    'from': self.address,
-                    'nonce': await self.w3.eth.get_transaction_count(self.address),
-                    'gas': 1000000,
-                    'gasPrice': gas_price
-                })
+                )
             else:
                 stake_log_message += ", Method=Additional Staking"
                 xlogger.debug(f"Staking Method for {self.address}: Additional Staking")
-                tx = await self.contract.functions.bondExtra(
-                    stake_amount_wei
-                ).build_transaction({
+                stake_call = self.contract.functions.bondExtra(
+                    plan.amount
+                )
+
+            async def send(nonce: int) -> HexBytes:
+                tx = await stake_call.build_transaction({
                     'from': self.address,
-                    'nonce': await self.w3.eth.get_transaction_count(self.address),
-                    'gas': 1000000,
-                    'gasPrice': gas_price
+                    'nonce': nonce,
+                    'gas': plan.gas_limit,
+                    **plan.fees.tx_params()
                 })
+                raw_transaction, _ = await TransactionSigner.sign(tx, self.private_key)
+                return await self.w3.eth.send_raw_transaction(raw_transaction)
 
-            signed_tx = self.w3.eth.account.sign_transaction(tx, self.private_key)
-            tx_hash = await self.w3.eth.send_raw_transaction(signed_tx.raw_transaction)
-            receipt = await self.w3.eth.wait_for_transaction_receipt(tx_hash)
+            nonces = NonceManager.get(self.rpc_url)
+            nonces.seed(self.address, plan.nonce)
+            tx_hash = await nonces.submit(self.address, send)
 
             xlogger.debug(f"Transaction Details for {self.address}: Hash={tx_hash.hex()}")
-            stake_log_message += f", Transaction Hash={tx_hash.hex()}, Status=Success"
+            stake_log_message += f", Transaction Hash={tx_hash.hex()}, Status=Submitted"
             xlogger.info(stake_log_message)
 
-            return receipt
+            return tx_hash
 
         except Exception as e:
             xlogger.debug(f"Staking Preparation Error for {self.address}: {str(e)}")
@@ -154,3 +265,26 @@ class ZenchainAsyncStaking:
             xlogger.debug(f"Staking Error Traceback for {self.address}:\n{traceback.format_exc()}")
 
             return None
+
+    async def precise_stake(
+            self,
+            stake_amount: Union[float, str],
+            reward_destination: int = 0,
+            preflight: Optional[PreflightState] = None,
+            fees: Optional[GasFees] = None,
+            plan: Optional[StakePlan] = None
+    ):
+        tx_hash = await self.submit_stake(stake_amount, reward_destination, preflight, fees, plan)
+        if tx_hash is None:
+            return None
+
+        try:
+            receipt = await ReceiptTracker.get(self.rpc_url).wait(tx_hash)
+            xlogger.info(f"Stake transaction for {self.address} mined: Hash={tx_hash.hex()}, "
+                         f"Status={receipt.get('status')}")
+            return receipt
+        except Exception as e:
+            # the transaction may have been dropped, the next one reads the nonce from the node
+            NonceManager.get(self.rpc_url).reset(self.address)
+            xlogger.error(f"Staking Error for {self.address}: {str(e)}")
+            return None
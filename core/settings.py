@@ -1,4 +1,4 @@
-from pydantic import field_validator
+from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings
 from functools import lru_cache
 
@@ -11,6 +11,39 @@ class EnvSettings(BaseSettings):
 
     delay_between_dependency_executions: list = '[10, 15]'
 
+    deferred_stake_confirmation: bool = False
+    chain_indexer: bool = True
+    action_retention_days: int = 30  # days actions stay in the actions table, 0 disables compaction
+
+    rpc_urls: list = ['https://zenchain-testnet.api.onfinality.io/public']
+    rpc_rate_limit: float = 10
+
+    database_url: str = ""  # SQLAlchemy async URL, empty for data/test.db SQLite
+    database_pool_size: int = 5
+    database_max_overflow: int = 10
+    database_pool_timeout: float = 30  # seconds waiting for a pooled connection
+    database_pool_recycle: int = 1800  # seconds before a server connection is replaced
+    db_write_batch_ms: int = 50  # milliseconds the database writer collects writes into one transaction
+    archive_database_url: str = ""  # SQLAlchemy async URL of archived actions, empty for data/archive.db SQLite
+
+    sqlite_journal_mode: str = "WAL"
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_busy_timeout: int = 5000  # milliseconds a connection waits for a lock
+    sqlite_cache_size: int = -65536  # negative is KiB, 64 MiB
+    sqlite_mmap_size: int = 268435456  # bytes, 256 MiB
+
+    @field_validator('sqlite_journal_mode', 'sqlite_synchronous')
+    def validate_sqlite_pragma(cls, value, info):
+        valid_values = {
+            'sqlite_journal_mode': ["DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"],
+            'sqlite_synchronous': ["OFF", "NORMAL", "FULL", "EXTRA"],
+        }[info.field_name]
+        value = value.upper()
+
+        if value not in valid_values:
+            raise ValueError(f"Invalid {info.field_name}: '{value}'. Must be one of: {', '.join(valid_values)}")
+        return value
+
     @field_validator('console_log')
     def validate_console_log(cls, value):
         value.upper()
@@ -46,8 +79,8 @@ class AppSettings(BaseSettings):
 
 
 class Settings(BaseSettings):
-    env: EnvSettings = EnvSettings()
-    app: AppSettings = AppSettings()
+    env: EnvSettings = Field(default_factory=EnvSettings)
+    app: AppSettings = Field(default_factory=AppSettings)
 
 
 @lru_cache()
@@ -55,4 +88,11 @@ def get_settings() -> Settings:
     return Settings()
 
 
-settings = get_settings()
+class LazySettings:
+    """ Settings read from the environment on first attribute access, not when the module is imported """
+
+    def __getattr__(self, name):
+        return getattr(get_settings(), name)
+
+
+settings = LazySettings()
@@ -35,6 +35,14 @@ class InterceptHandler(logging.Handler):
 class XLogger:
     def __init__(self, logger):
         self.logger = logger
+        self.log_prefix_var = contextvars.ContextVar("log_prefix_var", default="")
+        # sinks are added on the first message, importing the module reads no settings and opens no file
+        self.configured = False
+
+    def configure(self):
+        if self.configured:
+            return
+        self.configured = True
         self.logger.remove()
 
         self.logger.add(
@@ -56,25 +64,25 @@ class XLogger:
             enqueue=True
         )
 
-        self.log_prefix_var = contextvars.ContextVar("log_prefix_var", default="")
         logging.basicConfig(handlers=[InterceptHandler(self.log_prefix_var)], level=logging.DEBUG)
 
     def _bind(self):
-        return self.logger.bind(prefix_log_message=self.log_prefix_var.get())
+        self.configure()
+        return self.logger.opt(depth=1).bind(prefix_log_message=self.log_prefix_var.get())
 
     def info(self, message):
-        self.logger.opt(depth=1).bind(prefix_log_message=self.log_prefix_var.get()).info(message)
+        self._bind().info(message)
 
     def debug(self, message):
-        self.logger.opt(depth=1).bind(prefix_log_message=self.log_prefix_var.get()).debug(message)
+        self._bind().debug(message)
 
     def warning(self, message):
-        self.logger.opt(depth=1).bind(prefix_log_message=self.log_prefix_var.get()).warning(message)
+        self._bind().warning(message)
 
     def error(self, message):
-        self.logger.opt(depth=1).bind(prefix_log_message=self.log_prefix_var.get()).error(message)
+        self._bind().error(message)
 
     def critical(self, message):
-        self.logger.opt(depth=1).bind(prefix_log_message=self.log_prefix_var.get()).critical(message)
+        self._bind().critical(message)
 
 xlogger = XLogger(logger)
\ No newline at end of file
@@ -0,0 +1,155 @@
+import asyncio
+import json
+from collections import Counter
+from typing import Any, Dict, Optional, Tuple
+
+from web3.middleware import Web3Middleware
+from web3.types import RPCEndpoint, RPCResponse
+
+from core.utils.log import xlogger
+
+
+# method -> whether a response only holds until the next block, the others are kept for the whole run
+RPC_CACHED_METHODS: Dict[str, bool] = {
+    'eth_chainId': False,
+    'net_version': False,
+    'eth_gasPrice': True,
+    'eth_maxPriorityFeePerGas': True,
+    'eth_feeHistory': True,
+}
+
+
+class RpcResponseCache:
+    """
+    Responses of chain-wide reads shared by every AsyncWeb3 instance of an endpoint
+
+    Per-block responses are pinned to the latest block number seen in an ``eth_blockNumber``
+    response of the endpoint and dropped once a newer one is seen; until the endpoint's block
+    number has been read they are not cached. Keeps hit and miss counters per method so the
+    saved round-trips can be reported.
+    """
+
+    # key -> (block number the response holds for, None for the whole run, response)
+    _entries: Dict[Tuple[str, str, str], Tuple[Optional[int], RPCResponse]] = {}
+    _in_flight: Dict[Tuple[str, str, str], asyncio.Future] = {}
+    _heads: Dict[str, int] = {}  # endpoint -> latest block number seen
+    hits: Counter = Counter()
+    misses: Counter = Counter()
+
+    @classmethod
+    def get(cls, key: Tuple[str, str, str]) -> Optional[RPCResponse]:
+        entry = cls._entries.get(key)
+        if entry is None:
+            return None
+        block_number, response = entry
+        if block_number is not None and block_number != cls._heads.get(key[0]):
+            del cls._entries[key]
+            return None
+        return response
+
+    @classmethod
+    def put(cls, key: Tuple[str, str, str], response: RPCResponse, block_number: Optional[int]):
+        cls._entries[key] = (block_number, response)
+
+    @classmethod
+    def head(cls, endpoint: str) -> Optional[int]:
+        return cls._heads.get(endpoint)
+
+    @classmethod
+    def set_head(cls, endpoint: str, block_number: int):
+        """ Records the latest block number of the endpoint, dropping the responses of older blocks """
+
+        if cls._heads.get(endpoint) == block_number:
+            return
+        cls._heads[endpoint] = block_number
+        for key, (entry_block, _) in list(cls._entries.items()):
+            if key[0] == endpoint and entry_block is not None and entry_block != block_number:
+                del cls._entries[key]
+
+    @classmethod
+    def clear(cls):
+        cls._entries.clear()
+        cls._heads.clear()
+        cls.hits.clear()
+        cls.misses.clear()
+
+    @classmethod
+    def report(cls) -> str:
+        """ Hit and miss counts per method, hits are round-trips saved """
+
+        methods = sorted(set(cls.hits) | set(cls.misses))
+        if not methods:
+            return "RPC cache: no cacheable requests"
+        return "RPC cache: " + ", ".join(
+            f"{method} {cls.hits[method]} hits/{cls.misses[method]} misses" for method in methods
+        ) + f"; {sum(cls.hits.values())} requests saved"
+
+
+class RpcCacheMiddleware(Web3Middleware):
+    """
+    Serves chain id, gas price and fee history from RpcResponseCache
+
+    Concurrent requests for the same missing entry wait for a single round-trip. Every
+    ``eth_blockNumber`` response passing through moves the endpoint's block number on.
+    """
+
+    async def async_wrap_make_request(self, make_request):
+        endpoint = str(self._w3.provider.endpoint_uri)
+
+        async def middleware(method: RPCEndpoint, params: Any) -> RPCResponse:
+            if method == 'eth_blockNumber':
+                response = await make_request(method, params)
+                if response.get('result') is not None:
+                    result = response['result']
+                    RpcResponseCache.set_head(endpoint, int(result, 16) if isinstance(result, str) else result)
+                return response
+
+            if method not in RPC_CACHED_METHODS:
+                return await make_request(method, params)
+
+            block_number = None
+            if RPC_CACHED_METHODS[method]:
+                block_number = RpcResponseCache.head(endpoint)
+                if block_number is None:
+                    return await make_request(method, params)
+
+            key = (endpoint, method, json.dumps(params, default=str))
+            response = RpcResponseCache.get(key)
+            if response is not None:
+                RpcResponseCache.hits[method] += 1
+                return response
+
+            future = RpcResponseCache._in_flight.get(key)
+            if future is not None:
+                try:
+                    response = await asyncio.shield(future)
+                except asyncio.CancelledError:
+                    # the request was cancelled together with the caller that sent it, not with us
+                    if not future.cancelled() or asyncio.current_task().cancelling():
+                        raise
+                    return await middleware(method, params)
+                RpcResponseCache.hits[method] += 1
+                return response
+
+            RpcResponseCache.misses[method] += 1
+            future = RpcResponseCache._in_flight[key] = asyncio.get_running_loop().create_future()
+            try:
+                response = await make_request(method, params)
+                if 'error' not in response:
+                    # pinned to the block number read before the request, a newer block drops it
+                    RpcResponseCache.put(key, response, block_number)
+                future.set_result(response)
+                return response
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            except Exception as e:
+                future.set_exception(e)
+                # nobody may be waiting, keep asyncio from warning about it
+                future.exception()
+                raise
+            finally:
+                del RpcResponseCache._in_flight[key]
+
+        xlogger.debug(f"RPC response cache enabled for {endpoint}")
+        return middleware
@@ -0,0 +1,141 @@
+import asyncio
+from dataclasses import dataclass
+from statistics import median
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from web3 import AsyncWeb3
+
+from core.utils.log import xlogger
+from core.utils.w3.pool import AsyncWeb3Pool
+
+
+FEE_HISTORY_BLOCKS = 10  # blocks sampled per fee history read
+FEE_HISTORY_PERCENTILE = 50  # reward percentile used for the priority fee
+BASE_FEE_MULTIPLIER = 2  # headroom for the base fee growing until inclusion
+GAS_LIMIT_MARGIN = 1.2  # multiplier applied to estimated gas limits
+DEFAULT_GAS_LIMIT = 1000000  # used when a gas estimate fails
+
+
+@dataclass
+class GasFees:
+    """Fee parameters of a transaction, EIP-1559 when the chain reports a base fee"""
+    block_number: int
+    max_fee_per_gas: Optional[int] = None
+    max_priority_fee_per_gas: Optional[int] = None
+    gas_price: Optional[int] = None  # legacy pricing
+
+    @property
+    def max_price_per_gas(self) -> int:
+        """Highest price per gas the transaction may be charged"""
+        return self.max_fee_per_gas if self.max_fee_per_gas is not None else self.gas_price
+
+    def tx_params(self) -> Dict[str, int]:
+        if self.max_fee_per_gas is not None:
+            return {
+                'maxFeePerGas': self.max_fee_per_gas,
+                'maxPriorityFeePerGas': self.max_priority_fee_per_gas
+            }
+        return {'gasPrice': self.gas_price}
+
+
+class GasOracle:
+    """
+    Shared fee and gas limit source of an endpoint
+
+    Fee history is sampled at most once per block and shared by every transaction
+    built meanwhile. Gas limits are estimated once per contract method and reused.
+    """
+
+    _oracles: Dict[str, 'GasOracle'] = {}
+
+    def __init__(self, w3: AsyncWeb3):
+        self.w3 = w3
+        self._loop = asyncio.get_running_loop()
+        self._fees: Optional[GasFees] = None
+        self._fees_block: Optional[int] = None  # latest block number when the fees were read
+        self._lock: Optional[asyncio.Lock] = None
+        self._limit_lock: Optional[asyncio.Lock] = None
+        self._gas_limits: Dict[str, int] = {}
+
+    @classmethod
+    def get(cls, rpc_url: str) -> 'GasOracle':
+        """
+        Returns the gas oracle of the endpoint, creating it on first use in the running loop
+
+        :param rpc_url: JSON-RPC endpoint
+        :return: Gas oracle
+        """
+
+        oracle = cls._oracles.get(rpc_url)
+        # the locks are bound to the loop they were first used in
+        if oracle is None or oracle._loop is not asyncio.get_running_loop():
+            oracle = cls._oracles[rpc_url] = cls(AsyncWeb3Pool.get(rpc_url))
+        return oracle
+
+    async def fees(self) -> GasFees:
+        """
+        Returns the current fees, reading fee history when a new block was mined since the last sample
+
+        :return: Transaction fees
+        """
+
+        block_number = await self.w3.eth.block_number
+        if self._fees is not None and self._fees_block == block_number:
+            return self._fees
+
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            # another caller may have refreshed the fees while we were waiting
+            if self._fees is None or self._fees_block != block_number:
+                self._fees = await self._read_fees(block_number)
+                self._fees_block = block_number
+                xlogger.debug(f"Gas fees at block {self._fees.block_number}: {self._fees.tx_params()}")
+        return self._fees
+
+    async def _read_fees(self, latest_block: int) -> GasFees:
+        try:
+            history = await self.w3.eth.fee_history(FEE_HISTORY_BLOCKS, 'latest', [FEE_HISTORY_PERCENTILE])
+            block_number = history['oldestBlock'] + len(history['gasUsedRatio']) - 1
+            # the last entry is the base fee of the next block
+            base_fee = history['baseFeePerGas'][-1]
+            if base_fee:
+                priority_fee = int(median(reward[0] for reward in history['reward'])) \
+                    if history.get('reward') else 0
+                return GasFees(
+                    block_number=block_number,
+                    max_fee_per_gas=base_fee * BASE_FEE_MULTIPLIER + priority_fee,
+                    max_priority_fee_per_gas=priority_fee
+                )
+        except Exception as e:
+            xlogger.debug(f"Fee history unavailable, using legacy gas price: {e}")
+            block_number = latest_block
+
+        gas_price = await self.w3.eth.gas_price
+        return GasFees(block_number=block_number, gas_price=gas_price)
+
+    async def gas_limit(self, method: str, estimate: Callable[[], Awaitable[Any]]) -> int:
+        """
+        Returns the cached gas limit of a contract method, estimating it on first use
+
+        :param method: Method name the limit is cached under
+        :param estimate: Coroutine function returning the gas estimate of the call
+        :return: Gas limit with margin
+        """
+
+        gas_limit = self._gas_limits.get(method)
+        if gas_limit is not None:
+            return gas_limit
+
+        if self._limit_lock is None:
+            self._limit_lock = asyncio.Lock()
+        async with self._limit_lock:
+            gas_limit = self._gas_limits.get(method)
+            if gas_limit is None:
+                try:
+                    gas_limit = self._gas_limits[method] = int(await estimate() * GAS_LIMIT_MARGIN)
+                    xlogger.debug(f"Gas limit of {method} estimated: {gas_limit}")
+                except Exception as e:
+                    xlogger.warning(f"Gas estimate of {method} failed, using {DEFAULT_GAS_LIMIT}: {e}")
+                    gas_limit = DEFAULT_GAS_LIMIT
+        return gas_limit
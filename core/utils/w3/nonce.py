@@ -0,0 +1,110 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, TypeVar
+
+from web3 import AsyncWeb3
+
+from core.utils.log import xlogger
+from core.utils.w3.pool import AsyncWeb3Pool
+
+
+T = TypeVar('T')
+
+NONCE_TOO_LOW_ERRORS = ('nonce too low', 'transaction is outdated')  # geth/frontier and substrate pool wording
+# a pending transaction already has the nonce: the same one resent, or another one not paying more
+NONCE_IN_USE_ERRORS = ('already known', 'replacement transaction underpriced', 'priority is too low')
+
+
+def is_stale_nonce(error: Exception) -> bool:
+    message = str(error).lower()
+    return any(text in message for text in NONCE_TOO_LOW_ERRORS + NONCE_IN_USE_ERRORS)
+
+
+class NonceManager:
+    """
+    Nonces handed out locally per address
+
+    The pending nonce of an address is read once (or seeded from a bulk read) and then
+    incremented locally for every sent transaction, so several transactions of one
+    address can be sent back to back without a transaction count round-trip each.
+    """
+
+    _managers: Dict[str, 'NonceManager'] = {}
+
+    def __init__(self, w3: AsyncWeb3):
+        self.w3 = w3
+        self._nonces: Dict[str, int] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    @classmethod
+    def get(cls, rpc_url: str) -> 'NonceManager':
+        """
+        Returns the nonce manager of the endpoint, creating it on first use
+
+        :param rpc_url: JSON-RPC endpoint
+        :return: Nonce manager
+        """
+
+        manager = cls._managers.get(rpc_url)
+        if manager is None:
+            manager = cls._managers[rpc_url] = cls(AsyncWeb3Pool.get(rpc_url))
+        return manager
+
+    def seed(self, address: str, nonce: int):
+        """
+        Stores a pending nonce read elsewhere, unless the local nonce is already ahead of it
+
+        A read taken before transactions sent since is behind the local nonce and ignored.
+        A local nonce left ahead of the chain by a dropped transaction is cleared by ``reset``
+        on failed sends and confirmations instead.
+
+        :param address: Checksum address
+        :param nonce: Pending transaction count
+        """
+
+        local = self._nonces.get(address)
+        if local is None or nonce > local:
+            self._nonces[address] = nonce
+
+    def reset(self, address: str):
+        """ Forget the local nonce, the next transaction reads it from the node again """
+
+        self._nonces.pop(address, None)
+
+    async def _next_nonce(self, address: str) -> int:
+        nonce = self._nonces.get(address)
+        if nonce is None:
+            nonce = await self.w3.eth.get_transaction_count(address, 'pending')
+            xlogger.debug(f"Nonce of {address} synced from node: {nonce}")
+        return nonce
+
+    async def submit(self, address: str, send: Callable[[int], Awaitable[T]]) -> T:
+        """
+        Calls `send` with the next nonce of the address, one call per address at a time
+
+        On a "nonce too low", "already known" or "replacement transaction underpriced" error
+        the nonce is read from the node again and the call is retried once. On any other error the local nonce is dropped, since it is unknown
+        whether the transaction reached the node.
+
+        :param address: Checksum address
+        :param send: Coroutine function building, signing and sending the transaction
+        :return: Result of `send`
+        """
+
+        lock = self._locks.get(address)
+        if lock is None:
+            lock = self._locks[address] = asyncio.Lock()
+
+        async with lock:
+            for attempt in range(2):
+                nonce = await self._next_nonce(address)
+                try:
+                    result = await send(nonce)
+                except Exception as e:
+                    self.reset(address)
+                    if attempt == 0 and is_stale_nonce(e):
+                        xlogger.warning(f"Nonce {nonce} of {address} is already used ({e}), resyncing")
+                        continue
+                    raise
+
+                self._nonces[address] = nonce + 1
+                return result
@@ -0,0 +1,91 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from web3 import AsyncWeb3
+from web3.contract import AsyncContract
+
+from core.utils.log import xlogger
+from core.utils.w3.cache import RpcCacheMiddleware
+from core.utils.w3.rpc_pool import RpcPoolProvider
+
+
+class AsyncWeb3Pool:
+    """
+    Shared AsyncWeb3 instances keyed by (rpc url, proxy)
+
+    Reusing the instance keeps the provider's cached HTTP session and lets contract
+    objects be built (and their ABI processed) once instead of once per account.
+    Every instance serves chain-wide reads from the shared RpcResponseCache.
+    """
+
+    _instances: Dict[Tuple[str, Optional[str]], AsyncWeb3] = {}
+    _contracts: Dict[Tuple[str, Optional[str], str], AsyncContract] = {}
+    # rpc url -> (all endpoints, requests per second per endpoint)
+    _rpc_pools: Dict[str, Tuple[List[str], Optional[float]]] = {}
+
+    @classmethod
+    def register_rpc_pool(cls, rpc_url: str, endpoint_uris: Sequence[str], rate_limit: Optional[float] = None):
+        """
+        Makes providers created for `rpc_url` spread requests over several endpoints
+
+        :param rpc_url: JSON-RPC endpoint the pool is looked up by
+        :param endpoint_uris: All endpoints of the pool
+        :param rate_limit: Requests per second per endpoint
+        """
+
+        endpoint_uris = list(dict.fromkeys([rpc_url, *endpoint_uris]))
+        if len(endpoint_uris) > 1:
+            cls._rpc_pools[rpc_url] = (endpoint_uris, rate_limit)
+
+    @classmethod
+    def get(cls, rpc_url: str, proxy: str = None) -> AsyncWeb3:
+        """
+        Returns the AsyncWeb3 instance for the endpoint and proxy, creating it on first use
+
+        :param rpc_url: JSON-RPC endpoint
+        :param proxy: Proxy URL to send requests through
+        :return: AsyncWeb3 instance
+        """
+
+        key = (rpc_url, proxy)
+        w3 = cls._instances.get(key)
+        if w3 is None:
+            xlogger.debug(f"Creating AsyncWeb3 provider for {rpc_url} (proxy: {bool(proxy)})")
+            if rpc_url in cls._rpc_pools:
+                endpoint_uris, rate_limit = cls._rpc_pools[rpc_url]
+                provider = RpcPoolProvider(endpoint_uris, request_kwargs=dict(proxy=proxy), rate_limit=rate_limit)
+            else:
+                provider = AsyncWeb3.AsyncHTTPProvider(rpc_url, request_kwargs=dict(proxy=proxy))
+            w3 = cls._instances[key] = AsyncWeb3(provider)
+            w3.middleware_onion.add(RpcCacheMiddleware, 'rpc_cache')
+        return w3
+
+    @classmethod
+    def get_contract(cls, rpc_url: str, address: str, abi: Sequence[dict],
+                     proxy: str = None) -> AsyncContract:
+        """
+        Returns the contract bound to the pooled AsyncWeb3 instance, building it on first use
+
+        :param rpc_url: JSON-RPC endpoint
+        :param address: Checksum contract address
+        :param abi: Contract ABI
+        :param proxy: Proxy URL to send requests through
+        :return: Contract object
+        """
+
+        key = (rpc_url, proxy, address)
+        contract = cls._contracts.get(key)
+        if contract is None:
+            contract = cls._contracts[key] = cls.get(rpc_url, proxy).eth.contract(
+                address=address,
+                abi=abi
+            )
+        return contract
+
+    @classmethod
+    async def close(cls):
+        """ Close HTTP sessions of all pooled providers and empty the pool """
+
+        for w3 in cls._instances.values():
+            await w3.provider.disconnect()
+        cls._instances.clear()
+        cls._contracts.clear()
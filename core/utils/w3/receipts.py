@@ -0,0 +1,166 @@
+import asyncio
+from collections import deque
+from typing import Deque, Dict, Optional, Set, Tuple, Union
+
+from hexbytes import HexBytes
+from web3 import AsyncWeb3
+from web3.exceptions import TimeExhausted, TransactionNotFound
+from web3.types import TxReceipt
+
+from core.utils.log import xlogger
+from core.utils.w3.pool import AsyncWeb3Pool
+
+
+RECEIPT_POLL_INTERVAL = 2  # seconds between eth_blockNumber polls
+RECEIPT_TIMEOUT = 120  # seconds, same as web3's wait_for_transaction_receipt
+RECEIPT_MAX_BLOCKS_PER_POLL = 20  # blocks fetched per poll when catching up
+RECEIPT_RECENT_BLOCKS = 16  # blocks whose tx hashes are remembered for late waiters
+
+
+class ReceiptTracker:
+    """
+    Single block watcher resolving the receipts of all pending transactions
+
+    One loop polls ``eth_blockNumber``, fetches the new blocks with their tx hashes
+    and reads receipts only for the hashes somebody waits for, instead of every
+    sender polling ``eth_getTransactionReceipt`` on its own.
+    """
+
+    _trackers: Dict[str, 'ReceiptTracker'] = {}
+
+    def __init__(self, w3: AsyncWeb3, poll_interval: float = RECEIPT_POLL_INTERVAL):
+        self.w3 = w3
+        self.poll_interval = poll_interval
+
+        self._loop = asyncio.get_running_loop()
+        self._task: Optional[asyncio.Task] = None
+        self._pending: Dict[HexBytes, asyncio.Future] = {}
+        self._waiters: Dict[HexBytes, int] = {}  # waiters per pending hash, the last one removes it
+        self._mined: Set[HexBytes] = set()  # pending hashes seen in a block, receipt not read yet
+        self._unseen: Set[HexBytes] = set()  # pending hashes possibly mined in skipped blocks
+        self._recent: Deque[Tuple[int, Set[HexBytes]]] = deque(maxlen=RECEIPT_RECENT_BLOCKS)
+        self._last_block: Optional[int] = None
+
+    @classmethod
+    def get(cls, rpc_url: str) -> 'ReceiptTracker':
+        """
+        Returns the tracker of the endpoint, creating it on first use in the running loop
+
+        :param rpc_url: JSON-RPC endpoint
+        :return: Receipt tracker
+        """
+
+        tracker = cls._trackers.get(rpc_url)
+        # futures and the watcher task are bound to the loop they were created in
+        if tracker is None or tracker._loop is not asyncio.get_running_loop():
+            tracker = cls._trackers[rpc_url] = cls(AsyncWeb3Pool.get(rpc_url))
+        return tracker
+
+    async def wait(self, tx_hash: Union[HexBytes, str], timeout: float = RECEIPT_TIMEOUT) -> TxReceipt:
+        """
+        Waits until the transaction is mined and returns its receipt
+
+        :param tx_hash: Transaction hash
+        :param timeout: Seconds to wait before giving up
+        :return: Transaction receipt
+        """
+
+        tx_hash = HexBytes(tx_hash)
+        future = self._pending.get(tx_hash)
+        if future is None:
+            future = self._pending[tx_hash] = self._loop.create_future()
+            # the block may have been read while the transaction was being sent
+            if any(tx_hash in hashes for _, hashes in self._recent):
+                self._mined.add(tx_hash)
+        self._waiters[tx_hash] = self._waiters.get(tx_hash, 0) + 1
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            raise TimeExhausted(
+                f"Transaction {tx_hash.to_0x_hex()} is not in the chain after {timeout} seconds"
+            )
+        finally:
+            self._waiters[tx_hash] -= 1
+            if not self._waiters[tx_hash]:
+                del self._waiters[tx_hash]
+                del self._pending[tx_hash]
+                self._mined.discard(tx_hash)
+                self._unseen.discard(tx_hash)
+
+    async def _run(self):
+        while self._pending:
+            try:
+                await self._poll()
+            except Exception as e:
+                xlogger.warning(f"Receipt tracker poll failed: {e}")
+            await asyncio.sleep(self.poll_interval)
+
+    async def _poll(self):
+        block_number = await self.w3.eth.block_number
+        if self._last_block is None:
+            self._last_block = block_number - 1
+
+        first_block = max(self._last_block + 1, block_number - RECEIPT_MAX_BLOCKS_PER_POLL + 1)
+        if first_block > self._last_block + 1:
+            # the blocks in between are not fetched, their transactions are looked up by hash instead
+            xlogger.debug(f"Receipt tracker skipped blocks {self._last_block + 1}-{first_block - 1}")
+            self._unseen.update(self._pending)
+        if first_block <= block_number:
+            async with self.w3.batch_requests() as batch:
+                for number in range(first_block, block_number + 1):
+                    batch.add(self.w3.eth.get_block(number))
+                blocks = await batch.async_execute()
+
+            for block in blocks:
+                hashes = set(block['transactions'])
+                self._recent.append((block['number'], hashes))
+                self._mined.update(hashes.intersection(self._pending))
+            self._last_block = block_number
+
+        if self._unseen:
+            await self._resolve_unseen()
+
+        mined = [tx_hash for tx_hash in self._mined if tx_hash in self._pending]
+        if not mined:
+            return
+
+        async with self.w3.batch_requests() as batch:
+            for tx_hash in mined:
+                batch.add(self.w3.eth.get_transaction_receipt(tx_hash))
+            receipts = await batch.async_execute()
+
+        for tx_hash, receipt in zip(mined, receipts):
+            self._mined.discard(tx_hash)
+            future = self._pending.get(tx_hash)
+            if future is not None and not future.done():
+                future.set_result(receipt)
+        xlogger.debug(f"Receipts resolved for {len(mined)} transactions at block {block_number}")
+
+    async def _resolve_unseen(self):
+        """ Reads the receipts of the pending hashes that may be in skipped blocks one by one """
+
+        unseen = [tx_hash for tx_hash in self._unseen if tx_hash in self._pending and tx_hash not in self._mined]
+        results = await asyncio.gather(
+            *(self.w3.eth.get_transaction_receipt(tx_hash) for tx_hash in unseen), return_exceptions=True
+        )
+
+        resolved = 0
+        for tx_hash, result in zip(unseen, results):
+            if isinstance(result, TransactionNotFound):
+                # not mined yet, the block it lands in is fetched by a later poll
+                self._unseen.discard(tx_hash)
+            elif isinstance(result, Exception):
+                xlogger.warning(f"Receipt lookup of {tx_hash.to_0x_hex()} failed: {result}")
+            else:
+                self._unseen.discard(tx_hash)
+                future = self._pending.get(tx_hash)
+                if future is not None and not future.done():
+                    future.set_result(result)
+                    resolved += 1
+        self._unseen.intersection_update(self._pending)
+        if resolved:
+            xlogger.debug(f"Receipts resolved by hash for {resolved} transactions after skipped blocks")
@@ -0,0 +1,243 @@
+import asyncio
+import itertools
+from time import monotonic
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple, Union
+
+from web3 import AsyncWeb3, Web3
+from web3.providers.async_base import AsyncJSONBaseProvider
+from web3.types import RPCEndpoint, RPCResponse
+
+from core.utils.log import xlogger
+
+
+RPC_RATE_LIMIT = 10  # requests per second per endpoint
+RPC_LATENCY_ALPHA = 0.2  # weight of the newest sample in the latency average
+RPC_BREAKER_THRESHOLD = 3  # consecutive failures opening the circuit of an endpoint
+RPC_BREAKER_COOLDOWN = 30  # seconds an open circuit keeps the endpoint out of rotation
+RPC_PROBE_INTERVAL = 60  # seconds between latency probes of all endpoints
+
+WRITE_METHODS = {RPCEndpoint('eth_sendRawTransaction'), RPCEndpoint('eth_sendTransaction')}
+THROTTLED_ERROR_CODES = {429, -32005, -32029}
+THROTTLED_ERROR_TEXTS = ('rate limit', 'too many requests', 'exceeded')
+ALREADY_KNOWN_ERROR_TEXTS = ('already known', 'already imported')
+
+
+class RpcEndpointState:
+    """
+    Health of one JSON-RPC endpoint, shared by every provider using it
+
+    Tracks an average latency, success and failure counts and a circuit breaker
+    which takes the endpoint out of rotation after consecutive failures.
+    """
+
+    _states: Dict[str, 'RpcEndpointState'] = {}
+
+    def __init__(self, url: str, rate: Optional[float] = RPC_RATE_LIMIT):
+        self.url = url
+        self.rate = rate
+        self.latency: Optional[float] = None
+        self.successes = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self.probed_at = 0.0
+        self._next_request_at = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+
+    @classmethod
+    def get(cls, url: str, rate: Optional[float] = RPC_RATE_LIMIT) -> 'RpcEndpointState':
+        state = cls._states.get(url)
+        if state is None:
+            state = cls._states[url] = cls(url, rate)
+        return state
+
+    @property
+    def available(self) -> bool:
+        """ Circuit closed, or open long enough to let a trial request through """
+
+        return monotonic() >= self.open_until
+
+    @property
+    def failure_rate(self) -> float:
+        total = self.successes + self.failures
+        return self.failures / total if total else 0.0
+
+    def record_success(self, latency: float):
+        self.successes += 1
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self.latency = latency if self.latency is None \
+            else RPC_LATENCY_ALPHA * latency + (1 - RPC_LATENCY_ALPHA) * self.latency
+
+    def record_failure(self):
+        self.failures += 1
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= RPC_BREAKER_THRESHOLD:
+            self.open_until = monotonic() + RPC_BREAKER_COOLDOWN
+            xlogger.warning(f"RPC endpoint {self.url} failed {self.consecutive_failures} times in a row, "
+                            f"out of rotation for {RPC_BREAKER_COOLDOWN} seconds")
+
+    async def throttle(self):
+        """ Wait for the next request slot of the endpoint """
+
+        if not self.rate:
+            return
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            delay = self._next_request_at - monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._next_request_at = max(self._next_request_at, monotonic()) + 1 / self.rate
+
+
+def _is_throttled(response: Union[RPCResponse, List[RPCResponse]]) -> bool:
+    error = response.get('error') if isinstance(response, dict) else None
+    if not error:
+        return False
+    if isinstance(error, str):
+        message, code = error, None
+    else:
+        message, code = str(error.get('message', '')), error.get('code')
+    return code in THROTTLED_ERROR_CODES or any(text in message.lower() for text in THROTTLED_ERROR_TEXTS)
+
+
+def _is_already_known(response: RPCResponse) -> bool:
+    error = response.get('error')
+    message = error if isinstance(error, str) else (error or {}).get('message', '')
+    return any(text in str(message).lower() for text in ALREADY_KNOWN_ERROR_TEXTS)
+
+
+class RpcPoolProvider(AsyncJSONBaseProvider):
+    """
+    Provider spreading requests over several JSON-RPC endpoints
+
+    Reads go round-robin over the endpoints in rotation and fail over to the next one
+    on errors or throttling. Transactions are sent to the most reliable endpoint, and
+    the same signed transaction is resent elsewhere if that endpoint fails. Endpoint
+    latency is probed periodically and every endpoint has its own rate limit and
+    circuit breaker.
+    """
+
+    def __init__(
+            self,
+            endpoint_uris: Sequence[str],
+            request_kwargs: Optional[Dict[str, Any]] = None,
+            rate_limit: Optional[float] = RPC_RATE_LIMIT
+    ):
+        super().__init__()
+        # the first endpoint names the pool, caches keyed by endpoint_uri stay stable
+        self.endpoint_uri = endpoint_uris[0]
+        self._endpoints: List[Tuple[RpcEndpointState, AsyncWeb3.AsyncHTTPProvider]] = [
+            (RpcEndpointState.get(uri, rate_limit),
+             AsyncWeb3.AsyncHTTPProvider(uri, request_kwargs=request_kwargs, exception_retry_configuration=None))
+            for uri in endpoint_uris
+        ]
+        self._round_robin = itertools.cycle(range(len(self._endpoints)))
+        self._probe_task: Optional[asyncio.Task] = None
+
+    def __str__(self) -> str:
+        return f"RPC pool {', '.join(state.url for state, _ in self._endpoints)}"
+
+    def _route(self, write: bool) -> List[Tuple[RpcEndpointState, AsyncWeb3.AsyncHTTPProvider]]:
+        if any(monotonic() - state.probed_at >= RPC_PROBE_INTERVAL for state, _ in self._endpoints) \
+                and (self._probe_task is None or self._probe_task.done()):
+            self._probe_task = asyncio.create_task(self.probe())
+
+        available = [endpoint for endpoint in self._endpoints if endpoint[0].available]
+        # all circuits open: try every endpoint rather than failing outright
+        candidates = available or list(self._endpoints)
+
+        if write:
+            return sorted(candidates, key=lambda endpoint: (
+                endpoint[0].failure_rate,
+                endpoint[0].latency if endpoint[0].latency is not None else float('inf')
+            ))
+
+        start = next(self._round_robin) % len(candidates)
+        return candidates[start:] + candidates[:start]
+
+    async def probe(self):
+        """ Measure the latency of every endpoint with eth_blockNumber """
+
+        async def probe_one(state: RpcEndpointState, provider: AsyncWeb3.AsyncHTTPProvider):
+            state.probed_at = monotonic()
+            started = monotonic()
+            try:
+                response = await provider.make_request(RPCEndpoint('eth_blockNumber'), [])
+            except Exception as e:
+                xlogger.debug(f"Probe of RPC endpoint {state.url} failed: {e}")
+                state.record_failure()
+                return
+            if 'error' in response:
+                state.record_failure()
+            else:
+                state.record_success(monotonic() - started)
+
+        await asyncio.gather(*[probe_one(state, provider) for state, provider in self._endpoints])
+        xlogger.debug("RPC endpoint latencies: " + ", ".join(
+            f"{state.url}={state.latency:.3f}s" if state.latency is not None else f"{state.url}=n/a"
+            for state, _ in self._endpoints
+        ))
+
+    async def _route_request(self, write: bool, send) -> Union[RPCResponse, List[RPCResponse]]:
+        last_error: Optional[Exception] = None
+        last_response = None
+        for state, provider in self._route(write):
+            await state.throttle()
+            started = monotonic()
+            try:
+                response = await send(provider)
+            except Exception as e:
+                xlogger.debug(f"RPC endpoint {state.url} request failed: {e}")
+                state.record_failure()
+                last_error = e
+                continue
+
+            if _is_throttled(response):
+                xlogger.debug(f"RPC endpoint {state.url} is throttling requests")
+                state.record_failure()
+                last_response = response
+                continue
+
+            state.record_success(monotonic() - started)
+            return response
+
+        if last_response is not None:
+            return last_response
+        raise last_error
+
+    async def make_request(self, method: RPCEndpoint, params: Any) -> RPCResponse:
+        write = method in WRITE_METHODS
+        attempted: Set[str] = set()
+
+        async def send(provider: AsyncWeb3.AsyncHTTPProvider) -> RPCResponse:
+            resent = bool(attempted)
+            attempted.add(provider.endpoint_uri)
+            response = await provider.make_request(method, params)
+            # an earlier endpoint accepted the transaction before failing, it is not an error
+            if write and resent and 'error' in response and _is_already_known(response):
+                return {'jsonrpc': '2.0', 'id': response.get('id'),
+                        'result': Web3.keccak(hexstr=params[0]).to_0x_hex()}
+            return response
+
+        return await self._route_request(write, send)
+
+    async def make_batch_request(
+            self,
+            batch_requests: List[Tuple[RPCEndpoint, Any]]
+    ) -> Union[List[RPCResponse], RPCResponse]:
+        write = any(method in WRITE_METHODS for method, _ in batch_requests)
+        return await self._route_request(write, lambda provider: provider.make_batch_request(batch_requests))
+
+    async def is_connected(self, show_traceback: bool = False) -> bool:
+        for _, provider in self._endpoints:
+            if await provider.is_connected(show_traceback):
+                return True
+        return False
+
+    async def disconnect(self) -> None:
+        if self._probe_task is not None:
+            self._probe_task.cancel()
+        for _, provider in self._endpoints:
+            await provider.disconnect()
@@ -0,0 +1,146 @@
+import asyncio
+import atexit
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from eth_account import Account
+from hexbytes import HexBytes
+
+from core.utils.log import xlogger
+
+
+SIGNING_WORKERS = os.cpu_count() or 1  # worker processes signing transactions
+SIGNING_CHUNK_SIZE = 256  # transactions sent to a worker per task in batch signing
+SIGNING_BATCH_DELAY = 0.01  # seconds sign() waits for concurrent transactions to share its batch
+
+
+def _sign_transactions(items: Sequence[Tuple[Dict, str]]) -> List[Tuple[bytes, bytes]]:
+    """
+    Worker side: signs every (transaction, private key) pair and returns raw transactions
+    with their hashes. Keys live only in the arguments of this call.
+    """
+    signed = []
+    for tx, private_key in items:
+        signed_tx = Account.sign_transaction(tx, private_key)
+        signed.append((bytes(signed_tx.raw_transaction), bytes(signed_tx.hash)))
+    return signed
+
+
+class TransactionSigner:
+    """
+    Transaction signing in a process pool
+
+    Signing (keccak and ECDSA) is CPU-bound, so it runs in worker processes instead of
+    stalling the event loop. Private keys are passed with each task and are not kept
+    by the workers.
+
+    A worker round trip costs about as much as signing a single transaction, so
+    ``sign`` does not send each transaction on its own: calls made within
+    ``SIGNING_BATCH_DELAY`` of each other are signed together by ``sign_many``.
+    """
+
+    _executor: Optional[ProcessPoolExecutor] = None
+    _workers: int = SIGNING_WORKERS
+
+    _batch: List[Tuple[Dict, str, asyncio.Future]] = []
+    _batch_loop: Optional[asyncio.AbstractEventLoop] = None
+    _batch_handle: Optional[asyncio.TimerHandle] = None
+    _batch_tasks: Set[asyncio.Task] = set()  # running batches, referenced until they finish
+
+    @classmethod
+    def configure(cls, workers: int):
+        """ Set the number of worker processes, the running pool is shut down """
+
+        cls.shutdown()
+        cls._workers = workers
+
+    @classmethod
+    def get_executor(cls) -> ProcessPoolExecutor:
+        if cls._executor is None:
+            xlogger.debug(f"Starting signing process pool with {cls._workers} workers")
+            cls._executor = ProcessPoolExecutor(max_workers=cls._workers)
+            atexit.register(cls.shutdown)
+        return cls._executor
+
+    @classmethod
+    async def sign(cls, tx: Dict, private_key: str) -> Tuple[HexBytes, HexBytes]:
+        """
+        Signs a transaction in the process pool, batched with concurrent calls
+
+        :param tx: Transaction dict with all fields filled in
+        :param private_key: Private key of the sender
+        :return: Raw signed transaction and its hash
+        """
+
+        loop = asyncio.get_running_loop()
+        # a batch left by a closed loop can never be flushed
+        if cls._batch_loop is not loop:
+            cls._batch, cls._batch_loop, cls._batch_handle = [], loop, None
+
+        future = loop.create_future()
+        cls._batch.append((tx, private_key, future))
+        if len(cls._batch) >= SIGNING_CHUNK_SIZE:
+            cls._flush_batch()
+        elif cls._batch_handle is None:
+            cls._batch_handle = loop.call_later(SIGNING_BATCH_DELAY, cls._flush_batch)
+        return await future
+
+    @classmethod
+    def _flush_batch(cls):
+        if cls._batch_handle is not None:
+            cls._batch_handle.cancel()
+        batch, cls._batch, cls._batch_handle = cls._batch, [], None
+        # keys of callers cancelled while waiting are not sent to the workers
+        batch = [(tx, private_key, future) for tx, private_key, future in batch if not future.done()]
+        if batch:
+            task = cls._batch_loop.create_task(cls._sign_batch(batch))
+            cls._batch_tasks.add(task)
+            task.add_done_callback(cls._batch_tasks.discard)
+
+    @classmethod
+    async def _sign_batch(cls, batch: List[Tuple[Dict, str, asyncio.Future]]):
+        try:
+            signed = await cls.sign_many([(tx, private_key) for tx, private_key, _ in batch])
+        except Exception as e:
+            xlogger.debug(f"Signing batch of {len(batch)} transactions failed: {e}")
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, _, future), result in zip(batch, signed):
+            if not future.done():
+                future.set_result(result)
+
+    @classmethod
+    async def sign_many(
+            cls,
+            items: Sequence[Tuple[Dict, str]],
+            chunk_size: int = SIGNING_CHUNK_SIZE
+    ) -> List[Tuple[HexBytes, HexBytes]]:
+        """
+        Signs many transactions, spreading chunks of them across the workers
+
+        :param items: (transaction, private key) pairs
+        :param chunk_size: Transactions per worker task
+        :return: Raw signed transactions and their hashes, in the order of `items`
+        """
+
+        loop = asyncio.get_running_loop()
+        executor = cls.get_executor()
+        chunks = await asyncio.gather(*[
+            loop.run_in_executor(executor, _sign_transactions, items[start:start + chunk_size])
+            for start in range(0, len(items), chunk_size)
+        ])
+        return [(HexBytes(raw_transaction), HexBytes(tx_hash))
+                for chunk in chunks for raw_transaction, tx_hash in chunk]
+
+    @classmethod
+    def shutdown(cls):
+        """ Stop the worker processes """
+
+        if cls._executor is not None:
+            atexit.unregister(cls.shutdown)
+            cls._executor.shutdown(wait=True)
+            cls._executor = None
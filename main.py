@@ -2,8 +2,7 @@ import asyncio
 import os
 import sys
 
-from core.jobs import main_loop
-from core.services.account_create import create_accounts, print_account_creation_report
+from core.database.connect import dispose_db, init_db
 from core.utils.art import ascii_art
 
 
@@ -18,6 +17,14 @@ def welcome_message():
     print("5. Exit")
 
 
+async def with_database(coroutine):
+    init_db()
+    try:
+        return await coroutine
+    finally:
+        await dispose_db()
+
+
 def create_accounts_interactive(account_data_file: str = None, proxy_file: str = None):
     account_data_file = input("Enter path to accounts data file (CSV): ")
     proxy_file = input("Enter path to proxy file: ")
@@ -30,14 +37,19 @@ def create_accounts_interactive(account_data_file: str = None, proxy_file: str =
         print(f"Error: Proxy file {proxy_file} does not exist.")
         return
 
-    result = asyncio.run(create_accounts(account_data_file, proxy_file))
+    # services are imported by the option using them, the menu shows without loading web3
+    from core.services.account_create import create_accounts, print_account_creation_report
+
+    result = asyncio.run(with_database(create_accounts(account_data_file, proxy_file)))
     print_account_creation_report(result)
 
 
 
 def start_farming():
+    from core.jobs import main_loop
+
     try:
-        asyncio.run(main_loop())
+        asyncio.run(with_database(main_loop()))
     except Exception as e:
         print(f"An error occurred during export: {str(e)}")
         return False
@@ -56,10 +68,13 @@ def export_to_csv():
 
 
 def view_statistics():
+    from core.services.portfolio import load_portfolio_report, print_portfolio_report
+
     try:
-        print("Soon")
+        report = asyncio.run(with_database(load_portfolio_report()))
+        print_portfolio_report(report)
     except Exception as e:
-        print(f"An error occurred during export: {str(e)}")
+        print(f"An error occurred while building statistics: {str(e)}")
         return False
     return True
 
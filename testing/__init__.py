@@ -0,0 +1,5 @@
+"""
+Local stand-ins for the external services the farmer talks to, used by the tests and benchmarks
+
+Nothing in ``core`` imports this package, the application runs without it.
+"""
@@ -0,0 +1,396 @@
+"""
+Local stand-in for captcha solving services
+
+Speaks the 2captcha ``in.php``/``res.php`` protocol (also used by rucaptcha, azcaptcha,
+cptch.net, multibot, sctg and cap.guru) and the anti-captcha ``createTask``/``getTaskResult``
+protocol (also used by capmonster and capsolver), so ``Solver`` can be exercised end-to-end
+without paying a real provider::
+
+    with MockProviderServer(MockProviderConfig(solve_latency=Latency.uniform(1, 3))) as server:
+        solver = Solver(Service.TWOCAPTCHA, 'any-key')
+        solver._service.BASE_URL = server.url
+
+Run ``python -m testing.captcha_provider --port 8000`` to keep one running.
+"""
+import argparse
+import itertools
+import json
+import random
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, FrozenSet, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+
+@dataclass
+class Latency:
+    """ Latency distribution, in seconds """
+
+    kind: str = 'fixed'
+    params: Tuple[float, ...] = (0.0,)
+
+    @classmethod
+    def fixed(cls, seconds: float) -> 'Latency':
+        return cls('fixed', (seconds,))
+
+    @classmethod
+    def uniform(cls, low: float, high: float) -> 'Latency':
+        return cls('uniform', (low, high))
+
+    @classmethod
+    def exponential(cls, mean: float) -> 'Latency':
+        return cls('exponential', (mean,))
+
+    @classmethod
+    def lognormal(cls, median: float, sigma: float) -> 'Latency':
+        return cls('lognormal', (median, sigma))
+
+    @classmethod
+    def parse(cls, value: str) -> 'Latency':
+        """ Parse ``kind:param[,param]``, e.g. ``uniform:1,3`` or ``fixed:0.5`` """
+
+        kind, _, params = value.partition(':')
+        return cls(kind, tuple(float(p) for p in params.split(',') if p))
+
+    def sample(self) -> float:
+        """ Draw a latency value """
+
+        if self.kind == 'fixed':
+            value = self.params[0]
+        elif self.kind == 'uniform':
+            value = random.uniform(*self.params)
+        elif self.kind == 'exponential':
+            value = random.expovariate(1 / self.params[0]) if self.params[0] else 0.0
+        elif self.kind == 'lognormal':
+            median, sigma = self.params
+            value = median * random.lognormvariate(0, sigma)
+        else:
+            raise ValueError(f"Unknown latency distribution: '{self.kind}'")
+        return max(value, 0.0)
+
+
+@dataclass
+class MockProviderConfig:
+    """ Mock provider behaviour """
+
+    solve_latency: Latency = field(default_factory=lambda: Latency.uniform(1, 3))
+    response_latency: Latency = field(default_factory=lambda: Latency.fixed(0))
+    max_slots: Optional[int] = None  # max unsolved tasks at once, ERROR_NO_SLOT_AVAILABLE above it
+    busy_rate: float = 0.0  # share of task creations rejected with ERROR_NO_SLOT_AVAILABLE
+    unsolvable_rate: float = 0.0  # share of tasks finished with ERROR_CAPTCHA_UNSOLVABLE
+    http_error_rate: float = 0.0  # share of requests answered with HTTP 503
+    http_error_paths: Optional[FrozenSet[str]] = None  # endpoints the HTTP 503s are limited to, all if None
+    balance: float = 100.0
+    price: float = 0.00299
+
+
+@dataclass
+class _Task:
+    ready_at: float
+    solution: Optional[Dict]
+    error: Optional[str] = None
+
+
+class MockProviderState:
+    """ Tasks and counters shared by all handler threads """
+
+    def __init__(self, config: MockProviderConfig):
+        self.config = config
+        self._lock = threading.Lock()
+        self._tasks: Dict[str, _Task] = {}
+        self._ids = itertools.count(1)
+        self.counters: Dict[str, int] = dict(
+            created=0, solved=0, busy=0, unsolvable=0, http_errors=0, polls=0
+        )
+        # task creation requests received per page URL, including the ones answered with an error
+        self.submissions: Dict[str, int] = {}
+
+    def _count(self, name: str):
+        self.counters[name] += 1
+
+    def record_submission(self, page_url: str):
+        """ Count a task creation request for the page, before it is answered """
+
+        with self._lock:
+            self.submissions[page_url] = self.submissions.get(page_url, 0) + 1
+
+    def inject_http_error(self, path: str) -> bool:
+        """ Whether the current request to `path` should fail with HTTP 503 """
+
+        paths = self.config.http_error_paths
+        if paths is not None and path not in paths:
+            return False
+        with self._lock:
+            if random.random() < self.config.http_error_rate:
+                self._count('http_errors')
+                return True
+        return False
+
+    def create_task(self, solution: Dict) -> Tuple[Optional[str], Optional[str]]:
+        """ Register a new task, returns (task_id, error_code) """
+
+        with self._lock:
+            now = time.monotonic()
+            in_progress = sum(1 for task in self._tasks.values() if task.ready_at > now)
+            if ((self.config.max_slots is not None and in_progress >= self.config.max_slots)
+                    or random.random() < self.config.busy_rate):
+                self._count('busy')
+                return None, 'ERROR_NO_SLOT_AVAILABLE'
+
+            task_id = str(next(self._ids))
+            error = None
+            if random.random() < self.config.unsolvable_rate:
+                error = 'ERROR_CAPTCHA_UNSOLVABLE'
+            self._tasks[task_id] = _Task(now + self.config.solve_latency.sample(), solution, error)
+            self._count('created')
+            return task_id, None
+
+    def get_result(self, task_id: str) -> Tuple[Optional[Dict], Optional[str]]:
+        """ Returns (solution, error_code), both None while the task is in progress """
+
+        with self._lock:
+            self._count('polls')
+            task = self._tasks.get(task_id)
+            if task is None:
+                return None, 'ERROR_WRONG_CAPTCHA_ID'
+            if task.ready_at > time.monotonic():
+                return None, None
+
+            del self._tasks[task_id]
+            if task.error:
+                self._count('unsolvable')
+                return None, task.error
+            self._count('solved')
+            return task.solution, None
+
+
+def _token() -> str:
+    return 'MOCK-' + uuid.uuid4().hex
+
+
+class MockProviderHandler(BaseHTTPRequestHandler):
+    """ HTTP handler dispatching both provider protocols """
+
+    server: 'MockProviderServer'
+
+    # pylint: disable=invalid-name
+    def do_GET(self):
+        self._handle()
+
+    # pylint: disable=invalid-name
+    def do_POST(self):
+        self._handle()
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass
+
+    def _read_params(self) -> Dict:
+        url = urlsplit(self.path)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            body = self.rfile.read(length)
+            if 'json' in self.headers.get('Content-Type', ''):
+                params.update(json.loads(body))
+            else:
+                params.update({k: v[-1] for k, v in parse_qs(body.decode()).items()})
+        return params
+
+    def _send_json(self, data: Dict, status: int = 200):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _handle(self):
+        state = self.server.state
+        path = urlsplit(self.path).path
+        params = self._read_params()
+
+        # counted on arrival, a client timing out before the response still reached the provider
+        if path == '/in.php':
+            state.record_submission(params.get('pageurl', ''))
+        elif path == '/createTask':
+            state.record_submission((params.get('task') or {}).get('websiteURL', ''))
+
+        time.sleep(state.config.response_latency.sample())
+
+        if state.inject_http_error(path):
+            self._send_json({'error': 'Service Unavailable'}, status=503)
+            return
+
+        handlers = {
+            '/in.php': self._twocaptcha_in,
+            '/res.php': self._twocaptcha_res,
+            '/createTask': self._anticaptcha_create_task,
+            '/getTaskResult': self._anticaptcha_get_task_result,
+            '/getBalance': self._anticaptcha_get_balance,
+        }
+        handler = handlers.get(path)
+        if handler is None:
+            self._send_json({'error': f'Unknown endpoint {path}'}, status=404)
+            return
+        handler(params)
+
+    # 2captcha protocol
+
+    def _twocaptcha_in(self, params: Dict):
+        method = params.get('method')
+        if method == 'geetest':
+            solution = dict(geetest_challenge=params.get('challenge', ''),
+                            geetest_validate=_token(), geetest_seccode=_token())
+        elif method and method.strip() == 'geetest_v4':
+            solution = dict(captcha_id=params.get('captcha_id', ''), lot_number=_token(),
+                            pass_token=_token(), gen_time=str(int(time.time())),
+                            captcha_output=_token())
+        elif method == 'capy':
+            solution = dict(captchakey=params.get('captchakey', ''), challengekey=_token(),
+                            answer=_token())
+        elif method == 'base64' or 'textcaptcha' in params:
+            solution = 'mock'
+        else:
+            solution = _token()
+
+        task_id, error = self.server.state.create_task({'value': solution})
+        if error:
+            self._send_json({'status': 0, 'request': error})
+        else:
+            self._send_json({'status': 1, 'request': task_id})
+
+    def _twocaptcha_res(self, params: Dict):
+        action = params.get('action')
+        if action == 'getbalance':
+            self._send_json({'status': 1, 'request': str(self.server.state.config.balance)})
+        elif action in ('reportgood', 'reportbad'):
+            self._send_json({'status': 1, 'request': 'OK_REPORT_RECORDED'})
+        elif action in ('get', 'get2'):
+            solution, error = self.server.state.get_result(params.get('id', ''))
+            if error:
+                self._send_json({'status': 0, 'request': error})
+            elif solution is None:
+                self._send_json({'status': 0, 'request': 'CAPCHA_NOT_READY'})
+            else:
+                self._send_json({'status': 1, 'request': solution['value'],
+                                 'price': str(self.server.state.config.price)})
+        else:
+            self._send_json({'status': 0, 'request': 'ERROR_BAD_PARAMETERS'})
+
+    # anti-captcha protocol
+
+    def _anticaptcha_error(self, error_code: str):
+        self._send_json({'errorId': 1, 'errorCode': error_code,
+                         'errorDescription': f'Mock provider: {error_code}'})
+
+    def _anticaptcha_create_task(self, params: Dict):
+        task_type = (params.get('task') or {}).get('type', '')
+        if task_type.startswith('ImageToText'):
+            solution = {'text': 'mock'}
+        elif task_type.startswith('FunCaptcha'):
+            solution = {'token': _token()}
+        else:
+            solution = {'gRecaptchaResponse': _token()}
+
+        task_id, error = self.server.state.create_task(solution)
+        if error:
+            self._anticaptcha_error(error)
+        else:
+            self._send_json({'errorId': 0, 'taskId': int(task_id)})
+
+    def _anticaptcha_get_task_result(self, params: Dict):
+        solution, error = self.server.state.get_result(str(params.get('taskId', '')))
+        if error:
+            self._anticaptcha_error(error)
+        elif solution is None:
+            self._send_json({'errorId': 0, 'status': 'processing'})
+        else:
+            self._send_json({'errorId': 0, 'status': 'ready', 'solution': solution,
+                             'cost': str(self.server.state.config.price)})
+
+    def _anticaptcha_get_balance(self, params: Dict):  # pylint: disable=unused-argument
+        self._send_json({'errorId': 0, 'balance': self.server.state.config.balance})
+
+
+class MockProviderServer(ThreadingHTTPServer):
+    """ Mock captcha provider running in a background thread """
+
+    daemon_threads = True
+    request_queue_size = 1024  # listen backlog, the default of 5 resets connections under load
+
+    def __init__(self, config: Optional[MockProviderConfig] = None,
+                 host: str = '127.0.0.1', port: int = 0):
+        super().__init__((host, port), MockProviderHandler)
+        self.state = MockProviderState(config or MockProviderConfig())
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """ Base URL to set as the service's BASE_URL """
+
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self) -> 'MockProviderServer':
+        """ Start serving in a daemon thread """
+
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """ Stop serving and close the socket """
+
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run a local mock captcha provider')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--solve-latency', type=Latency.parse, default=Latency.uniform(1, 3),
+                        help='e.g. fixed:2, uniform:1,3, exponential:2, lognormal:2,0.5')
+    parser.add_argument('--response-latency', type=Latency.parse, default=Latency.fixed(0))
+    parser.add_argument('--max-slots', type=int, default=None)
+    parser.add_argument('--busy-rate', type=float, default=0.0)
+    parser.add_argument('--unsolvable-rate', type=float, default=0.0)
+    parser.add_argument('--http-error-rate', type=float, default=0.0)
+    parser.add_argument('--http-error-paths', nargs='+', default=None,
+                        help='endpoints the HTTP errors are limited to, e.g. /res.php /getTaskResult')
+    args = parser.parse_args()
+
+    config = MockProviderConfig(
+        solve_latency=args.solve_latency,
+        response_latency=args.response_latency,
+        max_slots=args.max_slots,
+        busy_rate=args.busy_rate,
+        unsolvable_rate=args.unsolvable_rate,
+        http_error_rate=args.http_error_rate,
+        http_error_paths=frozenset(args.http_error_paths) if args.http_error_paths else None,
+    )
+    server = MockProviderServer(config, args.host, args.port)
+    print(f"Mock captcha provider listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(server.state.counters)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,453 @@
+"""
+Local stand-in JSON-RPC node for the staking path
+
+Keeps balances, nonces and bonded stakes in memory, accepts signed legacy and EIP-1559
+transactions, mines them every ``block_time`` seconds and implements the staking
+precompile at ``0x...0800`` (``bonded``, ``bond``, ``bondExtra``), so
+``ZenchainAsyncStaking`` and ``StakeActionHandler`` can be exercised end-to-end
+without the public endpoint::
+
+    with DevChainServer(DevChainConfig(block_time=1)) as chain:
+        chain.state.fund(address, Web3.to_wei(100, 'ether'))
+        staker = ZenchainAsyncStaking(chain.url, private_key)
+
+State reads ignore the block identifier and always answer with the latest state.
+
+Run ``python -m testing.dev_chain --port 8545`` to keep one running.
+"""
+import argparse
+import json
+import threading
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+from eth_abi import decode, encode
+from eth_account import Account
+from eth_account._utils.legacy_transactions import Transaction
+from eth_account.typed_transactions import TypedTransaction
+from eth_utils import function_signature_to_4byte_selector, keccak, to_checksum_address
+from hexbytes import HexBytes
+
+
+CHAIN_ID = 8408  # zenchain testnet
+STAKING_ADDRESS = '0x0000000000000000000000000000000000000800'
+
+BONDED_SELECTOR = function_signature_to_4byte_selector('bonded(address)')
+BOND_SELECTOR = function_signature_to_4byte_selector('bond(uint256,uint8)')
+BOND_EXTRA_SELECTOR = function_signature_to_4byte_selector('bondExtra(uint256)')
+
+ZERO_HASH = '0x' + '00' * 32
+
+
+class RpcError(Exception):
+    def __init__(self, message: str, code: int = -32000):
+        super().__init__(message)
+        self.code = code
+
+
+@dataclass
+class DevChainConfig:
+    block_time: float = 1.0  # seconds between blocks
+    base_fee: int = 10 ** 9  # wei per gas
+    priority_fee: int = 10 ** 8  # wei per gas suggested as tip
+    stake_gas: int = 45000  # gas used by bond and bondExtra
+    transfer_gas: int = 21000  # gas used by plain transfers
+    response_latency: float = 0.0  # seconds added to every response
+
+
+@dataclass
+class _Tx:
+    hash: bytes
+    sender: str
+    nonce: int
+    to: Optional[str]
+    value: int
+    data: bytes
+    gas: int
+    max_fee: int
+    priority_fee: int
+    type: int
+
+
+class DevChainState:
+    """ In-memory chain state, every method is thread-safe """
+
+    def __init__(self, config: DevChainConfig):
+        self.config = config
+        self.lock = threading.Lock()
+        self.balances: Dict[str, int] = defaultdict(int)
+        self.nonces: Dict[str, int] = defaultdict(int)
+        self.bonded: Dict[str, int] = defaultdict(int)
+        self.pending: List[_Tx] = []
+        self.known: set = set()
+        self.blocks: List[Dict[str, Any]] = []
+        self.receipts: Dict[bytes, Dict[str, Any]] = {}
+        self.transactions: Dict[bytes, Dict[str, Any]] = {}
+        self.counters = Counter()  # transactions accepted and stakes applied
+        self.requests = Counter()  # JSON-RPC requests per method
+        self._mine_block([])
+
+    def fund(self, address: str, amount: int):
+        """ Credit `amount` wei to the address """
+
+        with self.lock:
+            self.balances[to_checksum_address(address)] += amount
+
+    @property
+    def block_number(self) -> int:
+        return len(self.blocks) - 1
+
+    def pending_nonce(self, address: str) -> int:
+        return self.nonces[address] + sum(1 for tx in self.pending if tx.sender == address)
+
+    # -- transactions -- #
+
+    @staticmethod
+    def _decode(raw: bytes) -> Tuple[Dict[str, Any], int]:
+        raw = HexBytes(raw)
+        if raw[0] < 0x7f:
+            fields = TypedTransaction.from_bytes(raw).as_dict()
+            return fields, raw[0]
+        return Transaction.from_bytes(raw).as_dict(), 0
+
+    def send_raw_transaction(self, raw: bytes) -> bytes:
+        fields, tx_type = self._decode(raw)
+        tx = _Tx(
+            hash=keccak(raw),
+            sender=Account.recover_transaction(raw),
+            nonce=fields['nonce'],
+            to=to_checksum_address(fields['to']) if fields.get('to') else None,
+            value=fields['value'],
+            data=bytes(fields['data']),
+            gas=fields['gas'],
+            max_fee=fields.get('maxFeePerGas', fields.get('gasPrice')),
+            priority_fee=fields.get('maxPriorityFeePerGas', fields.get('gasPrice')),
+            type=tx_type,
+        )
+
+        with self.lock:
+            if tx.hash in self.known:
+                raise RpcError('already known')
+            if fields.get('chainId', CHAIN_ID) != CHAIN_ID:
+                raise RpcError('invalid chain id')
+            expected_nonce = self.pending_nonce(tx.sender)
+            if tx.nonce < expected_nonce:
+                raise RpcError('nonce too low')
+            if tx.nonce > expected_nonce:
+                raise RpcError('nonce too high')
+            if tx.max_fee < self.config.base_fee:
+                raise RpcError('max fee per gas less than block base fee')
+            pending_cost = sum(t.gas * t.max_fee + t.value for t in self.pending if t.sender == tx.sender)
+            if self.balances[tx.sender] < pending_cost + tx.gas * tx.max_fee + tx.value:
+                raise RpcError('insufficient funds for gas * price + value')
+
+            self.known.add(tx.hash)
+            self.pending.append(tx)
+            self.counters['transactions'] += 1
+        return tx.hash
+
+    def _execute(self, tx: _Tx) -> Tuple[bool, int]:
+        """ Apply a transaction to the state, returns the status and the gas used """
+
+        if tx.to != STAKING_ADDRESS:
+            self.balances[tx.sender] -= tx.value
+            if tx.to:
+                self.balances[tx.to] += tx.value
+            return True, self.config.transfer_gas
+
+        gas_used = self.config.stake_gas
+        try:
+            amount = self._stake_amount(tx.sender, tx.data)
+        except RpcError:
+            return False, gas_used
+        if amount > self.balances[tx.sender] - gas_used * self._effective_price(tx):
+            return False, gas_used
+
+        self.balances[tx.sender] -= amount
+        self.bonded[tx.sender] += amount
+        self.counters['stakes'] += 1
+        return True, gas_used
+
+    def _stake_amount(self, sender: str, data: bytes) -> int:
+        selector, args = data[:4], data[4:]
+        if selector == BOND_SELECTOR:
+            if self.bonded[sender]:
+                raise RpcError('execution reverted: already bonded', 3)
+            amount, _ = decode(['uint256', 'uint8'], args)
+        elif selector == BOND_EXTRA_SELECTOR:
+            if not self.bonded[sender]:
+                raise RpcError('execution reverted: not bonded', 3)
+            amount, = decode(['uint256'], args)
+        else:
+            raise RpcError('execution reverted: unknown staking method', 3)
+        if amount <= 0:
+            raise RpcError('execution reverted: zero stake', 3)
+        return amount
+
+    def _effective_price(self, tx: _Tx) -> int:
+        if tx.type == 0:
+            return tx.max_fee
+        return min(tx.max_fee, self.config.base_fee + tx.priority_fee)
+
+    def _mine_block(self, txs: List[_Tx]) -> Dict[str, Any]:
+        number = len(self.blocks)
+        block_hash = keccak(b'block' + number.to_bytes(8, 'big'))
+        gas_used_total = 0
+        for index, tx in enumerate(txs):
+            price = self._effective_price(tx)
+            status, gas_used = self._execute(tx)
+            self.balances[tx.sender] -= gas_used * price
+            self.nonces[tx.sender] += 1
+            gas_used_total += gas_used
+            self.transactions[tx.hash] = {
+                'hash': '0x' + tx.hash.hex(),
+                'blockHash': '0x' + block_hash.hex(),
+                'blockNumber': hex(number),
+                'transactionIndex': hex(index),
+                'from': tx.sender,
+                'to': tx.to,
+                'nonce': hex(tx.nonce),
+                'value': hex(tx.value),
+                'gas': hex(tx.gas),
+                'gasPrice': hex(price),
+                'input': '0x' + tx.data.hex(),
+                'type': hex(tx.type),
+                'chainId': hex(CHAIN_ID),
+            }
+            self.receipts[tx.hash] = {
+                'transactionHash': '0x' + tx.hash.hex(),
+                'transactionIndex': hex(index),
+                'blockHash': '0x' + block_hash.hex(),
+                'blockNumber': hex(number),
+                'from': tx.sender,
+                'to': tx.to,
+                'cumulativeGasUsed': hex(gas_used_total),
+                'gasUsed': hex(gas_used),
+                'effectiveGasPrice': hex(price),
+                'contractAddress': None,
+                'logs': [],
+                'logsBloom': '0x' + '00' * 256,
+                'status': hex(int(status)),
+                'type': hex(tx.type),
+            }
+
+        block = {
+            'number': hex(number),
+            'hash': '0x' + block_hash.hex(),
+            'parentHash': self.blocks[-1]['hash'] if self.blocks else ZERO_HASH,
+            'timestamp': hex(int(time.time())),
+            'transactions': ['0x' + tx.hash.hex() for tx in txs],
+            'gasLimit': hex(30_000_000),
+            'gasUsed': hex(gas_used_total),
+            'baseFeePerGas': hex(self.config.base_fee),
+            'miner': '0x' + '00' * 20,
+            'difficulty': '0x0',
+            'totalDifficulty': '0x0',
+            'extraData': '0x',
+            'logsBloom': '0x' + '00' * 256,
+            'nonce': '0x' + '00' * 8,
+            'mixHash': ZERO_HASH,
+            'receiptsRoot': ZERO_HASH,
+            'sha3Uncles': ZERO_HASH,
+            'stateRoot': ZERO_HASH,
+            'transactionsRoot': ZERO_HASH,
+            'size': '0x0',
+            'uncles': [],
+        }
+        self.blocks.append(block)
+        return block
+
+    def mine(self) -> Dict[str, Any]:
+        """ Mine every pending transaction into a new block """
+
+        with self.lock:
+            txs, self.pending = self.pending, []
+            return self._mine_block(txs)
+
+    # -- JSON-RPC -- #
+
+    def _block_param(self, value: Any) -> int:
+        if value in ('latest', 'pending', 'safe', 'finalized', None):
+            return self.block_number
+        if value == 'earliest':
+            return 0
+        return int(value, 16)
+
+    def handle(self, method: str, params: List[Any]) -> Any:
+        self.requests[method] += 1
+        with self.lock:
+            if method == 'eth_chainId':
+                return hex(CHAIN_ID)
+            if method == 'net_version':
+                return str(CHAIN_ID)
+            if method == 'eth_blockNumber':
+                return hex(self.block_number)
+            if method == 'eth_gasPrice':
+                return hex(self.config.base_fee + self.config.priority_fee)
+            if method == 'eth_maxPriorityFeePerGas':
+                return hex(self.config.priority_fee)
+            if method == 'eth_getBalance':
+                return hex(self.balances[to_checksum_address(params[0])])
+            if method == 'eth_getTransactionCount':
+                address = to_checksum_address(params[0])
+                if len(params) > 1 and params[1] == 'pending':
+                    return hex(self.pending_nonce(address))
+                return hex(self.nonces[address])
+            if method == 'eth_getCode':
+                return '0x'
+            if method == 'eth_call':
+                return self._call(params[0])
+            if method == 'eth_estimateGas':
+                return self._estimate_gas(params[0])
+            if method == 'eth_feeHistory':
+                return self._fee_history(int(params[0], 16) if isinstance(params[0], str) else params[0],
+                                         self._block_param(params[1]), params[2] if len(params) > 2 else [])
+            if method == 'eth_getBlockByNumber':
+                number = self._block_param(params[0])
+                if number > self.block_number:
+                    return None
+                block = self.blocks[number]
+                if len(params) > 1 and params[1]:
+                    transactions = [self.transactions[bytes.fromhex(tx_hash[2:])] for tx_hash in block['transactions']]
+                    block = {**block, 'transactions': transactions}
+                return block
+            if method == 'eth_getTransactionReceipt':
+                return self.receipts.get(bytes.fromhex(params[0][2:]))
+        if method == 'eth_sendRawTransaction':
+            return '0x' + self.send_raw_transaction(bytes.fromhex(params[0][2:])).hex()
+        raise RpcError(f'the method {method} does not exist/is not available', -32601)
+
+    def _call(self, call: Dict[str, Any]) -> str:
+        data = bytes.fromhex((call.get('data') or call.get('input') or '0x')[2:])
+        if to_checksum_address(call['to']) == STAKING_ADDRESS and data[:4] == BONDED_SELECTOR:
+            address, = decode(['address'], data[4:])
+            return '0x' + encode(['uint256'], [self.bonded[to_checksum_address(address)]]).hex()
+        return '0x'
+
+    def _estimate_gas(self, call: Dict[str, Any]) -> str:
+        if call.get('to') and to_checksum_address(call['to']) == STAKING_ADDRESS:
+            sender = to_checksum_address(call['from'])
+            self._stake_amount(sender, bytes.fromhex((call.get('data') or call.get('input') or '0x')[2:]))
+            return hex(self.config.stake_gas)
+        return hex(self.config.transfer_gas)
+
+    def _fee_history(self, count: int, newest: int, percentiles: List[float]) -> Dict[str, Any]:
+        oldest = max(0, newest - count + 1)
+        blocks = self.blocks[oldest:newest + 1]
+        return {
+            'oldestBlock': hex(oldest),
+            'baseFeePerGas': [hex(self.config.base_fee)] * (len(blocks) + 1),
+            'gasUsedRatio': [int(block['gasUsed'], 16) / int(block['gasLimit'], 16) for block in blocks],
+            'reward': [[hex(self.config.priority_fee)] * len(percentiles) for _ in blocks],
+        }
+
+
+class DevChainHandler(BaseHTTPRequestHandler):
+    server: 'DevChainServer'
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        if self.server.config.response_latency:
+            time.sleep(self.server.config.response_latency)
+
+        response = [self._dispatch(request) for request in body] if isinstance(body, list) \
+            else self._dispatch(body)
+
+        data = json.dumps(response).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass
+
+    def _dispatch(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            result = self.server.state.handle(request['method'], request.get('params') or [])
+        except RpcError as e:
+            return {'jsonrpc': '2.0', 'id': request.get('id'), 'error': {'code': e.code, 'message': str(e)}}
+        except Exception as e:
+            return {'jsonrpc': '2.0', 'id': request.get('id'), 'error': {'code': -32603, 'message': str(e)}}
+        return {'jsonrpc': '2.0', 'id': request.get('id'), 'result': result}
+
+
+class DevChainServer(ThreadingHTTPServer):
+    """ Dev chain JSON-RPC server, mining blocks in a background thread """
+
+    daemon_threads = True
+
+    def __init__(self, config: Optional[DevChainConfig] = None,
+                 host: str = '127.0.0.1', port: int = 0):
+        super().__init__((host, port), DevChainHandler)
+        self.config = config or DevChainConfig()
+        self.state = DevChainState(self.config)
+        self._thread: Optional[threading.Thread] = None
+        self._miner: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def _mine_forever(self):
+        while not self._stopped.wait(self.config.block_time):
+            self.state.mine()
+
+    def start(self) -> 'DevChainServer':
+        """ Start serving and mining in daemon threads """
+
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        self._miner = threading.Thread(target=self._mine_forever, daemon=True)
+        self._miner.start()
+        return self
+
+    def stop(self):
+        """ Stop mining and serving and close the socket """
+
+        self._stopped.set()
+        self.shutdown()
+        self.server_close()
+        for thread in (self._thread, self._miner):
+            if thread is not None:
+                thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run a local dev chain JSON-RPC node')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8545)
+    parser.add_argument('--block-time', type=float, default=1.0)
+    parser.add_argument('--response-latency', type=float, default=0.0)
+    parser.add_argument('--fund', nargs='*', default=[], metavar='ADDRESS',
+                        help='addresses credited with 1000 ZXC at start')
+    args = parser.parse_args()
+
+    server = DevChainServer(DevChainConfig(block_time=args.block_time, response_latency=args.response_latency),
+                            args.host, args.port)
+    for address in args.fund:
+        server.state.fund(address, 1000 * 10 ** 18)
+    print(f"Dev chain listening on {server.url}, chain id {CHAIN_ID}")
+    with server:
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+    print(server.state.counters, server.state.requests)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,15 @@
+import os
+
+import pytest
+
+# settings required by the application, the tests run without a .env
+os.environ.setdefault('CAPTCHA_API_KEY', 'test-key')
+os.environ.setdefault('CAPTCHA_SERVICE', 'TWOCAPTCHA')
+os.environ.setdefault('DELAY_BETWEEN_DEPENDENCY_EXECUTIONS', '[10,15]')
+
+
+@pytest.fixture(autouse=True)
+def working_dir(tmp_path, monkeypatch):
+    """ Runs every test in its own directory, application.log and SQLite files stay out of the repo """
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
@@ -0,0 +1,73 @@
+import asyncio
+import random
+
+import httpx
+import pytest
+
+from core.captcha.anycaptcha import Service, Solver
+from testing.captcha_provider import Latency, MockProviderConfig, MockProviderServer
+
+
+PAGE_URL = 'https://example.com/page'
+# (service, task creation endpoint, result poll endpoint), one service per provider protocol
+PROTOCOLS = [
+    (Service.TWOCAPTCHA, '/in.php', '/res.php'),
+    (Service.ANTI_CAPTCHA, '/createTask', '/getTaskResult'),
+]
+# quick retries and polls; the seeded 50% error rate never fails a request 8 times in a row
+TRANSPORT_SETTINGS = dict(rate_limit=None, max_in_flight=None, max_retries=8, backoff_factor=0.01)
+
+
+def solve(server: MockProviderServer, service: Service, timeout: float = 30):
+    """ Solves one reCAPTCHA through the mock provider, returns the solution or the exception raised """
+
+    async def run():
+        async with Solver(service, 'mock-key') as solver:
+            # pylint: disable=protected-access
+            solver._service.BASE_URL = server.url
+            solver._service._transport.settings.update(TRANSPORT_SETTINGS)
+            solver._service._transport.session_async.timeout = httpx.Timeout(timeout)
+            for settings in solver._service.settings.values():
+                settings.polling_delay = 0.05
+                settings.polling_interval = 0.05
+            try:
+                return await solver.solve_recaptcha_v2(site_key='site-key', page_url=PAGE_URL)
+            except Exception as e:
+                return e
+
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize('service, create_path, result_path', PROTOCOLS)
+def test_result_polls_are_retried_on_5xx(service, create_path, result_path):
+    random.seed(1)
+    config = MockProviderConfig(solve_latency=Latency.fixed(0.1), http_error_rate=0.5,
+                                http_error_paths=frozenset({result_path}))
+    with MockProviderServer(config) as server:
+        solution = solve(server, service)
+
+    assert not isinstance(solution, Exception)
+    assert server.state.counters['http_errors'] > 0
+    assert server.state.counters['solved'] == 1
+    assert server.state.submissions == {PAGE_URL: 1}
+
+
+@pytest.mark.parametrize('service, create_path, result_path', PROTOCOLS)
+def test_task_creation_is_not_resent_on_5xx(service, create_path, result_path):
+    config = MockProviderConfig(http_error_rate=1.0, http_error_paths=frozenset({create_path}))
+    with MockProviderServer(config) as server:
+        error = solve(server, service)
+
+    assert isinstance(error, httpx.HTTPStatusError)
+    assert error.response.status_code == 503
+    assert server.state.submissions == {PAGE_URL: 1}
+
+
+@pytest.mark.parametrize('service, create_path, result_path', PROTOCOLS)
+def test_task_creation_is_not_resent_on_read_timeout(service, create_path, result_path):
+    config = MockProviderConfig(response_latency=Latency.fixed(0.5))
+    with MockProviderServer(config) as server:
+        error = solve(server, service, timeout=0.1)
+
+    assert isinstance(error, httpx.ReadTimeout)
+    assert server.state.submissions == {PAGE_URL: 1}
@@ -0,0 +1,52 @@
+import asyncio
+
+from sqlalchemy import func, select
+
+from core.database.connect import AsyncSessionLocal, dispose_db, get_engine, init_db
+from core.database.models import Account, Base, FaucetDrip
+from core.database.writer import DatabaseWriter
+from core.services.faucet_ledger import FaucetLedger
+
+
+async def create_account() -> int:
+    """ Creates the schema in a new in-memory database and adds one account """
+    init_db('sqlite+aiosqlite://')
+    async with get_engine().begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    async with AsyncSessionLocal() as session:
+        account = Account(email='test@example.com', address='0x' + '11' * 20, private_key='key', active=True)
+        session.add(account)
+        await session.commit()
+        return account.id
+
+
+def test_batch_operations_see_earlier_writes():
+    async def run():
+        account_id = await create_account()
+        try:
+            writer = DatabaseWriter(AsyncSessionLocal, batch_interval=0.05)
+            result = {'hash': '0x' + 'ab' * 32, 'dripAmount': '100'}
+
+            async def record(session):
+                return await FaucetLedger.record(session, account_id, None, result)
+
+            # the same drip reported twice for the address lands in one batch
+            drips = await asyncio.gather(writer.submit(record), writer.submit(record))
+            await writer.close()
+
+            async with AsyncSessionLocal() as session:
+                drip_count = await session.scalar(select(func.count(FaucetDrip.id)))
+                account = await session.get(Account, account_id)
+            return writer, drips, drip_count, account
+        finally:
+            await dispose_db()
+
+    writer, drips, drip_count, account = asyncio.run(run())
+
+    assert writer.batches == 1
+    assert writer.writes == 2
+    assert drips[0] is not None
+    assert drips[1] is None
+    assert drip_count == 1
+    assert account.faucet_drip_count == 1
+    assert account.faucet_dripped_total == 100 * 10 ** 18
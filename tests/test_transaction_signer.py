@@ -0,0 +1,49 @@
+import asyncio
+import os
+
+from eth_account import Account
+
+from core.utils.w3.signing import TransactionSigner
+
+
+def build_transaction(nonce: int) -> dict:
+    return {
+        'to': '0x' + '22' * 20,
+        'value': 1,
+        'nonce': nonce,
+        'gas': 21000,
+        'maxFeePerGas': 2 * 10 ** 9,
+        'maxPriorityFeePerGas': 10 ** 8,
+        'chainId': 8408
+    }
+
+
+def test_concurrent_sign_calls_share_a_batch(monkeypatch):
+    items = [(build_transaction(nonce), '0x' + os.urandom(32).hex()) for nonce in range(4)]
+    batches = []
+    sign_many = TransactionSigner.sign_many.__func__
+
+    async def recording_sign_many(cls, batch_items, *args, **kwargs):
+        batches.append(len(batch_items))
+        return await sign_many(cls, batch_items, *args, **kwargs)
+
+    monkeypatch.setattr(TransactionSigner, 'sign_many', classmethod(recording_sign_many))
+
+    async def run():
+        cancelled = asyncio.ensure_future(TransactionSigner.sign(*items[0]))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        return await asyncio.gather(*[TransactionSigner.sign(tx, private_key) for tx, private_key in items[1:]])
+
+    TransactionSigner.configure(1)
+    try:
+        signed = asyncio.run(run())
+    finally:
+        TransactionSigner.shutdown()
+
+    # the cancelled call is dropped, the others go to the workers in one task
+    assert batches == [3]
+    for (tx, private_key), (raw_transaction, tx_hash) in zip(items[1:], signed):
+        expected = Account.sign_transaction(tx, private_key)
+        assert raw_transaction == expected.raw_transaction
+        assert tx_hash == expected.hash